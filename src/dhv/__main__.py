@@ -2,15 +2,37 @@
 
 ##############################################################################
 # Python imports.
-from argparse import ArgumentParser, Namespace
+from argparse import ArgumentParser, ArgumentTypeError, Namespace
 from inspect import cleandoc
 from operator import attrgetter
 from pathlib import Path
+from sys import argv, exit
 
 ##############################################################################
 # Local imports.
 from . import __doc__, __version__
-from .dhv import DHV
+
+
+##############################################################################
+def _job_count(value: str) -> int:
+    """Convert a command line value into a number of jobs.
+
+    Args:
+        value: The value to convert.
+
+    Returns:
+        The number of jobs.
+
+    Raises:
+        ArgumentTypeError: If the value isn't a number of jobs.
+    """
+    try:
+        jobs = int(value)
+    except ValueError:
+        raise ArgumentTypeError(f"invalid number of jobs: {value!r}") from None
+    if jobs < 0:
+        raise ArgumentTypeError(f"the number of jobs can't be negative: {jobs}")
+    return jobs
 
 
 ##############################################################################
@@ -53,6 +75,13 @@ def get_args() -> Namespace:
         action="store_true",
     )
 
+    # Add --clear-cache
+    parser.add_argument(
+        "--clear-cache",
+        help="Clear the cache of analysed code and exit",
+        action="store_true",
+    )
+
     # Add --theme
     parser.add_argument(
         "-t",
@@ -60,28 +89,114 @@ def get_args() -> Namespace:
         help="Set the theme for the application (set to ? to list available themes)",
     )
 
+    # What to open; either a file or a module.
+    to_open = parser.add_mutually_exclusive_group()
+
+    # Add --module
+    to_open.add_argument(
+        "-m",
+        "--module",
+        help="The dotted name of an installed Python module to disassemble",
+    )
+
     # An optional file to open.
-    parser.add_argument(
+    to_open.add_argument(
         "source",
         nargs="?",
         type=Path,
-        help="A Python source file to disassemble",
+        help="A Python source file, compiled file or `__pycache__` directory to "
+        "disassemble (or `dump` to dump code without the user interface; see "
+        "`dhv dump --help`)",
     )
 
     # Finally, parse the command line.
     return parser.parse_args()
 
 
+##############################################################################
+def get_dump_args(arguments: list[str]) -> Namespace:
+    """Get the command line arguments for dumping code.
+
+    Args:
+        arguments: The arguments that follow `dump` on the command line.
+
+    Returns:
+        The arguments.
+    """
+
+    # Build the parser.
+    parser = ArgumentParser(
+        prog="dhv dump",
+        description="Dump the disassembly of Python code without the user interface",
+        epilog=f"v{__version__}",
+    )
+
+    # Add --format
+    parser.add_argument(
+        "-f",
+        "--format",
+        help="The format to dump the code in (default: text)",
+        choices=("text", "jsonl"),
+        default="text",
+    )
+
+    # Add --ast
+    parser.add_argument(
+        "-a",
+        "--ast",
+        help="Also dump the abstract syntax tree of the code",
+        action="store_true",
+    )
+
+    # Add --offsets
+    parser.add_argument(
+        "-o",
+        "--offsets",
+        help="Show the offset of each operation in a text dump",
+        action="store_true",
+    )
+
+    # Add --opcodes
+    parser.add_argument(
+        "-c",
+        "--opcodes",
+        help="Show the opcode of each operation in a text dump",
+        action="store_true",
+    )
+
+    # Add --jobs
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        help="The number of processes to dump with; 0 for one per CPU (default: 1)",
+        type=_job_count,
+        default=1,
+    )
+
+    # The files to dump.
+    parser.add_argument(
+        "sources",
+        nargs="*",
+        type=Path,
+        default=[Path("-")],
+        help="Python source files, or directories of them, to dump "
+        "(default: - for standard input)",
+    )
+
+    # Finally, parse the command line.
+    return parser.parse_args(arguments)
+
+
 ##############################################################################
 def show_bindable_commands() -> None:
     """Show the commands that can have bindings applied."""
     from rich.console import Console
     from rich.markup import escape
 
-    from .screens import Main
+    from .commands import MAIN_COMMANDS
 
     console = Console(highlight=False)
-    for command in sorted(Main.COMMAND_MESSAGES, key=attrgetter("__name__")):
+    for command in sorted(MAIN_COMMANDS, key=attrgetter("__name__")):
         if command().has_binding:
             console.print(
                 f"[bold]{escape(command.__name__)}[/] [dim italic]- {escape(command.tooltip())}[/]"
@@ -91,26 +206,81 @@ def show_bindable_commands() -> None:
             )
 
 
+##############################################################################
+def clear_cache() -> None:
+    """Clear the on-disk cache of analysed code."""
+    from .analysis import DiskCache
+    from .data import analysis_cache_dir, load_configuration
+
+    DiskCache(
+        analysis_cache_dir(), load_configuration().analysis_disk_cache_size
+    ).clear()
+
+
 ##############################################################################
 def show_themes() -> None:
     """Show the available themes."""
-    for theme in sorted(DHV(Namespace(theme=None)).available_themes):
-        if theme != "textual-ansi":
+    from textual.theme import BUILTIN_THEMES
+
+    # Note that this needs to agree with the themes that the application
+    # makes available, which are the built-in themes, less the ANSI themes.
+    for theme in sorted(BUILTIN_THEMES):
+        if theme != "textual-ansi" and not theme.startswith("ansi"):
             print(theme)
 
 
+##############################################################################
+def dump_code(args: Namespace) -> None:
+    """Dump code without the user interface.
+
+    Args:
+        args: The command line arguments for the dump.
+    """
+    from sys import stderr, stdout
+
+    from .analysis import DisplaySettings
+    from .dump import dump
+
+    try:
+        success = dump(
+            args.sources,
+            stdout,
+            stderr,
+            dump_format=args.format,
+            settings=DisplaySettings(
+                show_offset=args.offsets, show_opcode=args.opcodes
+            ),
+            ast=args.ast,
+            jobs=args.jobs,
+        )
+    except BrokenPipeError:
+        # Whatever was reading the dump has stopped, which is fine.
+        exit(0)
+    exit(0 if success else 1)
+
+
 ##############################################################################
 def main() -> None:
     """The main entry point."""
+    if argv[1:2] == ["dump"]:
+        dump_code(get_dump_args(argv[2:]))
     args = get_args()
     if args.license:
-        print(cleandoc(DHV.HELP_LICENSE))
+        from .license import LICENSE
+
+        print(cleandoc(LICENSE))
     elif args.bindings:
         show_bindable_commands()
+    elif args.clear_cache:
+        clear_cache()
     elif args.theme == "?":
         show_themes()
     else:
+        from .data import flush_configuration
+        from .dhv import DHV
+
         DHV(args).run()
+        flush_configuration()
 
 
 ##############################################################################
@@ -0,0 +1,156 @@
+"""Provides tools for analysing Python code."""
+
+##############################################################################
+# Local imports.
+from .archives import (
+    ARCHIVE_SUFFIXES,
+    ArchivedModule,
+    ArchiveError,
+    analyse_archived_compiled,
+    archived_modules,
+    read_archived,
+)
+from .blocks import IncrementalAnalyser, block_starts
+from .cache import AnalysisCache
+from .compiled import (
+    COMPILED_SUFFIXES,
+    CompiledCode,
+    CompiledCodeError,
+    analyse_compiled,
+    analyse_compiled_code,
+    analyse_compiled_directory,
+    analyse_with_compiled,
+    compiled_files,
+    load_compiled,
+    unmarshal_compiled,
+)
+from .disk_cache import DiskCache
+from .identity import CodeIdentity, code_identities, code_name
+from .isolated import COMPILE_MEMORY_LIMIT, COMPILE_TIMEOUT, IsolatedCompiler
+from .listing import (
+    LINE_NUMBER_WIDTH,
+    OFFSET_WIDTH,
+    OPNAME_WIDTH,
+    CodeCounts,
+    CodeHeading,
+    DisplaySettings,
+    FailedBlock,
+    ListedOperation,
+    ListingItem,
+    code_counts,
+    collapsed_listing,
+    format_operation,
+    listing,
+    operation_argument,
+    operation_line_number,
+)
+from .locations import ASTIndex, IntervalIndex, index_ast, location_of
+from .lru import LRUCache
+from .model import (
+    Analysis,
+    Block,
+    CompilationFailed,
+    Compiler,
+    DisassembledCode,
+    FailureReason,
+    Parser,
+    analyse,
+    compile_source,
+    disassemble,
+    parse_source,
+    source_key,
+)
+from .modules import ModuleLocation, locate_module
+from .prefetch import prefetch_order, sibling_modules
+from .processes import start_resource_tracker
+from .project import (
+    ModuleCounts,
+    ProjectCounts,
+    count_module,
+    count_project,
+    module_name,
+    python_files,
+)
+from .signature import CodeSignature, code_signature
+from .sources import READ_CHUNK_SIZE, SourceChunk, read_source
+
+##############################################################################
+# Exports.
+__all__ = [
+    "ARCHIVE_SUFFIXES",
+    "COMPILED_SUFFIXES",
+    "COMPILE_MEMORY_LIMIT",
+    "COMPILE_TIMEOUT",
+    "LINE_NUMBER_WIDTH",
+    "OFFSET_WIDTH",
+    "OPNAME_WIDTH",
+    "READ_CHUNK_SIZE",
+    "ASTIndex",
+    "Analysis",
+    "AnalysisCache",
+    "ArchiveError",
+    "ArchivedModule",
+    "Block",
+    "CodeCounts",
+    "CodeHeading",
+    "CodeIdentity",
+    "CodeSignature",
+    "CompiledCode",
+    "CompiledCodeError",
+    "CompilationFailed",
+    "Compiler",
+    "DisassembledCode",
+    "DisplaySettings",
+    "DiskCache",
+    "FailedBlock",
+    "FailureReason",
+    "IncrementalAnalyser",
+    "IntervalIndex",
+    "IsolatedCompiler",
+    "ListedOperation",
+    "ListingItem",
+    "LRUCache",
+    "ModuleCounts",
+    "ModuleLocation",
+    "Parser",
+    "ProjectCounts",
+    "SourceChunk",
+    "analyse",
+    "analyse_archived_compiled",
+    "analyse_compiled",
+    "analyse_compiled_code",
+    "analyse_compiled_directory",
+    "analyse_with_compiled",
+    "archived_modules",
+    "block_starts",
+    "code_counts",
+    "code_identities",
+    "code_name",
+    "code_signature",
+    "collapsed_listing",
+    "compile_source",
+    "compiled_files",
+    "count_module",
+    "count_project",
+    "disassemble",
+    "format_operation",
+    "index_ast",
+    "listing",
+    "load_compiled",
+    "locate_module",
+    "location_of",
+    "module_name",
+    "operation_argument",
+    "operation_line_number",
+    "parse_source",
+    "prefetch_order",
+    "python_files",
+    "read_archived",
+    "read_source",
+    "sibling_modules",
+    "source_key",
+    "start_resource_tracker",
+    "unmarshal_compiled",
+]
+
+### __init__.py ends here
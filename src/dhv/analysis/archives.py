@@ -0,0 +1,143 @@
+"""Provides access to Python code held within archives."""
+
+##############################################################################
+# Python imports.
+from importlib.machinery import BYTECODE_SUFFIXES, SOURCE_SUFFIXES
+from pathlib import Path, PurePosixPath
+from time import mktime
+from typing import Final, NamedTuple
+from zipfile import BadZipFile, ZipFile
+
+##############################################################################
+# Local imports.
+from .compiled import analyse_compiled_code, unmarshal_compiled
+from .model import Analysis
+
+##############################################################################
+ARCHIVE_SUFFIXES: Final[tuple[str, ...]] = (".whl", ".zip", ".pyz")
+"""The suffixes of the archives that Python code can be found in."""
+ZIP_MTIME_SLACK: Final[int] = 1
+"""How many seconds the modification time of a member of an archive can be out by."""
+
+
+##############################################################################
+class ArchiveError(Exception):
+    """Raised when an archive, or a member of one, can't be read."""
+
+
+##############################################################################
+class ArchivedModule(NamedTuple):
+    """A Python module held within an archive."""
+
+    archive: Path
+    """The path to the archive."""
+    member: str
+    """The name of the member of the archive that holds the module."""
+    size: int
+    """The size of the module, uncompressed."""
+
+    @property
+    def path(self) -> Path:
+        """The path to the module, as if the archive were a directory."""
+        return self.archive / self.member
+
+    @property
+    def is_compiled(self) -> bool:
+        """Is the module compiled code?"""
+        return PurePosixPath(self.member).suffix in BYTECODE_SUFFIXES
+
+
+##############################################################################
+def archived_modules(archive: Path) -> list[ArchivedModule]:
+    """Find the Python modules held within an archive.
+
+    Args:
+        archive: The path to the archive.
+
+    Returns:
+        The Python source and compiled files within the archive, in order.
+
+    Raises:
+        ArchiveError: If the archive can't be read.
+
+    Notes:
+        Only the directory of the archive is read; none of the content of
+        the archive is.
+    """
+    try:
+        with ZipFile(archive) as zipped:
+            return sorted(
+                ArchivedModule(archive, member.filename, member.file_size)
+                for member in zipped.infolist()
+                if not member.is_dir()
+                and PurePosixPath(member.filename).suffix
+                in (*SOURCE_SUFFIXES, *BYTECODE_SUFFIXES)
+            )
+    except (BadZipFile, OSError) as error:
+        raise ArchiveError(f"Unable to read {archive}: {error}") from None
+
+
+##############################################################################
+def read_archived(module: ArchivedModule) -> bytes:
+    """Read the content of a module held within an archive.
+
+    Args:
+        module: The module to read.
+
+    Returns:
+        The content of the module.
+
+    Raises:
+        ArchiveError: If the module can't be read.
+
+    Notes:
+        Only the member of the archive that holds the module is read, the
+        archive isn't extracted.
+    """
+    try:
+        with ZipFile(module.archive) as zipped:
+            return zipped.read(module.member)
+    except (BadZipFile, KeyError, OSError) as error:
+        raise ArchiveError(f"Unable to read {module.path}: {error}") from None
+
+
+##############################################################################
+def analyse_archived_compiled(module: ArchivedModule) -> Analysis:
+    """Analyse a compiled Python file held within an archive.
+
+    Args:
+        module: The compiled module to analyse.
+
+    Returns:
+        The analysis of the compiled code.
+
+    Raises:
+        ArchiveError: If the module can't be read.
+        CompiledCodeError: If the module isn't compiled code that can be loaded.
+
+    Notes:
+        If the source of the module is also within the archive, and it is
+        what was compiled, the source is part of the analysis. As with
+        [`zipimport`][zipimport], the modification time of the source is
+        allowed to be out by a second.
+    """
+    try:
+        with ZipFile(module.archive) as zipped:
+            compiled = unmarshal_compiled(module.path, zipped.read(module.member))
+            try:
+                source = zipped.getinfo(
+                    compiled.source_path.relative_to(module.archive).as_posix()
+                )
+            except (KeyError, ValueError):
+                return analyse_compiled_code(compiled)
+            return analyse_compiled_code(
+                compiled,
+                zipped.read(source),
+                mktime((*source.date_time, 0, 0, -1)),
+                ZIP_MTIME_SLACK,
+            )
+    except (BadZipFile, KeyError, OSError) as error:
+        raise ArchiveError(f"Unable to read {module.path}: {error}") from None
+
+
+### archives.py ends here
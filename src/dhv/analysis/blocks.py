@@ -0,0 +1,596 @@
+"""Provides incremental analysis of code, one top-level block at a time."""
+
+##############################################################################
+# Python imports.
+import __future__
+
+from ast import ImportFrom, Module, increment_lineno
+from bisect import bisect_right
+from collections.abc import Iterator, Sequence
+from copy import deepcopy
+from dataclasses import replace
+from dis import Instruction, get_instructions
+from functools import partial
+from itertools import chain, islice
+from re import compile as compile_regexp
+from threading import Lock
+from token import COMMENT, DEDENT, ENDMARKER, INDENT, NEWLINE, NL
+from tokenize import TokenError, generate_tokens
+from types import CodeType
+from typing import Final
+
+##############################################################################
+# Local imports.
+from ..types import EditedLines
+from .lru import LRUCache
+from .model import (
+    Analysis,
+    Block,
+    CompilationFailed,
+    Compiler,
+    DisassembledCode,
+    compile_source,
+    disassemble,
+    source_key,
+)
+
+##############################################################################
+_CONTINUATIONS: Final[frozenset[str]] = frozenset(("else", "elif", "except", "finally"))
+"""Keywords that continue a top-level statement rather than start a new one."""
+_LOOKS_LIKE_A_STATEMENT: Final = compile_regexp(r"^(@|[^\W\d]\w*)")
+"""Regular expression for guessing that a line starts a top-level statement."""
+BLOCK_CACHE_SIZE: Final[int] = 4096
+"""The default number of blocks to keep analyses of."""
+
+
+##############################################################################
+def _guess_block_starts(lines: Sequence[str], start: int) -> Iterator[int]:
+    """Guess where top-level blocks start, without the help of the tokeniser.
+
+    Args:
+        lines: The lines of code.
+        start: The line to start looking from.
+
+    Yields:
+        The index of each line that looks like it starts a block.
+
+    Notes:
+        This is used to recover when the code can't be tokenised; it simply
+        looks for lines that start with what looks like the start of a
+        statement.
+    """
+    decorated = False
+    for line in range(start, len(lines)):
+        if match := _LOOKS_LIKE_A_STATEMENT.match(lines[line]):
+            if not decorated and match[0] not in _CONTINUATIONS:
+                yield line
+            decorated = match[0] == "@"
+
+
+##############################################################################
+def _block_starts(lines: Sequence[str], start: int) -> Iterator[tuple[int, bool]]:
+    """Find where the top-level blocks of some code start.
+
+    Args:
+        lines: The lines of code.
+        start: The line to start from; this must be the start of a block.
+
+    Yields:
+        The index of each line, after `start`, that starts a block, along
+        with a flag to say if it was found by tokenising the code (rather
+        than by guessing).
+    """
+    depth = 0
+    new_statement = True
+    decorated = False
+    last_start = start
+    readline = partial(next, islice(lines, start, None), "")
+    try:
+        for token in generate_tokens(readline):
+            if token.type == INDENT:
+                depth += 1
+            elif token.type == DEDENT:
+                depth -= 1
+            elif token.type == NEWLINE:
+                new_statement = True
+            elif token.type == ENDMARKER:
+                return
+            elif token.type not in (NL, COMMENT) and new_statement:
+                new_statement = False
+                if depth == 0:
+                    line = start + token.start[0] - 1
+                    if (
+                        line > start
+                        and not decorated
+                        and token.string not in _CONTINUATIONS
+                    ):
+                        yield (last_start := line), True
+                    decorated = token.string == "@"
+    except (TokenError, SyntaxError):
+        # Guess from the last good block on, so we know if it's decorated.
+        yield from (
+            (line, False)
+            for line in _guess_block_starts(lines, last_start)
+            if line > last_start
+        )
+
+
+##############################################################################
+def block_starts(lines: Sequence[str], start: int = 0) -> Iterator[int]:
+    """Find where the top-level blocks of some code start.
+
+    Args:
+        lines: The lines of code.
+        start: The line to start from; this must be the start of a block.
+
+    Yields:
+        The index of each line, after `start`, that starts a block.
+
+    Notes:
+        A block is a top-level statement, including any decorators and any
+        body it may have. Comments and blank lines that follow a statement
+        are considered to be part of it.
+
+        The lines are tokenised lazily, so a caller that stops consuming
+        the starts stops the work. If the code can't be tokenised a less
+        accurate approach is taken from the last good block onwards.
+    """
+    return (line for line, _ in _block_starts(lines, start))
+
+
+##############################################################################
+def _future_flags(ast: Module | None) -> int:
+    """Get the compiler flags for any `__future__` imports in some code.
+
+    Args:
+        ast: The AST of the code.
+
+    Returns:
+        The compiler flags for the `__future__` features that were imported.
+    """
+    flags = 0
+    if ast is not None:
+        for statement in ast.body:
+            if isinstance(statement, ImportFrom) and statement.module == "__future__":
+                for feature in statement.names:
+                    if feature.name in __future__.all_feature_names:
+                        flags |= getattr(__future__, feature.name).compiler_flag
+    return flags
+
+
+##############################################################################
+def _padded(text: str, first_line: int) -> str:
+    """Pad a top-level block of code so that it starts on the right line.
+
+    Args:
+        text: The text of the block.
+        first_line: The line the block starts on.
+
+    Returns:
+        The text, padded so that line numbers are correct from the start.
+    """
+    return f"{'\n' * (first_line - 1)}{text}"
+
+
+##############################################################################
+def analyse_block(
+    text: str,
+    first_line: int,
+    line_count: int,
+    flags: int = 0,
+    compiler: Compiler = compile_source,
+) -> Block:
+    """Analyse a top-level block of code.
+
+    Args:
+        text: The text of the block.
+        first_line: The line the block starts on.
+        line_count: The number of lines in the block.
+        flags: The compiler flags to compile the block with.
+        compiler: The function to parse and compile the block with.
+
+    Returns:
+        The analysis of the block.
+    """
+    try:
+        ast, code = compiler(_padded(text, first_line), flags)
+    except SyntaxError as error:
+        return Block(first_line, line_count, text, flags, error=error)
+    return Block(first_line, line_count, text, flags, ast, tuple(disassemble(code)))
+
+
+##############################################################################
+class _Immovable(Exception):
+    """Raised when code can't be relocated without compiling it again."""
+
+
+##############################################################################
+def _relocate_code(
+    code: CodeType, delta: int, relocated: dict[int, CodeType]
+) -> CodeType:
+    """Relocate a code object, and all the code within it, to different lines.
+
+    Args:
+        code: The code object to relocate.
+        delta: The number of lines to move the code by.
+        relocated: A map of original code object IDs to relocated code objects.
+
+    Returns:
+        The relocated code object.
+
+    Raises:
+        _Immovable: If the code can't be relocated.
+    """
+    constants = [
+        _relocate_code(constant, delta, relocated)
+        if isinstance(constant, CodeType)
+        else constant
+        for constant in code.co_consts
+    ]
+    if "__firstlineno__" in code.co_names:
+        # The body of a class records the line it starts on as a constant;
+        # that can only be moved if nothing else makes use of it too.
+        loads = [
+            instruction.arg
+            for instruction in get_instructions(code)
+            if instruction.opname in ("LOAD_CONST", "RETURN_CONST")
+            and instruction.argval == code.co_firstlineno
+        ]
+        if len(loads) != 1 or loads[0] is None:
+            raise _Immovable
+        constants[loads[0]] = code.co_firstlineno + delta
+    relocated[id(code)] = (
+        moved := code.replace(
+            # Module-level code always starts on the first line.
+            co_firstlineno=code.co_firstlineno
+            + (0 if code.co_name == "<module>" else delta),
+            co_consts=tuple(constants),
+        )
+    )
+    return moved
+
+
+##############################################################################
+def _relocate_instruction(
+    instruction: Instruction, delta: int, code: CodeType
+) -> Instruction:
+    """Relocate an instruction to a different line.
+
+    Args:
+        instruction: The instruction to relocate.
+        delta: The number of lines to move the instruction by.
+        code: The relocated code object the instruction belongs to.
+
+    Returns:
+        The relocated instruction.
+    """
+    line_number = instruction.line_number
+    positions = instruction.positions
+    argval = instruction.argval
+    argrepr = instruction.argrepr
+    if (
+        instruction.opname in ("LOAD_CONST", "RETURN_CONST")
+        and instruction.arg is not None
+        and code.co_consts[instruction.arg] is not argval
+    ):
+        argrepr = repr(argval := code.co_consts[instruction.arg])
+    return instruction._replace(
+        line_number=line_number + delta if line_number else line_number,
+        positions=positions
+        if positions is None or not positions.lineno
+        else positions._replace(
+            lineno=positions.lineno + delta,
+            end_lineno=None
+            if positions.end_lineno is None
+            else positions.end_lineno + delta,
+        ),
+        argval=argval,
+        argrepr=argrepr,
+    )
+
+
+##############################################################################
+def _relocate_ast(ast: Module, delta: int) -> Module:
+    """Relocate the AST of a block to a different line.
+
+    Args:
+        ast: The AST to relocate.
+        delta: The number of lines to move the AST by.
+
+    Returns:
+        A relocated copy of the AST.
+
+    Raises:
+        _Immovable: If the AST is too deep to be copied.
+    """
+    try:
+        return increment_lineno(deepcopy(ast), delta)
+    except RecursionError:
+        raise _Immovable from None
+
+
+##############################################################################
+def relocate_block(
+    block: Block, first_line: int, compiler: Compiler = compile_source
+) -> Block:
+    """Relocate the analysis of a block so that it starts on a different line.
+
+    Args:
+        block: The block to relocate.
+        first_line: The line the block should start on.
+        compiler: The function to parse and compile the block with, if it
+            has to be compiled again.
+
+    Returns:
+        The relocated block.
+
+    Notes:
+        The code objects, their disassembly, and the AST are moved rather
+        than the block being parsed and compiled again. A block
+        that failed to compile because of its complexity isn't compiled
+        again, as it would only fail again.
+    """
+    if (delta := first_line - block.first_line) == 0:
+        return block
+    if isinstance(block.error, CompilationFailed):
+        return replace(block, first_line=first_line)
+    if block.error is not None or not block.disassembly:
+        return analyse_block(
+            block.text, first_line, block.line_count, block.flags, compiler
+        )
+    relocated: dict[int, CodeType] = {}
+    try:
+        _relocate_code(block.disassembly[0].code, delta, relocated)
+        ast = None if block.ast is None else _relocate_ast(block.ast, delta)
+    except _Immovable:
+        return analyse_block(
+            block.text, first_line, block.line_count, block.flags, compiler
+        )
+    return Block(
+        first_line,
+        block.line_count,
+        block.text,
+        block.flags,
+        ast,
+        tuple(
+            DisassembledCode(
+                relocated[id(disassembly.code)],
+                tuple(
+                    _relocate_instruction(
+                        instruction, delta, relocated[id(disassembly.code)]
+                    )
+                    for instruction in disassembly.instructions
+                ),
+                disassembly.depth,
+            )
+            for disassembly in block.disassembly
+        ),
+    )
+
+
+##############################################################################
+def analysis_of_blocks(source: str, key: str, blocks: Sequence[Block]) -> Analysis:
+    """Make an analysis from the blocks of some code.
+
+    Args:
+        source: The code that was analysed.
+        key: The key for the source.
+        blocks: The blocks of the code.
+
+    Returns:
+        The analysis of the code.
+
+    Notes:
+        If none of the blocks could be compiled the analysis has no AST,
+        and has the error of the first block as its error.
+    """
+    good = [block for block in blocks if block.error is None]
+    return Analysis(
+        source,
+        key,
+        Module(
+            body=[
+                statement for block in good if block.ast for statement in block.ast.body
+            ],
+            type_ignores=[],
+        )
+        if good or not blocks
+        else None,
+        None,
+        tuple(disassembly for block in good for disassembly in block.disassembly),
+        None if good or not blocks else blocks[0].error,
+        tuple(blocks),
+    )
+
+
+##############################################################################
+class IncrementalAnalyser:
+    """Analyses code one top-level block at a time.
+
+    The analyser remembers the blocks of the code it last analysed, and
+    keeps a cache of the analysis of each block. When told which lines have
+    been edited since the last analysis, only the blocks that those edits
+    touched are split and compiled again; the blocks before them are used as
+    they are, and the blocks after them are moved to their new lines.
+
+    Note that, as each block is compiled as a module of its own, the result
+    is an approximation of the code that Python would compile for the code
+    as a whole; for example, each block has code to start and return of its
+    own, and names imported in one block aren't known to be module-level
+    imports when compiling another.
+    """
+
+    def __init__(
+        self, cache_size: int = BLOCK_CACHE_SIZE, compiler: Compiler = compile_source
+    ) -> None:
+        """Initialise the analyser.
+
+        Args:
+            cache_size: The maximum number of block analyses to keep.
+            compiler: The function to parse and compile blocks with.
+        """
+        self._key: str | None = None
+        """The key of the code that was last analysed."""
+        self._blocks: list[Block] = []
+        """The blocks of the code that was last analysed."""
+        self._guessed = False
+        """Were the starts of any of the blocks only guessed at?"""
+        self._cache: LRUCache[tuple[int, str], Block] = LRUCache(cache_size)
+        """The cache of block analyses, keyed on their flags and text."""
+        self._lock = Lock()
+        """Lock for access to the analyser's state."""
+        self._compiler = compiler
+        """The function to parse and compile blocks with."""
+
+    def _block(self, text: str, first_line: int, line_count: int, flags: int) -> Block:
+        """Get the analysis of a block of code.
+
+        Args:
+            text: The text of the block.
+            first_line: The line the block starts on.
+            line_count: The number of lines in the block.
+            flags: The compiler flags to compile the block with.
+
+        Returns:
+            The analysis of the block.
+        """
+        if (block := self._cache.get(key := (flags, text))) is None:
+            block = analyse_block(text, first_line, line_count, flags, self._compiler)
+        elif block.first_line != first_line:
+            block = relocate_block(block, first_line, self._compiler)
+        return self._cache.put(key, block)
+
+    def _adopt(self, analysis: Analysis) -> None:
+        """Adopt the blocks of an existing analysis.
+
+        Args:
+            analysis: The analysis to adopt the blocks of.
+        """
+        self._key = analysis.key
+        self._blocks = list(analysis.blocks)
+        # We've no idea how the blocks were found, so don't trust them.
+        self._guessed = True
+        for block in analysis.blocks:
+            self._cache.put((block.flags, block.text), block)
+
+    def _split(
+        self, lines: Sequence[str], edited: EditedLines | None
+    ) -> Iterator[tuple[int, int, Block | None]]:
+        """Split the code into blocks.
+
+        Args:
+            lines: The lines of the code.
+            edited: The lines that were edited since the last analysis.
+
+        Yields:
+            The first line and line count of each block, along with the
+            block from the last analysis that has the same text, if one is
+            known.
+
+        Notes:
+            If the starts of any of the last blocks were only guessed at,
+            the code is split from scratch, as an edit anywhere could
+            change where the blocks really start.
+        """
+        old = self._blocks
+        if edited is None or not old or self._guessed:
+            edited = None
+            start = 1
+        else:
+            # Start one block before the edit, in case the edit changed
+            # where that block ends; everything before that is unchanged.
+            index = max(
+                bisect_right([block.first_line for block in old], edited.first_line)
+                - 2,
+                0,
+            )
+            for block in old[:index]:
+                yield block.first_line, block.line_count, block
+            start = old[index].first_line
+
+        # Work out where the old blocks after the edit will now start, so
+        # that we can pick them up again once we get past the edit.
+        resume = (
+            {}
+            if edited is None
+            else {
+                block.first_line + edited.line_delta: index
+                for index, block in enumerate(old)
+                if block.first_line > edited.last_line - edited.line_delta
+            }
+        )
+
+        # Split from the start point until we run out of code, or until we
+        # get back to where the old blocks start. If the code stops being
+        # tokenisable (for example, because the edit opened a string that
+        # isn't closed), the starts of the blocks are only guesses, so
+        # we can't be sure the old blocks still stand; in that case the
+        # rest of the code is split again.
+        self._guessed = False
+        for next_start, tokenised in chain(
+            _block_starts(lines, start - 1), ((len(lines), True),)
+        ):
+            yield start, (next_start + 1) - start, None
+            start = next_start + 1
+            if not tokenised:
+                self._guessed = True
+            elif start in resume:
+                for block in old[resume[start] :]:
+                    yield start, block.line_count, block
+                    start += block.line_count
+                return
+
+    def analyse(
+        self,
+        source: str,
+        edited: EditedLines | None = None,
+        base: Analysis | None = None,
+        key: str | None = None,
+    ) -> Analysis:
+        """Analyse some code.
+
+        Args:
+            source: The code to analyse.
+            edited: The lines that were edited since `base` was analysed.
+            base: The analysis that the edits were made to.
+            key: The key for the source, if it is already known.
+
+        Returns:
+            The analysis of the code.
+
+        Notes:
+            If there is no `base`, or there's no idea of what was `edited`,
+            the code is split into blocks from scratch; even then any blocks
+            that were analysed before will come from the cache.
+        """
+        lines = source.splitlines(keepends=True)
+        with self._lock:
+            if base is None:
+                edited = None
+            elif base.key != self._key:
+                self._adopt(base)
+            flags = 0
+            blocks: list[Block] = []
+            for first_line, line_count, known in self._split(lines, edited):
+                if line_count < 1:
+                    continue
+                if known is not None and known.flags == flags:
+                    block = self._cache.put(
+                        (flags, known.text),
+                        relocate_block(known, first_line, self._compiler),
+                    )
+                else:
+                    block = self._block(
+                        "".join(lines[first_line - 1 : first_line - 1 + line_count]),
+                        first_line,
+                        line_count,
+                        flags,
+                    )
+                blocks.append(block)
+                flags |= _future_flags(block.ast)
+            self._blocks = blocks
+            self._key = key = source_key(source) if key is None else key
+        return analysis_of_blocks(source, key, blocks)
+
+
+### blocks.py ends here
@@ -0,0 +1,156 @@
+"""Provides in-memory caching of analyses."""
+
+##############################################################################
+# Local imports.
+from ..types import EditedLines
+from .blocks import IncrementalAnalyser
+from .disk_cache import DiskCache
+from .lru import LRUCache
+from .model import (
+    Analysis,
+    Compiler,
+    Parser,
+    analyse,
+    compile_source,
+    parse_source,
+    source_key,
+)
+
+
+##############################################################################
+class AnalysisCache(LRUCache[str, Analysis]):
+    """A cache of analyses, keyed on the source that was analysed."""
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_source_size: int | None = None,
+        disk_cache: DiskCache | None = None,
+        incremental_lines: int = 0,
+        compiler: Compiler = compile_source,
+        parser: Parser = parse_source,
+    ) -> None:
+        """Initialise the cache.
+
+        Args:
+            max_entries: The maximum number of analyses to hold.
+            max_source_size: The maximum total size of the source to hold.
+            disk_cache: An optional on-disk cache to back this cache.
+            incremental_lines: Source with more lines than this has edits
+                to it previewed a block at a time (0 to never do this).
+            compiler: The function to parse and compile the source with.
+            parser: The function to parse the source of analyses taken from
+                the on-disk cache with.
+        """
+        super().__init__(
+            max_entries, max_source_size, lambda analysis: len(analysis.source)
+        )
+        self._disk_cache = disk_cache
+        """The on-disk cache that backs this cache."""
+        self._incremental_lines = incremental_lines
+        """The number of lines above which edits are previewed a block at a time."""
+        self._compiler = compiler
+        """The function to parse and compile the source with."""
+        self._parser = parser
+        """The function to parse the source of analyses from the on-disk cache with."""
+        self._incremental = IncrementalAnalyser(compiler=compiler)
+        """The analyser used to analyse source a block at a time."""
+
+    def _is_large(self, source: str) -> bool:
+        """Is some source code large enough to be analysed a block at a time?
+
+        Args:
+            source: The source code to check.
+
+        Returns:
+            `True` if the source is large, `False` if not.
+        """
+        return bool(
+            self._incremental_lines and source.count("\n") >= self._incremental_lines
+        )
+
+    def _analyse(self, source: str, key: str) -> Analysis:
+        """Analyse some source code.
+
+        Args:
+            source: The source code to analyse.
+            key: The key for the source.
+
+        Returns:
+            The analysis of the source code.
+
+        Notes:
+            If large source can't be compiled as a whole, it's analysed a
+            block at a time instead, so that the errors can be shown in
+            place while the rest of the code is still disassembled.
+        """
+        analysis = analyse(source, key, self._compiler)
+        if analysis.error is not None and self._is_large(source):
+            return self._incremental.analyse(source, key=key)
+        return analysis
+
+    def preview_of(
+        self, source: str, edited: EditedLines, base: Analysis | None
+    ) -> Analysis | None:
+        """Get a quick preview of the analysis of some edited source code.
+
+        Args:
+            source: The source code to get the preview of.
+            edited: The lines that were edited since `base` was analysed.
+            base: The analysis that the edits were made to.
+
+        Returns:
+            The preview of the analysis, or `None` if the source is small
+            enough that it may as well be fully analysed.
+
+        Notes:
+            Source with more lines than the incremental threshold is
+            previewed by analysing it one top-level block at a time, with
+            `edited` being used to work out which blocks need analysing
+            again. The result is
+            [approximate][dhv.analysis.Analysis.approximate]; once the
+            editing is done the source should be fully analysed with
+            [`analysis_of`][dhv.analysis.AnalysisCache.analysis_of]. If the
+            full analysis is already to hand, it's the preview.
+        """
+        if not self._is_large(source):
+            return None
+        if (analysis := self.get(key := source_key(source))) is not None:
+            return analysis
+        return self._incremental.analyse(source, edited, base, key)
+
+    def analysis_of(self, source: str, persist: bool = False) -> Analysis:
+        """Get the analysis of some source code.
+
+        Args:
+            source: The source code to get the analysis of.
+            persist: Should the on-disk cache be used for the analysis?
+
+        Returns:
+            The analysis of the source code.
+
+        Notes:
+            If the source has been analysed before, and the analysis is
+            still in the cache, the cached analysis is returned; otherwise
+            the source is analysed and the result is cached.
+
+            The on-disk cache is only worth using for source that is likely
+            to be seen again, such as the content of a file; it isn't used
+            for source that is being edited unless `persist` is `True`.
+            An analysis taken from the on-disk cache has its source parsed
+            again here, so that its AST is ready before it's handed back.
+        """
+        if (analysis := self.get(key := source_key(source))) is None:
+            disk_cache = self._disk_cache if persist else None
+            if disk_cache is not None and (
+                analysis := disk_cache.get(key, source, self._parser)
+            ):
+                self.put(key, analysis)
+            else:
+                analysis = self.put(key, self._analyse(source, key))
+                if disk_cache is not None:
+                    disk_cache.put(analysis)
+        return analysis
+
+
+### cache.py ends here
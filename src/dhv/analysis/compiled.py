@@ -0,0 +1,328 @@
+"""Provides the analysis of compiled Python code."""
+
+##############################################################################
+# Python imports.
+from ast import parse
+from hashlib import sha256
+from importlib.util import MAGIC_NUMBER, decode_source, source_from_cache, source_hash
+from marshal import loads
+from mmap import ACCESS_READ, mmap
+from os import fstat
+from pathlib import Path
+from sys import version
+from types import CodeType
+from typing import Final, NamedTuple
+
+##############################################################################
+# Local imports.
+from .model import Analysis, disassemble, source_key
+
+##############################################################################
+HEADER_SIZE: Final[int] = 16
+"""The size of the header at the start of a compiled Python file."""
+MMAP_THRESHOLD: Final[int] = 1024 * 1024
+"""The size of compiled file, in bytes, above which it is memory-mapped."""
+COMPILED_SUFFIXES: Final[tuple[str, ...]] = (".pyc",)
+"""The suffixes of compiled Python files."""
+_HASH_BASED: Final[int] = 0b01
+"""The header flag that says the file is validated with a hash of its source."""
+_KNOWN_FLAGS: Final[int] = 0b11
+"""All of the header flags that are known."""
+
+
+##############################################################################
+class CompiledCodeError(Exception):
+    """Raised when a compiled Python file can't be loaded."""
+
+
+##############################################################################
+class CompiledCode(NamedTuple):
+    """The code loaded from a compiled Python file."""
+
+    path: Path
+    """The path to the compiled file."""
+    code: CodeType
+    """The code object held in the file."""
+    flags: int
+    """The flags from the header of the file."""
+    validation: bytes
+    """The part of the header used to check the file against its source."""
+    key: str
+    """The key that identifies the content of the file."""
+
+    @property
+    def hash_based(self) -> bool:
+        """Is the file checked against its source with a hash of the source?"""
+        return bool(self.flags & _HASH_BASED)
+
+    @property
+    def source_path(self) -> Path:
+        """The path to the source the file was compiled from."""
+        try:
+            return Path(source_from_cache(str(self.path)))
+        except ValueError:
+            # It's not in a __pycache__ directory, so assume it's a
+            # "legacy" compiled file that sits next to its source.
+            return self.path.with_suffix(".py")
+
+    def is_compiled_from(self, source: bytes, mtime: float, slack: int = 0) -> bool:
+        """Does the file hold the compiled form of the given source?
+
+        Args:
+            source: The content of the source file.
+            mtime: The modification time of the source file.
+            slack: How many seconds the modification time can be out by.
+
+        Returns:
+            `True` if the header of the file agrees with the source, `False`
+            if not.
+        """
+        if self.hash_based:
+            return self.validation == source_hash(source)
+        return int.from_bytes(self.validation[4:], "little") == (
+            len(source) & 0xFFFFFFFF
+        ) and (
+            abs(
+                int.from_bytes(self.validation[:4], "little")
+                - (int(mtime) & 0xFFFFFFFF)
+            )
+            <= slack
+        )
+
+
+##############################################################################
+def unmarshal_compiled(path: Path, data: bytes | mmap) -> CompiledCode:
+    """Unmarshal the code held in the content of a compiled file.
+
+    Args:
+        path: The path to the compiled file.
+        data: The content of the compiled file.
+
+    Returns:
+        The code loaded from the file.
+
+    Raises:
+        CompiledCodeError: If the content isn't compiled code that this
+            version of Python can load.
+    """
+    if len(data) < HEADER_SIZE:
+        raise CompiledCodeError(f"{path} is too short to be compiled Python code")
+    if (magic := data[:4]) != MAGIC_NUMBER:
+        raise CompiledCodeError(
+            f"{path} was compiled by a different version of Python"
+            if magic[2:] == b"\r\n"
+            else f"{path} isn't compiled Python code"
+        )
+    if (flags := int.from_bytes(data[4:8], "little")) & ~_KNOWN_FLAGS:
+        raise CompiledCodeError(f"{path} has an invalid header")
+    try:
+        with memoryview(data)[HEADER_SIZE:] as body:
+            code = loads(body)
+    except (EOFError, TypeError, ValueError) as error:
+        raise CompiledCodeError(f"{path} holds bad data: {error}") from None
+    if not isinstance(code, CodeType):
+        raise CompiledCodeError(f"{path} doesn't hold a code object")
+    key = sha256(f"{version}\0".encode())
+    key.update(data)
+    return CompiledCode(path, code, flags, bytes(data[8:HEADER_SIZE]), key.hexdigest())
+
+
+##############################################################################
+def load_compiled(path: Path) -> CompiledCode:
+    """Load the code from a compiled Python file.
+
+    Args:
+        path: The path to the compiled file.
+
+    Returns:
+        The code loaded from the file.
+
+    Raises:
+        CompiledCodeError: If the file can't be read, or doesn't hold code
+            that this version of Python can load.
+
+    Notes:
+        The code is unmarshalled straight from the file, it isn't compiled
+        again. Files larger than `MMAP_THRESHOLD` are memory-mapped rather
+        than read into memory.
+    """
+    try:
+        with path.open("rb") as compiled:
+            if fstat(compiled.fileno()).st_size < MMAP_THRESHOLD:
+                return unmarshal_compiled(path, compiled.read())
+            with mmap(compiled.fileno(), 0, access=ACCESS_READ) as data:
+                return unmarshal_compiled(path, data)
+    except OSError as error:
+        raise CompiledCodeError(str(error)) from None
+
+
+##############################################################################
+def analyse_compiled_code(
+    compiled: CompiledCode,
+    source: bytes | None = None,
+    source_mtime: float = 0,
+    mtime_slack: int = 0,
+) -> Analysis:
+    """Analyse some compiled code.
+
+    Args:
+        compiled: The compiled code to analyse.
+        source: The content of the source the code was compiled from, if known.
+        source_mtime: The modification time of the source.
+        mtime_slack: How many seconds the modification time can be out by.
+
+    Returns:
+        The analysis of the compiled code.
+
+    Notes:
+        If the source is what was compiled (as checked with the header of
+        the compiled file), the source and its abstract syntax tree are
+        part of the analysis.
+    """
+    text, ast = "", None
+    if source is not None and compiled.is_compiled_from(
+        source, source_mtime, mtime_slack
+    ):
+        try:
+            ast = parse(text := decode_source(source))
+        except (SyntaxError, UnicodeDecodeError, ValueError):
+            text, ast = "", None
+    return Analysis(
+        text,
+        compiled.key,
+        ast,
+        compiled.code,
+        tuple(disassemble(compiled.code)),
+    )
+
+
+##############################################################################
+def analyse_compiled(path: Path) -> Analysis:
+    """Analyse a compiled Python file.
+
+    Args:
+        path: The path to the compiled file.
+
+    Returns:
+        The analysis of the compiled code.
+
+    Raises:
+        CompiledCodeError: If the file can't be loaded.
+
+    Notes:
+        If the source the file was compiled from can be found, and it hasn't
+        changed since it was compiled, the source and its abstract syntax
+        tree are part of the analysis.
+    """
+    compiled = load_compiled(path)
+    try:
+        with compiled.source_path.open("rb") as source_file:
+            source = source_file.read()
+            mtime = fstat(source_file.fileno()).st_mtime
+    except OSError:
+        return analyse_compiled_code(compiled)
+    return analyse_compiled_code(compiled, source, mtime)
+
+
+##############################################################################
+def analyse_with_compiled(
+    source_path: Path, compiled_path: Path | None
+) -> tuple[str, Analysis | None]:
+    """Read some Python source, analysing it with its compiled code if possible.
+
+    Args:
+        source_path: The path to the source file.
+        compiled_path: The path to where the source's compiled code is cached.
+
+    Returns:
+        The source, and its analysis if the compiled code could be used.
+
+    Raises:
+        OSError: If the source can't be read.
+        SyntaxError: If the source has a bad encoding declaration.
+        UnicodeDecodeError: If the source can't be decoded.
+
+    Notes:
+        The compiled code is only used if the header of the compiled file
+        says that it was compiled from the source as it is now; in that
+        case the source is parsed, for its abstract syntax tree, but isn't
+        compiled again. If the compiled code can't be used, the source
+        should be analysed as normal.
+    """
+    text = decode_source(source := source_path.read_bytes())
+    if compiled_path is None:
+        return text, None
+    try:
+        compiled = load_compiled(compiled_path)
+        if not compiled.is_compiled_from(source, source_path.stat().st_mtime):
+            return text, None
+        ast = parse(text)
+    except (CompiledCodeError, OSError, SyntaxError, ValueError):
+        return text, None
+    return text, Analysis(
+        text,
+        source_key(text),
+        ast,
+        compiled.code,
+        tuple(disassemble(compiled.code)),
+    )
+
+
+##############################################################################
+def compiled_files(directory: Path) -> list[Path]:
+    """Find the compiled Python files within a directory.
+
+    Args:
+        directory: The directory to look in.
+
+    Returns:
+        The paths of the compiled files within the directory, in order.
+    """
+    return sorted(
+        path
+        for path in directory.iterdir()
+        if path.suffix in COMPILED_SUFFIXES and path.is_file()
+    )
+
+
+##############################################################################
+def analyse_compiled_directory(
+    directory: Path,
+) -> tuple[Analysis, list[CompiledCodeError]]:
+    """Analyse all of the compiled Python files within a directory.
+
+    Args:
+        directory: The directory, such as a `__pycache__` directory.
+
+    Returns:
+        The analysis of all of the code that could be loaded, and the errors
+        for any of the files that couldn't be loaded.
+
+    Notes:
+        The module code of each file is renamed after the file, so that each
+        module can be told apart within the disassembly. There's no source
+        for the analysis.
+    """
+    loaded: list[CompiledCode] = []
+    errors: list[CompiledCodeError] = []
+    for path in compiled_files(directory):
+        try:
+            loaded.append(load_compiled(path))
+        except CompiledCodeError as error:
+            errors.append(error)
+    return Analysis(
+        "",
+        sha256("\0".join(compiled.key for compiled in loaded).encode()).hexdigest(),
+        disassembly=tuple(
+            disassembly
+            for compiled in loaded
+            for disassembly in disassemble(
+                compiled.code.replace(
+                    co_qualname=f"<module {compiled.path.name.partition('.')[0]}>"
+                )
+            )
+        ),
+    ), errors
+
+
+### compiled.py ends here
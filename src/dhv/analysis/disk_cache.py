@@ -0,0 +1,242 @@
+"""Provides a persistent, on-disk, cache of analyses."""
+
+##############################################################################
+# Python imports.
+import builtins
+from contextlib import suppress
+from dis import Instruction, Positions
+from importlib.util import MAGIC_NUMBER
+from marshal import dumps, loads
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from types import CodeType
+from typing import Any, Final
+
+##############################################################################
+# Local imports.
+from .model import Analysis, DisassembledCode, Parser, parse_source
+
+##############################################################################
+_HEADER: Final[bytes] = MAGIC_NUMBER + b"DHV\x03"
+"""The header for a cache file."""
+_SUFFIX: Final[str] = ".dhvc"
+"""The suffix for a cache file."""
+_EVICT_INTERVAL: Final[int] = 32
+"""The number of analyses put into the cache between evictions."""
+_ARGVAL: Final[int] = Instruction._fields.index("argval")
+"""The location of the argument value within an instruction."""
+_POSITIONS: Final[int] = Instruction._fields.index("positions")
+"""The location of the positions within an instruction."""
+
+
+##############################################################################
+def _pack(instruction: Instruction) -> tuple[Any, ...]:
+    """Pack an instruction into a form that can be marshalled.
+
+    Args:
+        instruction: The instruction to pack.
+
+    Returns:
+        The packed instruction.
+
+    Notes:
+        Some instructions (`CONVERT_VALUE` for example) have a builtin
+        function as their argument value; these can't be marshalled so
+        they are packed by name and looked up again when unpacked.
+    """
+    packed = list(instruction)
+    builtin: str | None = None
+    if callable(argval := instruction.argval) and not isinstance(argval, CodeType):
+        if getattr(builtins, builtin := argval.__name__, None) is not argval:
+            raise ValueError(f"Unable to pack the argument of {instruction.opname}")
+        packed[_ARGVAL] = None
+    if instruction.positions is not None:
+        packed[_POSITIONS] = tuple(instruction.positions)
+    return (builtin, *packed)
+
+
+##############################################################################
+def _unpack(packed: tuple[Any, ...]) -> Instruction:
+    """Unpack an instruction that was packed with `_pack`.
+
+    Args:
+        packed: The packed instruction.
+
+    Returns:
+        The instruction.
+    """
+    builtin, *unpacked = packed
+    if builtin is not None:
+        unpacked[_ARGVAL] = getattr(builtins, builtin)
+    if unpacked[_POSITIONS] is not None:
+        unpacked[_POSITIONS] = Positions(*unpacked[_POSITIONS])
+    return Instruction._make(unpacked)
+
+
+##############################################################################
+class DiskCache:
+    """A size-limited, on-disk, cache of analyses.
+
+    The compiled code and the disassembly of each code object within it are
+    marshalled to disk, keyed on the [key of the source][dhv.analysis.source_key]
+    that was analysed.
+    """
+
+    def __init__(self, location: Path, max_size: int) -> None:
+        """Initialise the cache.
+
+        Args:
+            location: The directory that holds the cache.
+            max_size: The maximum size, in bytes, of the cache.
+        """
+        self._location = location
+        """The directory that holds the cache."""
+        self._max_size = max_size
+        """The maximum size, in bytes, of the cache."""
+        self._puts = 0
+        """The number of analyses put into the cache."""
+
+    def _file_for(self, key: str) -> Path:
+        """Get the cache file for the given key.
+
+        Args:
+            key: The key to get the file for.
+
+        Returns:
+            The path to the cache file.
+        """
+        return self._location / f"{key}{_SUFFIX}"
+
+    def get(
+        self, key: str, source: str, parser: Parser = parse_source
+    ) -> Analysis | None:
+        """Get an analysis from the cache.
+
+        Args:
+            key: The key of the source.
+            source: The source that was analysed.
+            parser: The function to parse the source with.
+
+        Returns:
+            The analysis, or `None` if it isn't in the cache.
+
+        Notes:
+            The AST isn't kept in the cache; the source is parsed again
+            when the analysis is taken out of the cache. If it can't be
+            parsed, the analysis is treated as not being in the cache.
+        """
+        try:
+            data = (cache_file := self._file_for(key)).read_bytes()
+        except OSError:
+            return None
+        try:
+            if not data.startswith(_HEADER):
+                raise ValueError("Not a DHV cache file")
+            disassembly = tuple(
+                DisassembledCode(
+                    code, tuple(_unpack(packed) for packed in instructions), depth
+                )
+                for code, depth, instructions in loads(data[len(_HEADER) :])
+            )
+            code = disassembly[0].code
+        except (ValueError, EOFError, TypeError, IndexError, AttributeError):
+            with suppress(OSError):
+                cache_file.unlink()
+            return None
+        if (ast := parser(source)) is None:
+            return None
+        # Mark the file as recently used, for the sake of eviction.
+        with suppress(OSError):
+            cache_file.touch()
+        return Analysis(source, key, ast, code, disassembly)
+
+    def put(self, analysis: Analysis) -> None:
+        """Put an analysis into the cache.
+
+        Args:
+            analysis: The analysis to cache.
+
+        Notes:
+            Analyses that resulted in any sort of error aren't cached, nor
+            are [approximate][dhv.analysis.Analysis.approximate] analyses,
+            nor analyses that are missing their AST (as happens if the AST
+            is too deep to be handed back from an isolated compiler), as
+            the AST is parsed again when it's needed.
+
+            The least-recently-used entries are evicted, to keep the cache
+            within its size, on the first put and then every so many puts
+            after that; between evictions the cache may grow a little
+            beyond its size.
+        """
+        if (
+            analysis.errors
+            or analysis.approximate
+            or not analysis.disassembly
+            or analysis.ast is None
+        ):
+            return
+        try:
+            data = _HEADER + dumps(
+                tuple(
+                    (
+                        disassembly.code,
+                        disassembly.depth,
+                        tuple(
+                            _pack(instruction)
+                            for instruction in disassembly.instructions
+                        ),
+                    )
+                    for disassembly in analysis.disassembly
+                )
+            )
+        except ValueError:
+            # Something in there can't be marshalled, so don't cache it.
+            return
+        if len(data) > self._max_size:
+            return
+        temporary: Path | None = None
+        try:
+            self._location.mkdir(parents=True, exist_ok=True)
+            with NamedTemporaryFile(
+                "wb", dir=self._location, suffix=".tmp", delete=False
+            ) as cache_file:
+                temporary = Path(cache_file.name)
+                cache_file.write(data)
+            temporary.replace(self._file_for(analysis.key))
+        except OSError:
+            if temporary is not None:
+                with suppress(OSError):
+                    temporary.unlink()
+            return
+        if self._puts % _EVICT_INTERVAL == 0:
+            self._evict()
+        self._puts += 1
+
+    def _evict(self) -> None:
+        """Evict the least-recently-used entries until the cache fits its size."""
+        entries: list[tuple[float, int, Path]] = []
+        for cache_file in self._location.glob(f"*{_SUFFIX}"):
+            with suppress(OSError):
+                entries.append(
+                    (
+                        (stat := cache_file.stat()).st_mtime,
+                        stat.st_size,
+                        cache_file,
+                    )
+                )
+        size = sum(entry[1] for entry in entries)
+        for _, file_size, cache_file in sorted(entries, key=lambda entry: entry[0]):
+            if size <= self._max_size:
+                break
+            with suppress(OSError):
+                cache_file.unlink()
+                size -= file_size
+
+    def clear(self) -> None:
+        """Clear the cache."""
+        for cache_file in self._location.glob(f"*{_SUFFIX}"):
+            with suppress(OSError):
+                cache_file.unlink()
+
+
+### disk_cache.py ends here
@@ -0,0 +1,81 @@
+"""Provides stable identities for disassembled code objects."""
+
+##############################################################################
+# Python imports.
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from types import CodeType
+from typing import NamedTuple
+
+##############################################################################
+# Local imports.
+from .model import DisassembledCode
+
+
+##############################################################################
+class CodeIdentity(NamedTuple):
+    """The identity of a disassembled code object."""
+
+    key: str
+    """The key that identifies the code object."""
+    children: dict[int, str]
+    """The keys of the code objects used by the code, keyed on their IDs."""
+
+
+##############################################################################
+def code_name(code: CodeType, first_line: int | None = None) -> str:
+    """Get a short, human-friendly, name for a code object.
+
+    Args:
+        code: The code object to name.
+        first_line: The line to use as the first line of the code.
+
+    Returns:
+        The name of the code object.
+    """
+    return f"{code.co_qualname}:{code.co_firstlineno if first_line is None else first_line}"
+
+
+##############################################################################
+def code_identities(
+    disassembly: Iterable[DisassembledCode], first_line: int | None = None
+) -> Iterator[CodeIdentity]:
+    """Get stable identities for some disassembled code.
+
+    Args:
+        disassembly: The disassembled code, as made by [`disassemble`][dhv.analysis.disassemble].
+        first_line: The line to use as the first line of the top-level code.
+
+    Yields:
+        The identity of each of the disassembled code objects, in order.
+        Note that the children of an identity are only all known once the
+        code objects nested within it have been yielded.
+
+    Notes:
+        Unlike the ID of a code object, the key of a code object survives
+        the code being compiled again; it is made from the qualified name
+        and first line of the code object along with the keys of the code
+        objects it is nested within. Code objects that would otherwise end
+        up with the same key are told apart by the order they're found in.
+    """
+    parents: list[CodeIdentity] = []
+    seen: Counter[str] = Counter()
+    for code in disassembly:
+        del parents[code.depth :]
+        key = "/".join(
+            (
+                *(parent.key for parent in parents[-1:]),
+                code_name(code.code, None if code.depth else first_line),
+            )
+        )
+        seen[key] += 1
+        if seen[key] > 1:
+            key = f"{key}#{seen[key] - 1}"
+        identity = CodeIdentity(key, {})
+        if parents:
+            parents[-1].children.setdefault(id(code.code), key)
+        parents.append(identity)
+        yield identity
+
+
+### identity.py ends here
@@ -0,0 +1,288 @@
+"""Provides compilation of code in a process of its own."""
+
+##############################################################################
+# Python imports.
+from ast import Module, PyCF_ONLY_AST
+from contextlib import redirect_stderr, suppress
+from marshal import dumps as marshal_code
+from marshal import loads as unmarshal_code
+from multiprocessing import get_context
+from multiprocessing.connection import Connection
+from multiprocessing.process import BaseProcess
+from os import devnull
+from pickle import dumps, loads
+from threading import Lock
+from types import CodeType
+from typing import Any, Final
+
+##############################################################################
+# Local imports.
+from .model import CompilationFailed, compile_source, parse_source
+from .processes import start_resource_tracker
+
+##############################################################################
+COMPILE_TIMEOUT: Final[float] = 10.0
+"""The default time, in seconds, that compiling some code may take."""
+COMPILE_MEMORY_LIMIT: Final[int] = 1024 * 1024 * 1024
+"""The default amount of memory, in bytes, the compiling process may use."""
+
+
+##############################################################################
+def _limit_memory(limit: int) -> None:
+    """Limit the memory that the current process can use.
+
+    Args:
+        limit: The limit, in bytes, or `0` for no limit.
+
+    Notes:
+        Limiting memory isn't possible everywhere (Windows, for example);
+        where it isn't, there's no limit.
+    """
+    if limit:
+        with suppress(ImportError, OSError, ValueError):
+            from resource import RLIMIT_AS, setrlimit
+
+            setrlimit(RLIMIT_AS, (limit, limit))
+
+
+##############################################################################
+def _pickled(ast: Module | None) -> bytes | None:
+    """Pickle an AST, so that it can be handed back from the compiling process.
+
+    Args:
+        ast: The AST to pickle.
+
+    Returns:
+        The pickled AST, or `None` if there's no AST or it's too deep to pickle.
+    """
+    if ast is None:
+        return None
+    try:
+        return dumps(ast)
+    except RecursionError:
+        return None
+
+
+##############################################################################
+def _serve(connection: Connection, memory_limit: int) -> None:
+    """Compile the code sent over a connection, until the connection closes.
+
+    Args:
+        connection: The connection to receive code and send results over.
+        memory_limit: The limit, in bytes, on the memory the process may use.
+
+    Notes:
+        For each source and set of compiler flags received, one of these is
+        sent back:
+
+        - `("compiled", code, ast)`, with the code marshalled and the AST
+          pickled (or `None` if it's too deep to be pickled).
+        - `("parsed", ast)`, with the AST pickled (or `None` if the code
+          can't be parsed), if the flags ask for the code to only be
+          parsed.
+        - `("invalid", error)`, with the `SyntaxError` for invalid code.
+        - `("failed", reason, message)` if the code couldn't be compiled
+          for any other reason.
+    """
+    # The process shares the terminal with the application, so anything
+    # that goes badly wrong here mustn't be reported there; the application
+    # will see the connection close and report it instead.
+    with open(devnull, "w") as quiet, redirect_stderr(quiet):
+        _limit_memory(memory_limit)
+        with suppress(EOFError, OSError, MemoryError, RecursionError):
+            while True:
+                source, flags = connection.recv()
+                if flags & PyCF_ONLY_AST:
+                    connection.send(("parsed", _pickled(parse_source(source))))
+                    continue
+                try:
+                    ast, code = compile_source(source, flags)
+                    compiled = marshal_code(code)
+                except CompilationFailed as error:
+                    connection.send(("failed", error.reason, error.msg))
+                    continue
+                except SyntaxError as error:
+                    connection.send(("invalid", error))
+                    continue
+                except ValueError as error:
+                    # marshal gives up on code that is nested too deeply.
+                    connection.send(("failed", "recursion", str(error)))
+                    continue
+                connection.send(("compiled", compiled, _pickled(ast)))
+
+
+##############################################################################
+class IsolatedCompiler:
+    """Compiles code in a process of its own, with limits on time and memory.
+
+    The process is started when it's first needed and kept for compiling
+    more code. Should compiling take too long, or the process die (for
+    example because it ran out of memory), the process is stopped and a
+    [`CompilationFailed`][dhv.analysis.CompilationFailed] error is raised;
+    a new process is started for the next compilation.
+
+    An instance of this class can be used anywhere a
+    [`Compiler`][dhv.analysis.Compiler] is needed.
+    """
+
+    def __init__(
+        self,
+        timeout: float = COMPILE_TIMEOUT,
+        memory_limit: int = COMPILE_MEMORY_LIMIT,
+    ) -> None:
+        """Initialise the compiler.
+
+        Args:
+            timeout: The time, in seconds, that compiling some code may take.
+            memory_limit: The memory, in bytes, the compiling process may use
+                (`0` for no limit).
+        """
+        self._timeout = timeout
+        """The time, in seconds, that compiling some code may take."""
+        self._memory_limit = memory_limit
+        """The memory, in bytes, that the compiling process may use."""
+        self._process: BaseProcess | None = None
+        """The process that compiles the code, if it's running."""
+        self._connection: Connection | None = None
+        """The connection to the process that compiles the code."""
+        self._lock = Lock()
+        """Lock for access to the compiling process."""
+
+    def _start(self) -> Connection:
+        """Start the process that compiles the code.
+
+        Returns:
+            The connection to the process.
+
+        Notes:
+            The process is spawned rather than forked, as the caller is
+            likely to have threads of its own running.
+        """
+        start_resource_tracker()
+        context = get_context("spawn")
+        connection, served = context.Pipe()
+        self._process = context.Process(
+            target=_serve, args=(served, self._memory_limit), daemon=True
+        )
+        self._process.start()
+        served.close()
+        self._connection = connection
+        return connection
+
+    def _stop(self) -> None:
+        """Stop the process that compiles the code."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+        if self._process is not None:
+            self._process.kill()
+            self._process.join()
+            self._process = None
+
+    def close(self) -> None:
+        """Stop compiling code, stopping the compiling process."""
+        with self._lock:
+            self._stop()
+
+    @staticmethod
+    def _tree(tree: bytes | None) -> Module | None:
+        """Unpickle the AST handed back by the compiling process.
+
+        Args:
+            tree: The pickled AST, or `None` if there isn't one.
+
+        Returns:
+            The AST, or `None` if there isn't one or it's too deep to unpickle.
+        """
+        if tree is None:
+            return None
+        try:
+            ast: Module = loads(tree)
+        except RecursionError:
+            return None
+        return ast
+
+    def _request(self, source: str, flags: int) -> tuple[Any, ...]:
+        """Send some source to the compiling process, and wait for the result.
+
+        Args:
+            source: The source code to send.
+            flags: The compiler flags to send with it.
+
+        Returns:
+            The result sent back by the compiling process.
+
+        Raises:
+            CompilationFailed: If the process took too long, or stopped.
+        """
+        with self._lock:
+            connection = self._connection or self._start()
+            try:
+                connection.send((source, flags))
+                if not connection.poll(self._timeout):
+                    self._stop()
+                    raise CompilationFailed(
+                        f"Compiling took longer than {self._timeout:g} seconds",
+                        "timeout",
+                    )
+                result: tuple[Any, ...] = connection.recv()
+            except (EOFError, OSError):
+                self._stop()
+                raise CompilationFailed(
+                    "Compiling stopped unexpectedly; the code may need"
+                    " more memory than is allowed",
+                    "crashed",
+                ) from None
+        return result
+
+    def __call__(self, source: str, flags: int = 0) -> tuple[Module | None, CodeType]:
+        """Parse and compile some source code.
+
+        Args:
+            source: The source code to compile.
+            flags: The compiler flags to compile the code with.
+
+        Returns:
+            The AST of the source, or `None` if it's too deep to be handed
+            back, and the compiled code.
+
+        Raises:
+            SyntaxError: If the code can't be compiled.
+            CompilationFailed: If compiling took too long, used too much
+                memory, or the code is too complex to compile.
+        """
+        match self._request(source, flags & ~PyCF_ONLY_AST):
+            case ("compiled", code, tree):
+                return self._tree(tree), unmarshal_code(code)
+            case ("invalid", error):
+                raise error
+            case ("failed", reason, message):
+                raise CompilationFailed(message, reason)
+        raise CompilationFailed("Compiling gave an unexpected result", "crashed")
+
+    def parse(self, source: str) -> Module | None:
+        """Parse some source code.
+
+        Args:
+            source: The source code to parse.
+
+        Returns:
+            The AST of the source, or `None` if it can't be parsed, is too
+            deep to be handed back, or parsing took too long or used too
+            much memory.
+
+        Notes:
+            This can be used anywhere a [`Parser`][dhv.analysis.Parser] is
+            needed.
+        """
+        try:
+            result = self._request(source, PyCF_ONLY_AST)
+        except CompilationFailed:
+            return None
+        match result:
+            case ("parsed", tree):
+                return self._tree(tree)
+        return None
+
+
+### isolated.py ends here
@@ -0,0 +1,304 @@
+"""Provides a listing of disassembled code, free of any user interface."""
+
+##############################################################################
+# Python imports.
+from collections import Counter
+from collections.abc import Collection, Iterator, Sequence
+from dis import Instruction, opname
+from statistics import median_high
+from types import CodeType
+from typing import Final, NamedTuple
+
+##############################################################################
+# Local imports.
+from .identity import code_identities, code_name
+from .model import Analysis, DisassembledCode
+
+##############################################################################
+LINE_NUMBER_WIDTH: Final[int] = 6
+"""Width for line numbers."""
+OFFSET_WIDTH: Final[int] = 4
+"""The width of the display of the offset."""
+OPNAME_WIDTH: Final[int] = median_high(len(operation) for operation in opname) + 10
+"""The default width to use for opcode names."""
+
+
+##############################################################################
+class DisplaySettings(NamedTuple):
+    """The settings that control how operations are displayed."""
+
+    opname_width: int = OPNAME_WIDTH
+    """The width of the opname column."""
+    show_offset: bool = False
+    """Show the offset of each operation?"""
+    show_opcode: bool = False
+    """Show the opcode of each operation?"""
+
+
+##############################################################################
+def operation_line_number(operation: Instruction) -> str:
+    """Get the line number to show for an operation.
+
+    Args:
+        operation: The operation to get the line number for.
+
+    Returns:
+        The line number, or an empty string if the operation doesn't start
+        a line.
+    """
+    return (
+        str(operation.line_number)
+        if operation.line_number is not None and operation.starts_line
+        else ""
+    )
+
+
+##############################################################################
+def operation_argument(operation: Instruction) -> str:
+    """Get the text of the argument to show for an operation.
+
+    Args:
+        operation: The operation to get the argument for.
+
+    Returns:
+        The text of the argument.
+    """
+    return (
+        f"code@{code_name(operation.argval)}"
+        if isinstance(operation.argval, CodeType)
+        # With Python 3.14, LOAD_SMALL_INT at least has no populated
+        # argrepr value despite having a value, so here we use argrepr
+        # if it has a value, and if not we repr any non-None argval.
+        # This could result in a false negative I guess, but I'd hope
+        # that mostly argrepr does the right thing.
+        else operation.argrepr
+        or (repr(operation.argval) if operation.argval is not None else "")
+    )
+
+
+##############################################################################
+def format_operation(operation: Instruction, settings: DisplaySettings) -> str:
+    """Format an operation as plain text.
+
+    Args:
+        operation: The operation to format.
+        settings: The settings to format the operation with.
+
+    Returns:
+        The operation as plain text, laid out in the same columns as the
+        disassembly panel. If the operation is the target of a jump, the
+        text starts with a line marking the label.
+    """
+    row = " ".join(
+        (
+            operation_line_number(operation).ljust(LINE_NUMBER_WIDTH),
+            *(
+                (str(operation.offset).ljust(OFFSET_WIDTH),)
+                if settings.show_offset
+                else ()
+            ),
+            (
+                f"{operation.opname} ({operation.opcode})"
+                if settings.show_opcode
+                else operation.opname
+            ).ljust(settings.opname_width),
+            operation_argument(operation),
+        )
+    ).rstrip()
+    if operation.is_jump_target:
+        return f"-- L{operation.label}\n{row}"
+    return row
+
+
+##############################################################################
+class CodeHeading(NamedTuple):
+    """Marks the start of a code object within a listing."""
+
+    code: CodeType
+    """The code object that follows."""
+    key: str
+    """The key that identifies the code object."""
+    first_line: int | None = None
+    """The line to show as the first line of the code."""
+    folded: bool = False
+    """Has the content of the code object been left out of the listing?"""
+
+    @property
+    def name(self) -> str:
+        """The name of the code object."""
+        return code_name(self.code, self.first_line)
+
+
+##############################################################################
+class FailedBlock(NamedTuple):
+    """Marks a block of code within a listing that couldn't be compiled."""
+
+    error: SyntaxError
+    """The error that stopped the block being compiled."""
+
+
+##############################################################################
+class ListedOperation(NamedTuple):
+    """An operation within a listing."""
+
+    operation: Instruction
+    """The operation."""
+    code: CodeType
+    """The code that the operation came from."""
+    code_key: str
+    """The key that identifies the code the operation came from."""
+    argval_key: str | None = None
+    """The key that identifies the code that is the operation's argument."""
+
+
+##############################################################################
+type ListingItem = CodeHeading | FailedBlock | ListedOperation
+"""The type of an item in a listing."""
+
+
+##############################################################################
+def _code_listing(
+    disassemblies: Sequence[DisassembledCode],
+    first_line: int | None = None,
+    first: bool = True,
+) -> Iterator[CodeHeading | ListedOperation]:
+    """Make the listing of some disassembled code.
+
+    Args:
+        disassemblies: The disassembled code to list.
+        first_line: The line to show as the first line of the top-level code.
+        first: Is this the first code in the listing?
+
+    Yields:
+        Either a `CodeHeading` or a `ListedOperation`.
+    """
+    identities = list(code_identities(disassemblies, first_line))
+    for disassembly, identity in zip(disassemblies, identities, strict=True):
+        if disassembly.depth or not first:
+            yield CodeHeading(
+                disassembly.code,
+                identity.key,
+                None if disassembly.depth else first_line,
+            )
+        first = False
+        for operation in disassembly.instructions:
+            yield ListedOperation(
+                operation,
+                disassembly.code,
+                identity.key,
+                identity.children.get(id(operation.argval))
+                if isinstance(operation.argval, CodeType)
+                else None,
+            )
+
+
+##############################################################################
+def listing(analysis: Analysis) -> Iterator[ListingItem]:
+    """Make the listing of the disassembly of some analysed code.
+
+    Args:
+        analysis: The analysis to make the listing from.
+
+    Yields:
+        Either a `CodeHeading`, a `FailedBlock` or a `ListedOperation`, in
+        the order they're shown in the disassembly panel.
+
+    Notes:
+        The top-level code of the listing has no heading. If the code was
+        analysed a block at a time, the top-level code of each following
+        block gets its own heading, and any block that couldn't be compiled
+        is marked with its error.
+    """
+    if not analysis.blocks:
+        yield from _code_listing(analysis.disassembly)
+        return
+    first = True
+    for block in analysis.blocks:
+        if block.error is not None:
+            yield FailedBlock(block.error)
+        else:
+            yield from _code_listing(block.disassembly, block.first_line, first)
+        first = False
+
+
+##############################################################################
+def collapsed_listing(
+    analysis: Analysis, expanded: Collection[str] = frozenset()
+) -> Iterator[ListingItem]:
+    """Make the listing of some analysed code, collapsed to its top level.
+
+    Args:
+        analysis: The analysis to make the listing from.
+        expanded: The keys of the code objects to list the content of.
+
+    Yields:
+        Either a `CodeHeading`, a `FailedBlock` or a `ListedOperation`, in
+        the order they're shown in the disassembly panel.
+
+    Notes:
+        Only the operations of the top-level code are listed, along with
+        the headings of the code objects defined by it; the heading of a
+        code object whose content isn't listed is marked as folded. Any
+        code object whose key is in `expanded`, and that has its heading
+        listed, is listed in the same way as the top-level code.
+    """
+    opened: dict[str, bool] = {}
+
+    def is_open(key: str) -> bool:
+        if (known := opened.get(key)) is None:
+            parent, nested, _ = key.rpartition("/")
+            known = opened[key] = not nested or (key in expanded and is_open(parent))
+        return known
+
+    for item in listing(analysis):
+        if isinstance(item, CodeHeading):
+            parent, nested, _ = item.key.rpartition("/")
+            if not nested or is_open(parent):
+                yield item if is_open(item.key) else item._replace(folded=True)
+        elif isinstance(item, FailedBlock) or is_open(item.code_key):
+            yield item
+
+
+##############################################################################
+class CodeCounts(NamedTuple):
+    """The count of each operation within a single code object."""
+
+    key: str
+    """The key that identifies the code object."""
+    counts: Counter[str]
+    """The count of each operation within the code object."""
+
+    @property
+    def name(self) -> str:
+        """The name of the code object."""
+        return self.key.rpartition("/")[-1]
+
+
+##############################################################################
+def code_counts(analysis: Analysis) -> Iterator[CodeCounts]:
+    """Count the operations within each code object of some analysed code.
+
+    Args:
+        analysis: The analysis of the code to count.
+
+    Yields:
+        The counts for each code object, in the order the code objects
+        appear in the listing, as soon as each one has been counted.
+
+    Notes:
+        This is a single pass over the listing of the code, relying on all
+        of the operations of a code object being listed together.
+    """
+    current: CodeCounts | None = None
+    for item in listing(analysis):
+        if isinstance(item, ListedOperation):
+            if current is None or current.key != item.code_key:
+                if current is not None:
+                    yield current
+                current = CodeCounts(item.code_key, Counter())
+            current.counts[item.operation.opname] += 1
+    if current is not None:
+        yield current
+
+
+### listing.py ends here
@@ -0,0 +1,245 @@
+"""Provides indexes for finding things by their location within some code."""
+
+##############################################################################
+# Python imports.
+from ast import AST, walk
+from bisect import bisect_right
+from collections.abc import Iterable
+from heapq import heappop, heappush
+from typing import NamedTuple
+
+##############################################################################
+# Local imports.
+from ..types import Location
+
+##############################################################################
+type Point = tuple[int, int]
+"""A line and column within some code."""
+
+
+##############################################################################
+def _span_of(location: Location) -> tuple[Point, Point] | None:
+    """Get the span of a location.
+
+    Args:
+        location: The location to get the span of.
+
+    Returns:
+        The start and (exclusive) end of the location, or `None` if the
+        location isn't a complete span.
+
+    Notes:
+        The span is taken to include the column just after the end of the
+        location, so that a cursor that is just after some code is seen as
+        being within it.
+    """
+    if (
+        location.start_line is None
+        or location.start_column is None
+        or location.end_line is None
+        or location.end_column is None
+    ):
+        return None
+    return (
+        (location.start_line, location.start_column),
+        (location.end_line, location.end_column + 1),
+    )
+
+
+##############################################################################
+class IntervalIndex[ValueT]:
+    """An index of values by the span of code they relate to.
+
+    The spans are flattened into a sorted run of segments, each of which
+    knows the innermost span that covers it, so that finding the innermost
+    value at a location is a binary search.
+    """
+
+    def __init__(self, spans: Iterable[tuple[Location, ValueT]]) -> None:
+        """Initialise the index.
+
+        Args:
+            spans: The locations to index, along with their values.
+
+        Notes:
+            Locations that aren't complete spans are ignored. Where more
+            than one value has the same span, the first one given wins.
+        """
+        self._values: list[ValueT] = []
+        """The values in the index."""
+        self._ends: list[Point] = []
+        """The end of the span of each value."""
+        self._parents: list[int | None] = []
+        """The index of the value whose span encloses each value's span."""
+        self._segment_starts: list[Point] = []
+        """The start of each segment."""
+        self._segment_values: list[int | None] = []
+        """The index of the innermost value for each segment."""
+        starts: list[Point] = []
+        for location, value in spans:
+            if (span := _span_of(location)) is not None:
+                starts.append(span[0])
+                self._ends.append(span[1])
+                self._values.append(value)
+        self._parents = [None] * len(self._values)
+        self._build(starts)
+
+    def _build(self, starts: list[Point]) -> None:
+        """Build the segments of the index.
+
+        Args:
+            starts: The start of the span of each value.
+        """
+        # Work through the spans outermost first, with earlier values
+        # winning out over later values with the same span.
+        order = sorted(
+            range(len(starts)),
+            key=lambda value: (
+                starts[value],
+                (-self._ends[value][0], -self._ends[value][1]),
+                value,
+            ),
+        )
+        # The active spans, innermost first; the innermost being the one that
+        # started last, then the one that ends first.
+        active: list[tuple[int, Point, int, int]] = []
+        next_span = 0
+        for position, point in enumerate(sorted({*starts, *self._ends})):
+            while active and active[0][1] <= point:
+                heappop(active)
+            while next_span < len(order) and starts[value := order[next_span]] == point:
+                self._parents[value] = active[0][3] if active else None
+                heappush(active, (-position, self._ends[value], next_span, value))
+                next_span += 1
+            self._segment_starts.append(point)
+            self._segment_values.append(active[0][3] if active else None)
+
+    def __len__(self) -> int:
+        """The number of values in the index."""
+        return len(self._values)
+
+    def _innermost(self, line: int, column: int) -> int | None:
+        """Find the innermost value at a given point.
+
+        Args:
+            line: The line to look at.
+            column: The column to look at.
+
+        Returns:
+            The index of the innermost value, or `None` if there isn't one.
+        """
+        if (segment := bisect_right(self._segment_starts, (line, column)) - 1) < 0:
+            return None
+        return self._segment_values[segment]
+
+    def innermost(self, line: int, column: int) -> ValueT | None:
+        """Find the innermost value at a given point in the code.
+
+        Args:
+            line: The line to look at.
+            column: The column to look at.
+
+        Returns:
+            The value whose span most closely covers the point, or `None`
+            if there isn't one.
+        """
+        if (value := self._innermost(line, column)) is None:
+            return None
+        return self._values[value]
+
+    def enclosing(self, location: Location) -> ValueT | None:
+        """Find the innermost value whose span encloses a location.
+
+        Args:
+            location: The location to find the enclosing value for.
+
+        Returns:
+            The value whose span most closely encloses the location, or
+            `None` if there isn't one.
+        """
+        if (span := _span_of(location)) is None:
+            return None
+        (line, column), end = span
+        value = self._innermost(line, column)
+        while value is not None and self._ends[value] < end:
+            value = self._parents[value]
+        return None if value is None else self._values[value]
+
+
+##############################################################################
+def location_of(item: AST) -> Location | None:
+    """Get the location of an AST item.
+
+    Args:
+        item: The item to get the location of.
+
+    Returns:
+        The location, or `None` if the item doesn't have one.
+    """
+    if not item._attributes:
+        return None
+    return Location(
+        getattr(item, "lineno", None),
+        getattr(item, "col_offset", None),
+        getattr(item, "end_lineno", None),
+        getattr(item, "end_col_offset", None),
+    )
+
+
+##############################################################################
+class ASTIndex(NamedTuple):
+    """An index of the items in an abstract syntax tree."""
+
+    items: IntervalIndex[AST]
+    """The items in the tree, indexed by their location."""
+    parents: dict[int, tuple[AST, str]]
+    """The parent of each item, and the field it is in, keyed on the item's ID."""
+
+    def path_to(self, item: AST) -> list[tuple[str, AST]]:
+        """Get the path to an item from the root of the tree.
+
+        Args:
+            item: The item to get the path to.
+
+        Returns:
+            The path to the item, as a list of field names and AST items.
+        """
+        path: list[tuple[str, AST]] = []
+        while (parent := self.parents.get(id(item))) is not None:
+            path.append((parent[1], item))
+            item = parent[0]
+        return path[::-1]
+
+
+##############################################################################
+def index_ast(tree: AST) -> ASTIndex:
+    """Index the items of an abstract syntax tree.
+
+    Args:
+        tree: The tree to index.
+
+    Returns:
+        The index of the tree.
+    """
+    parents: dict[int, tuple[AST, str]] = {}
+    items = list(walk(tree))
+    for item in items:
+        for field in item._fields:
+            value = getattr(item, field, None)
+            for child in value if isinstance(value, list) else (value,):
+                if isinstance(child, AST):
+                    parents[id(child)] = (item, field)
+    # The deepest items go first so that they win out over any items that
+    # enclose them with the very same span (an `Expr` and its value, for
+    # example).
+    return ASTIndex(
+        IntervalIndex(
+            (location, item)
+            for item in reversed(items)
+            if (location := location_of(item)) is not None
+        ),
+        parents,
+    )
+
+
+### locations.py ends here
@@ -0,0 +1,104 @@
+"""Provides a simple least-recently-used cache."""
+
+##############################################################################
+# Python imports.
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from threading import Lock
+
+
+##############################################################################
+class LRUCache[KeyT: Hashable, ValueT]:
+    """A least-recently-used cache with an entry and a weight limit."""
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_weight: int | None = None,
+        weigh: Callable[[ValueT], int] = lambda _: 1,
+    ) -> None:
+        """Initialise the cache.
+
+        Args:
+            max_entries: The maximum number of entries to hold.
+            max_weight: The maximum total weight of the entries to hold.
+            weigh: A function that gets the weight of a value.
+
+        Notes:
+            If `max_weight` is `None` only the count of entries is limited.
+            A value that is heavier than `max_weight` on its own is never
+            cached.
+        """
+        self._max_entries = max_entries
+        """The maximum number of entries to hold."""
+        self._max_weight = max_weight
+        """The maximum total weight of the entries to hold."""
+        self._weigh = weigh
+        """The function that gets the weight of a value."""
+        self._entries: OrderedDict[KeyT, tuple[ValueT, int]] = OrderedDict()
+        """The entries in the cache, least recently used first."""
+        self._weight = 0
+        """The current total weight of the entries in the cache."""
+        self._lock = Lock()
+        """Lock for access to the cache."""
+
+    def __len__(self) -> int:
+        """The number of entries in the cache."""
+        return len(self._entries)
+
+    def __contains__(self, key: object) -> bool:
+        """Is the given key in the cache?"""
+        return key in self._entries
+
+    @property
+    def weight(self) -> int:
+        """The current total weight of the entries in the cache."""
+        return self._weight
+
+    def get(self, key: KeyT) -> ValueT | None:
+        """Get a value from the cache.
+
+        Args:
+            key: The key of the value to get.
+
+        Returns:
+            The value, or `None` if it isn't in the cache.
+        """
+        with self._lock:
+            if (entry := self._entries.get(key)) is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: KeyT, value: ValueT) -> ValueT:
+        """Put a value into the cache.
+
+        Args:
+            key: The key for the value.
+            value: The value to cache.
+
+        Returns:
+            The value.
+        """
+        weight = self._weigh(value)
+        with self._lock:
+            if (old := self._entries.pop(key, None)) is not None:
+                self._weight -= old[1]
+            if self._max_weight is not None and weight > self._max_weight:
+                return value
+            self._entries[key] = (value, weight)
+            self._weight += weight
+            while len(self._entries) > self._max_entries or (
+                self._max_weight is not None and self._weight > self._max_weight
+            ):
+                self._weight -= self._entries.popitem(last=False)[1][1]
+        return value
+
+    def clear(self) -> None:
+        """Clear the cache."""
+        with self._lock:
+            self._entries.clear()
+            self._weight = 0
+
+
+### lru.py ends here
@@ -0,0 +1,248 @@
+"""Provides the analysis of a body of Python source code."""
+
+##############################################################################
+# Python imports.
+from ast import Module, parse
+from collections import Counter
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from dis import Bytecode, Instruction
+from hashlib import sha256
+from sys import version
+from types import CodeType
+from typing import Literal
+
+##############################################################################
+type FailureReason = Literal["timeout", "memory", "recursion", "crashed"]
+"""The reasons why code can fail to compile, other than it being invalid."""
+
+
+##############################################################################
+class CompilationFailed(SyntaxError):
+    """Raised when code can't be compiled for a reason other than it being invalid.
+
+    Notes:
+        This is a `SyntaxError` so that it can be reported in the same way
+        as any other problem with the code.
+    """
+
+    def __init__(self, message: str, reason: FailureReason) -> None:
+        """Initialise the error.
+
+        Args:
+            message: The message describing the failure.
+            reason: The reason for the failure.
+        """
+        super().__init__(message)
+        self.reason = reason
+        """The reason for the failure."""
+
+
+##############################################################################
+type Compiler = Callable[[str, int], tuple[Module | None, CodeType]]
+"""The type of a function that parses and compiles source code.
+
+It is called with the source and the compiler flags, and returns the AST of
+the source (if it is available) and the compiled code; it raises
+`SyntaxError` if the code can't be compiled.
+"""
+
+
+##############################################################################
+type Parser = Callable[[str], Module | None]
+"""The type of a function that parses source code.
+
+It is called with the source, and returns the AST of the source, or `None`
+if the source can't be parsed.
+"""
+
+
+##############################################################################
+def parse_source(source: str) -> Module | None:
+    """Parse some source code.
+
+    Args:
+        source: The source code to parse.
+
+    Returns:
+        The AST of the source, or `None` if it can't be parsed.
+    """
+    try:
+        return parse(source)
+    except (SyntaxError, ValueError, RecursionError, MemoryError):
+        return None
+
+
+##############################################################################
+def compile_source(source: str, flags: int = 0) -> tuple[Module, CodeType]:
+    """Parse and compile some source code.
+
+    Args:
+        source: The source code to compile.
+        flags: The compiler flags to compile the code with.
+
+    Returns:
+        The AST of the source and the compiled code.
+
+    Raises:
+        SyntaxError: If the code can't be compiled.
+        CompilationFailed: If the code is too complex to compile.
+    """
+    try:
+        ast = parse(source)
+        return ast, compile(ast, "<dhv>", "exec", flags=flags, dont_inherit=True)
+    except RecursionError:
+        raise CompilationFailed(
+            "The code is nested too deeply to compile", "recursion"
+        ) from None
+    except MemoryError:
+        raise CompilationFailed(
+            "The code is too complex to compile", "memory"
+        ) from None
+
+
+##############################################################################
+@dataclass(frozen=True)
+class DisassembledCode:
+    """The disassembly of a single code object."""
+
+    code: CodeType
+    """The code object."""
+    instructions: tuple[Instruction, ...]
+    """The instructions that make up the code object."""
+    depth: int = 0
+    """How deeply nested the code object is."""
+
+
+##############################################################################
+@dataclass(frozen=True)
+class Block:
+    """The analysis of a top-level block of code within a larger body of code."""
+
+    first_line: int
+    """The line the block starts on."""
+    line_count: int
+    """The number of lines in the block."""
+    text: str
+    """The text of the block."""
+    flags: int = 0
+    """The compiler flags the block was compiled with."""
+    ast: Module | None = None
+    """The abstract syntax tree of the block, if it could be parsed."""
+    disassembly: tuple[DisassembledCode, ...] = ()
+    """The disassembly of all of the code objects in the block."""
+    error: SyntaxError | None = None
+    """The error encountered while analysing the block, if there was one."""
+
+    @property
+    def last_line(self) -> int:
+        """The last line of the block."""
+        return self.first_line + self.line_count - 1
+
+
+##############################################################################
+@dataclass(frozen=True)
+class Analysis:
+    """The analysis of a body of Python source code."""
+
+    source: str
+    """The source code that was analysed."""
+    key: str
+    """The key that identifies the source that was analysed."""
+    ast: Module | None = None
+    """The abstract syntax tree of the source, if it could be parsed."""
+    code: CodeType | None = None
+    """The compiled code, if it could be compiled."""
+    disassembly: tuple[DisassembledCode, ...] = ()
+    """The disassembly of all of the code objects, in display order."""
+    error: SyntaxError | None = None
+    """The error encountered while analysing the source, if there was one."""
+    blocks: tuple[Block, ...] = ()
+    """The top-level blocks of the source, if it was analysed a block at a time."""
+
+    @property
+    def approximate(self) -> bool:
+        """Is the analysis an approximation, made a block at a time?
+
+        Each block is compiled as a module of its own, so the code differs
+        a little from what Python compiles for the source as a whole.
+        """
+        return bool(self.blocks)
+
+    @property
+    def errors(self) -> tuple[SyntaxError, ...]:
+        """All of the errors encountered while analysing the source."""
+        if self.error is not None:
+            return (self.error,)
+        return tuple(block.error for block in self.blocks if block.error is not None)
+
+    @property
+    def operation_counts(self) -> Counter[str]:
+        """The count of each operation within all of the code."""
+        return Counter(
+            instruction.opname
+            for code in self.disassembly
+            for instruction in code.instructions
+        )
+
+
+##############################################################################
+def disassemble(code: CodeType, depth: int = 0) -> Iterator[DisassembledCode]:
+    """Disassemble a code object and all of the code objects within it.
+
+    Args:
+        code: The code object to disassemble.
+        depth: The depth of the code object.
+
+    Yields:
+        The disassembly of the code object, followed by the disassembly of
+        any code objects within it, depth first.
+    """
+    yield DisassembledCode(code, instructions := tuple(Bytecode(code)), depth)
+    for instruction in instructions:
+        if isinstance(instruction.argval, CodeType):
+            yield from disassemble(instruction.argval, depth + 1)
+
+
+##############################################################################
+def source_key(source: str) -> str:
+    """Get a key that identifies some source code.
+
+    Args:
+        source: The source code to get the key for.
+
+    Returns:
+        A key that identifies the source and the Python that compiles it.
+    """
+    return sha256(
+        f"{version}\0{source}".encode("utf-8", errors="surrogatepass")
+    ).hexdigest()
+
+
+##############################################################################
+def analyse(
+    source: str, key: str | None = None, compiler: Compiler = compile_source
+) -> Analysis:
+    """Analyse some Python source code.
+
+    Args:
+        source: The source code to analyse.
+        key: The key for the source, if it is already known.
+        compiler: The function to parse and compile the source with.
+
+    Returns:
+        The analysis of the source code.
+
+    Notes:
+        The source is parsed once, the code is compiled from the resulting
+        AST, and then every code object is disassembled once.
+    """
+    key = source_key(source) if key is None else key
+    try:
+        ast, code = compiler(source, 0)
+    except SyntaxError as error:
+        return Analysis(source, key, error=error)
+    return Analysis(source, key, ast, code, tuple(disassemble(code)))
+
+
+### model.py ends here
@@ -0,0 +1,69 @@
+"""Provides the location of installed Python modules."""
+
+##############################################################################
+# Python imports.
+from importlib.machinery import BYTECODE_SUFFIXES, SOURCE_SUFFIXES
+from importlib.util import find_spec
+from pathlib import Path
+from typing import NamedTuple
+
+
+##############################################################################
+class ModuleLocation(NamedTuple):
+    """The location of an installed Python module."""
+
+    name: str
+    """The dotted name of the module."""
+    origin: Path
+    """The path to the file the module is loaded from."""
+    cached: Path | None = None
+    """The path to where the compiled code for the module is cached, if it is."""
+
+    @property
+    def is_compiled(self) -> bool:
+        """Is the module only available as compiled code?"""
+        return self.origin.suffix in BYTECODE_SUFFIXES
+
+
+##############################################################################
+def locate_module(name: str) -> ModuleLocation:
+    """Find where a Python module is installed.
+
+    Args:
+        name: The dotted name of the module.
+
+    Returns:
+        The location of the module.
+
+    Raises:
+        ImportError: If the module can't be found, or isn't loaded from a
+            Python source or compiled file.
+
+    Notes:
+        As with [`importlib.util.find_spec`][importlib.util.find_spec],
+        finding a module within a package means importing the package.
+    """
+    try:
+        spec = find_spec(name)
+    except ImportError:
+        raise
+    except Exception as error:
+        # Finding a module within a package imports the package, which
+        # could go wrong in all sorts of ways.
+        raise ImportError(f"Unable to find {name}: {error}") from None
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    if (
+        not spec.has_location
+        or spec.origin is None
+        or (origin := Path(spec.origin)).suffix
+        not in (*SOURCE_SUFFIXES, *BYTECODE_SUFFIXES)
+        or not origin.is_file()
+    ):
+        raise ImportError(f"{name} isn't loaded from Python code", name=name)
+    return ModuleLocation(
+        name, origin, None if spec.cached is None else Path(spec.cached)
+    )
+
+
+### modules.py ends here
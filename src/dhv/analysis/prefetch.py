@@ -0,0 +1,66 @@
+"""Provides support for analysing modules before they're asked for."""
+
+##############################################################################
+# Python imports.
+from importlib.machinery import SOURCE_SUFFIXES
+from itertools import chain, zip_longest
+from pathlib import Path
+
+
+##############################################################################
+def sibling_modules(module: Path) -> list[Path]:
+    """Get the Python source files that sit alongside a module.
+
+    Args:
+        module: The path to the module.
+
+    Returns:
+        The source files within the same directory as the module, including
+        the module itself, in order.
+    """
+    try:
+        return sorted(
+            path
+            for path in module.parent.iterdir()
+            if path.suffix in SOURCE_SUFFIXES and path.is_file()
+        )
+    except OSError:
+        return []
+
+
+##############################################################################
+def prefetch_order(module: Path, include_module: bool = True) -> list[Path]:
+    """Get the order in which to analyse the modules around a module.
+
+    Args:
+        module: The path to the module that is being looked at.
+        include_module: Include the module itself?
+
+    Returns:
+        The paths of the modules to analyse, most likely to be wanted next
+        first.
+
+    Notes:
+        The modules are those in the same directory as the module, with the
+        modules closest to it coming first; at the same distance, the module
+        after it comes before the module before it, as going forward through
+        a package is more likely than going backward.
+    """
+    siblings = sibling_modules(module)
+    try:
+        position = siblings.index(module)
+    except ValueError:
+        return siblings
+    return [
+        *((module,) if include_module else ()),
+        *(
+            path
+            for path in chain.from_iterable(
+                zip_longest(siblings[position + 1 :], reversed(siblings[:position]))
+            )
+            if path is not None
+        ),
+    ]
+
+
+### prefetch.py ends here
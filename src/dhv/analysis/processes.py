@@ -0,0 +1,35 @@
+"""Provides support for analysing code in processes of their own."""
+
+##############################################################################
+# Python imports.
+from contextlib import redirect_stderr
+from os import name as os_name
+
+
+##############################################################################
+def start_resource_tracker() -> None:
+    """Make sure that multiprocessing's resource tracker is running.
+
+    Notes:
+        When the tracker is started it is handed the file descriptor of
+        `stderr`; if `stderr` has been swapped for something that isn't a
+        real file (as Textual does while an application is running), that
+        fails, so here the tracker is started with the real `stderr`.
+    """
+    if os_name != "posix":
+        return
+    # Note that stderr is imported here as it's the current stderr that
+    # matters, not whatever it was when this module was imported.
+    from multiprocessing import resource_tracker
+    from sys import __stderr__, stderr
+
+    try:
+        if stderr.fileno() >= 0:
+            return
+    except (AttributeError, OSError, ValueError):
+        pass
+    with redirect_stderr(__stderr__):
+        resource_tracker.ensure_running()
+
+
+### processes.py ends here
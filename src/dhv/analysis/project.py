@@ -0,0 +1,202 @@
+"""Provides opcode statistics for a whole project of Python code."""
+
+##############################################################################
+# Python imports.
+from collections import Counter
+from collections.abc import Generator, Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from importlib.util import decode_source
+from itertools import batched
+from multiprocessing import get_context
+from os import walk
+from pathlib import Path
+from typing import Final, NamedTuple
+
+##############################################################################
+# Local imports.
+from .model import disassemble
+from .processes import start_resource_tracker
+
+##############################################################################
+BATCH_SIZE: Final[int] = 16
+"""The number of modules each worker process counts at a time."""
+
+
+##############################################################################
+def python_files(directory: Path) -> Iterator[Path]:
+    """Find the Python source files within a directory.
+
+    Args:
+        directory: The directory to look in.
+
+    Yields:
+        The path of every Python source file within the directory, or any
+        directory below it, in order.
+
+    Notes:
+        Hidden directories (such as `.git` or `.venv`) aren't looked in.
+    """
+    for root, directories, files in walk(directory):
+        directories[:] = sorted(
+            name for name in directories if not name.startswith(".")
+        )
+        for file in sorted(files):
+            if file.endswith(".py"):
+                yield Path(root) / file
+
+
+##############################################################################
+def module_name(directory: Path, path: Path) -> str:
+    """Get the name of a module within a directory.
+
+    Args:
+        directory: The directory that holds the module.
+        path: The path to the module.
+
+    Returns:
+        The dotted name of the module. If the directory is itself a package,
+        its name is the start of the name of the module.
+    """
+    parts = path.relative_to(directory).with_suffix("").parts
+    if (directory / "__init__.py").exists():
+        parts = (directory.resolve().name, *parts)
+    if parts[-1] == "__init__" and len(parts) > 1:
+        parts = parts[:-1]
+    return ".".join(parts)
+
+
+##############################################################################
+class ModuleCounts(NamedTuple):
+    """The opcode counts for a single module."""
+
+    path: Path
+    """The path to the module."""
+    module: str
+    """The name of the module."""
+    counts: Counter[str]
+    """The count of each operation within the module."""
+    error: str | None = None
+    """A description of why the module couldn't be counted, if it couldn't."""
+
+    @property
+    def packages(self) -> tuple[str, ...]:
+        """The names of the packages that contain the module, outermost first."""
+        parts = self.module.split(".")
+        if self.path.name == "__init__.py":
+            parts.append("__init__")
+        return tuple(".".join(parts[:depth]) for depth in range(1, len(parts)))
+
+
+##############################################################################
+def count_module(path: Path, module: str) -> ModuleCounts:
+    """Count the opcodes within a module.
+
+    Args:
+        path: The path to the module.
+        module: The name of the module.
+
+    Returns:
+        The counts for the module.
+    """
+    try:
+        code = compile(
+            decode_source(path.read_bytes()), str(path), "exec", dont_inherit=True
+        )
+    except (OSError, SyntaxError, UnicodeDecodeError) as error:
+        return ModuleCounts(path, module, Counter(), str(error))
+    return ModuleCounts(
+        path,
+        module,
+        Counter(
+            instruction.opname
+            for disassembly in disassemble(code)
+            for instruction in disassembly.instructions
+        ),
+    )
+
+
+##############################################################################
+def _count_modules(modules: Sequence[tuple[Path, str]]) -> list[ModuleCounts]:
+    """Count the opcodes within a batch of modules.
+
+    Args:
+        modules: The paths and names of the modules to count.
+
+    Returns:
+        The counts for each of the modules.
+    """
+    return [count_module(path, module) for path, module in modules]
+
+
+##############################################################################
+def count_project(directory: Path, jobs: int | None = None) -> Generator[ModuleCounts]:
+    """Count the opcodes within all of the Python code in a directory.
+
+    Args:
+        directory: The directory to count the code within.
+        jobs: The number of processes to count with, or `None` for one per CPU.
+
+    Yields:
+        The counts for each module, as soon as they're known; this means
+        that the modules aren't yielded in any particular order.
+
+    Notes:
+        The modules are counted in a pool of processes; if the caller stops
+        asking for counts, any work that hasn't started yet is cancelled.
+        The processes are spawned rather than forked, as the caller is
+        likely to have threads of its own running.
+    """
+    start_resource_tracker()
+    pool = ProcessPoolExecutor(jobs, mp_context=get_context("spawn"))
+    batches = [
+        pool.submit(_count_modules, batch)
+        for batch in batched(
+            ((path, module_name(directory, path)) for path in python_files(directory)),
+            BATCH_SIZE,
+            strict=False,
+        )
+    ]
+    try:
+        for batch in as_completed(batches):
+            yield from batch.result()
+    finally:
+        # Cancel the batches here, rather than leaving it to the pool, as
+        # the pool only gets round to cancelling pending work if it's still
+        # around by the time its management thread notices it has been shut
+        # down.
+        for batch in batches:
+            batch.cancel()
+        pool.shutdown(wait=False)
+
+
+##############################################################################
+@dataclass
+class ProjectCounts:
+    """The opcode counts for a whole project, built up a module at a time."""
+
+    overall: Counter[str] = field(default_factory=Counter)
+    """The count of each operation within all of the code."""
+    packages: dict[str, Counter[str]] = field(default_factory=dict)
+    """The count of each operation within each package, keyed on package name."""
+    modules: dict[str, ModuleCounts] = field(default_factory=dict)
+    """The counts for each module, keyed on module name."""
+    failures: list[ModuleCounts] = field(default_factory=list)
+    """The modules that couldn't be counted."""
+
+    def add(self, counts: ModuleCounts) -> None:
+        """Add the counts for a module.
+
+        Args:
+            counts: The counts to add.
+        """
+        if counts.error is not None:
+            self.failures.append(counts)
+            return
+        self.modules[counts.module] = counts
+        self.overall.update(counts.counts)
+        for package in counts.packages:
+            self.packages.setdefault(package, Counter()).update(counts.counts)
+
+
+### project.py ends here
@@ -0,0 +1,52 @@
+"""Provides a cheap signature of the significant content of some code."""
+
+##############################################################################
+# Python imports.
+from io import StringIO
+from token import COMMENT, DEDENT, ENDMARKER, NEWLINE, NL
+from tokenize import TokenError, generate_tokens
+from typing import Final
+
+##############################################################################
+type CodeSignature = tuple[tuple[object, ...], ...]
+"""The type of a code signature."""
+
+##############################################################################
+_INSIGNIFICANT: Final[frozenset[int]] = frozenset((COMMENT, NL, ENDMARKER))
+"""Tokens that have no bearing on the compiled code."""
+_POSITIONLESS: Final[frozenset[int]] = frozenset((NEWLINE, DEDENT))
+"""Tokens whose position has no bearing on the compiled code."""
+
+
+##############################################################################
+def code_signature(code: str) -> CodeSignature | None:
+    """Get a signature for the significant content of some code.
+
+    Args:
+        code: The code to get the signature for.
+
+    Returns:
+        The signature for the code, or `None` if one couldn't be made.
+
+    Notes:
+        The signature is made from the tokens in the code, ignoring comments
+        and blank lines, but taking into account the position of everything
+        else. The idea being that if two bodies of code have the same
+        signature they will compile to the same thing.
+
+        If the code can't be tokenised `None` is returned, which should be
+        taken to mean that the code needs a full look.
+    """
+    try:
+        return tuple(
+            (token.type,)
+            if token.type in _POSITIONLESS
+            else (token.type, token.string, token.start, token.end)
+            for token in generate_tokens(StringIO(code).readline)
+            if token.type not in _INSIGNIFICANT
+        )
+    except (TokenError, SyntaxError):
+        return None
+
+
+### signature.py ends here
@@ -0,0 +1,58 @@
+"""Provides support for reading Python source files."""
+
+##############################################################################
+# Python imports.
+from collections.abc import Iterator
+from io import TextIOWrapper
+from os import fstat
+from pathlib import Path
+from typing import Final, NamedTuple
+
+##############################################################################
+READ_CHUNK_SIZE: Final[int] = 1024 * 1024
+"""The number of characters to read from a source file at a time."""
+
+
+##############################################################################
+class SourceChunk(NamedTuple):
+    """A chunk of a source file, as it is being read."""
+
+    text: str
+    """The text of the chunk."""
+    read: int
+    """How many bytes of the file have been read so far."""
+    size: int
+    """The size of the file, in bytes."""
+
+    @property
+    def progress(self) -> float:
+        """How much of the file has been read so far, from 0 to 1."""
+        return min(self.read / self.size, 1.0) if self.size else 1.0
+
+
+##############################################################################
+def read_source(path: Path) -> Iterator[SourceChunk]:
+    """Read a Python source file a chunk at a time.
+
+    Args:
+        path: The path to the source file.
+
+    Yields:
+        The chunks of the source file, in order.
+
+    Raises:
+        OSError: If the file can't be read.
+        UnicodeDecodeError: If the file isn't text.
+
+    Notes:
+        The file is read in the same way as
+        [`Path.read_text`][pathlib.Path.read_text] reads it; joining the
+        text of the chunks gives the same result.
+    """
+    with path.open("rb") as raw, TextIOWrapper(raw) as source:
+        size = fstat(raw.fileno()).st_size
+        while text := source.read(READ_CHUNK_SIZE):
+            yield SourceChunk(text, raw.tell(), size)
+
+
+### sources.py ends here
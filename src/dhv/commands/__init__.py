@@ -2,31 +2,47 @@
 
 ##############################################################################
 # Local imports.
+from .ast import ToggleCompactAST
 from .disassembly import ToggleOffsets, ToggleOpcodes
 from .main import (
+    MAIN_COMMANDS,
+    BrowseDirectory,
     ChangeCodeTheme,
     LoadFile,
+    LoadModule,
     NewCode,
     OpcodeCounts,
+    ProjectOpcodeCounts,
     ShowASTOnly,
     ShowDisassemblyAndAST,
     ShowDisassemblyOnly,
     SwitchLayout,
+    ToggleHighlighting,
+    TogglePackageBrowser,
+    ToggleWatch,
 )
 
 ##############################################################################
 # Exports.
 __all__ = [
+    "MAIN_COMMANDS",
+    "BrowseDirectory",
     "ChangeCodeTheme",
     "LoadFile",
+    "LoadModule",
     "NewCode",
     "OpcodeCounts",
+    "ProjectOpcodeCounts",
     "ShowASTOnly",
     "ShowDisassemblyAndAST",
     "ShowDisassemblyOnly",
     "SwitchLayout",
+    "ToggleCompactAST",
     "ToggleOffsets",
     "ToggleOpcodes",
+    "ToggleHighlighting",
+    "TogglePackageBrowser",
+    "ToggleWatch",
 ]
 
 
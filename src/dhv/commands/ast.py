@@ -0,0 +1,15 @@
+"""Provides commands that are aimed at the AST display."""
+
+##############################################################################
+# Textual enhanced imports.
+from textual_enhanced.commands import Command
+
+
+##############################################################################
+class ToggleCompactAST(Command):
+    """Toggle the compact display of the AST"""
+
+    BINDING_KEY = "f6"
+
+
+### ast.py ends here
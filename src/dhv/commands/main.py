@@ -1,8 +1,17 @@
 """Provides the main commands for the application."""
 
+##############################################################################
+# Python imports.
+from typing import Final
+
 ##############################################################################
 # Textual enhanced imports.
-from textual_enhanced.commands import Command
+from textual_enhanced.commands import ChangeTheme, Command, Help, Quit
+
+##############################################################################
+# Local imports.
+from .ast import ToggleCompactAST
+from .disassembly import ToggleOffsets, ToggleOpcodes
 
 
 ##############################################################################
@@ -16,13 +25,46 @@ class NewCode(Command):
 
 ##############################################################################
 class LoadFile(Command):
-    """Load the content of a Python source file"""
+    """Load the content of a Python source or compiled file"""
 
     BINDING_KEY = "ctrl+l"
     SHOW_IN_FOOTER = True
     FOOTER_TEXT = "Load"
 
 
+##############################################################################
+class LoadModule(Command):
+    """Load the content of an installed Python module, by name"""
+
+    BINDING_KEY = "ctrl+g"
+
+
+##############################################################################
+class BrowseDirectory(Command):
+    """Pick a directory of Python code to browse in the package browser"""
+
+
+##############################################################################
+class TogglePackageBrowser(Command):
+    """Toggle the display of the package browser"""
+
+    BINDING_KEY = "f7"
+
+
+##############################################################################
+class ToggleWatch(Command):
+    """Toggle watching loaded files, and reloading them when they change"""
+
+    BINDING_KEY = "f8"
+
+
+##############################################################################
+class ToggleHighlighting(Command):
+    """Toggle the syntax highlighting of the source"""
+
+    BINDING_KEY = "f12"
+
+
 ##############################################################################
 class SwitchLayout(Command):
     """Switch the screen layout between horizontal and vertical"""
@@ -66,4 +108,40 @@ class OpcodeCounts(Command):
     SHOW_IN_FOOTER = True
 
 
+##############################################################################
+class ProjectOpcodeCounts(Command):
+    """View the count of opcodes in all of the code within a directory"""
+
+    BINDING_KEY = "shift+f5"
+
+
+##############################################################################
+MAIN_COMMANDS: Final[tuple[type[Command], ...]] = (
+    # Keep these together as they're bound to function keys and destined
+    # for the footer.
+    Help,
+    OpcodeCounts,
+    Quit,
+    NewCode,
+    LoadFile,
+    # Everything else.
+    BrowseDirectory,
+    ChangeCodeTheme,
+    ChangeTheme,
+    LoadModule,
+    ProjectOpcodeCounts,
+    SwitchLayout,
+    ToggleOffsets,
+    ToggleOpcodes,
+    ToggleCompactAST,
+    ToggleHighlighting,
+    TogglePackageBrowser,
+    ToggleWatch,
+    ShowASTOnly,
+    ShowDisassemblyAndAST,
+    ShowDisassemblyOnly,
+)
+"""The commands that are bound in the main screen of the application."""
+
+
 ### main.py ends here
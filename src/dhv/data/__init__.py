@@ -4,15 +4,20 @@
 # Local imports.
 from .config import (
     Configuration,
+    flush_configuration,
     load_configuration,
     save_configuration,
     update_configuration,
 )
+from .locations import analysis_cache_dir, cache_dir
 
 ##############################################################################
 # Exports.
 __all__ = [
     "Configuration",
+    "analysis_cache_dir",
+    "cache_dir",
+    "flush_configuration",
     "load_configuration",
     "save_configuration",
     "update_configuration",
@@ -3,16 +3,30 @@
 ##############################################################################
 # Python imports.
 from collections.abc import Iterator
-from contextlib import contextmanager
-from dataclasses import asdict, dataclass, field
-from functools import cache
+from contextlib import contextmanager, suppress
+from dataclasses import asdict, dataclass, field, replace
 from json import dumps, loads
+from os import fstat, stat_result
 from pathlib import Path
+from sys import platform
+from tempfile import NamedTemporaryFile
+from threading import RLock, Timer
+from time import monotonic
+from typing import Any, Final
+
+if platform != "win32":
+    from fcntl import LOCK_EX, flock
 
 ##############################################################################
 # Local imports.
 from .locations import config_dir
 
+##############################################################################
+FLUSH_DELAY: Final[float] = 1.0
+"""How long, in seconds, changes to the configuration are held before being saved."""
+CHECK_INTERVAL: Final[float] = 2.0
+"""How often, at most, in seconds, to check if something else changed the configuration."""
+
 
 ##############################################################################
 @dataclass
@@ -43,9 +57,60 @@ class Configuration:
     show_ast: bool = False
     """Should we show the AST panel?"""
 
+    compact_ast: bool = False
+    """Should the AST be shown in compact form?"""
+
+    ast_expand_depth: int = 3
+    """How many levels of the AST panel to expand when it is populated."""
+
     code_theme: str | None = None
     """The theme for the code editor."""
 
+    analysis_delay: float = 0.3
+    """How long to wait, in seconds, after an edit before analysing the code."""
+
+    analysis_cache_entries: int = 32
+    """The maximum number of analyses to keep in memory."""
+
+    analysis_cache_source_size: int = 2_000_000
+    """The maximum total size, in characters, of the analysed code kept in memory."""
+
+    analysis_disk_cache_size: int = 256 * 1024 * 1024
+    """The maximum size, in bytes, of the on-disk cache of analyses (0 to disable)."""
+
+    incremental_analysis_lines: int = 1000
+    """Code with more lines than this has edits previewed a top-level statement at a time (0 to disable)."""
+
+    full_analysis_delay: float = 1.0
+    """How long to wait, in seconds, after previewing an edit before fully analysing the code."""
+
+    show_package_browser: bool = False
+    """Should the package browser be shown?"""
+
+    prefetch_source_size: int = 500_000
+    """The maximum total size, in characters, of the modules to analyse ahead of being viewed."""
+
+    watch_files: bool = False
+    """Should loaded files be watched, and reloaded when they change?"""
+
+    highlight_source_size: int = 500_000
+    """Source larger than this, in characters, isn't syntax highlighted until asked (0 to always highlight)."""
+
+    expand_disassembly_size: int = 1_000_000
+    """Source larger than this, in characters, has its disassembly collapsed (0 to never collapse)."""
+
+    show_ast_size: int = 1_000_000
+    """Source larger than this, in characters, doesn't have its AST shown until asked (0 to always show it)."""
+
+    isolate_compilation: bool = False
+    """Should code be compiled in a separate process, with limits on time and memory?"""
+
+    compilation_timeout: float = 10.0
+    """The time, in seconds, that compiling code in a separate process may take."""
+
+    compilation_memory_limit: int = 1024 * 1024 * 1024
+    """The memory, in bytes, that a separate compiling process may use (0 for no limit)."""
+
 
 ##############################################################################
 def configuration_file() -> Path:
@@ -57,25 +122,231 @@ def configuration_file() -> Path:
     return config_dir() / "configuration.json"
 
 
+##############################################################################
+type _FileState = tuple[int, int, int]
+"""The identity, modification time and size of the configuration file."""
+
+
+##############################################################################
+def _state_of(stat: stat_result) -> _FileState:
+    """Get the state of the configuration file from its status.
+
+    Args:
+        stat: The status of the file.
+
+    Returns:
+        The state of the file.
+    """
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+##############################################################################
+@contextmanager
+def _locked() -> Iterator[None]:
+    """Hold the lock that guards writing the configuration file.
+
+    Notes:
+        The lock is held on a file of its own, as the configuration file is
+        replaced, rather than written to, when it is saved. Where file
+        locking isn't available (Windows) the file is still replaced in
+        one go, it's just not guarded against other instances saving at the
+        same time.
+    """
+    if platform == "win32":
+        yield
+        return
+    with (config_dir() / "configuration.lock").open("wb") as lock:
+        flock(lock, LOCK_EX)
+        yield
+
+
+##############################################################################
+class _ConfigurationStore:
+    """Holds the configuration, and saves changes made to it.
+
+    Changes to the configuration are held in memory and saved a short
+    while after they're made, so that a run of changes (moving through the
+    themes in the command palette, for example) only saves the file once.
+    When saved, only the settings that were changed are written over what
+    is in the file, so that instances of the application that are running
+    at the same time don't undo each other's changes; and if the file is
+    changed by another instance it is loaded again (the file is checked
+    for this when saving, and otherwise no more often than every
+    `CHECK_INTERVAL` seconds).
+    """
+
+    def __init__(self) -> None:
+        """Initialise the store."""
+        self._lock = RLock()
+        """The lock that guards the store."""
+        self._configuration: Configuration | None = None
+        """The configuration, if it has been loaded."""
+        self._state: _FileState | None = None
+        """The state of the file when it was last loaded or saved."""
+        self._pending: dict[str, Any] = {}
+        """The changes made to the configuration that are yet to be saved."""
+        self._timer: Timer | None = None
+        """The timer for saving the pending changes."""
+        self._checked = monotonic()
+        """When the file was last checked for changes made by something else."""
+
+    def _current_state(self) -> _FileState | None:
+        """Get the current state of the configuration file.
+
+        Returns:
+            The state of the file, or `None` if there is no file.
+        """
+        try:
+            return _state_of(configuration_file().stat())
+        except FileNotFoundError:
+            return None
+
+    def _read(self) -> tuple[Configuration, _FileState | None]:
+        """Read the configuration file.
+
+        Returns:
+            The configuration in the file, with any pending changes made to
+            it, and the state of the file that was read.
+        """
+        with configuration_file().open(encoding="utf-8") as source:
+            state = _state_of(fstat(source.fileno()))
+            configuration = Configuration(**loads(source.read()))
+        return replace(configuration, **self._pending), state
+
+    def load(self) -> Configuration:
+        """Load the configuration.
+
+        Returns:
+            The configuration.
+        """
+        with self._lock:
+            if self._configuration is None:
+                if self._current_state() is None:
+                    self._configuration = Configuration()
+                    self.flush(force=True)
+                else:
+                    self._configuration, self._state = self._read()
+            elif (
+                self._state is not None
+                and monotonic() - self._checked >= CHECK_INTERVAL
+            ):
+                self._checked = monotonic()
+                if self._current_state() != self._state:
+                    # Someone else has saved the configuration, so pick up
+                    # their changes; if what they saved can't be read, carry
+                    # on with what we have until it can be.
+                    with suppress(OSError, ValueError, TypeError):
+                        self._configuration, self._state = self._read()
+            return self._configuration
+
+    def changed(self, before: dict[str, Any], after: dict[str, Any]) -> None:
+        """Record a change to the configuration.
+
+        Args:
+            before: The settings before the change.
+            after: The settings after the change.
+
+        Notes:
+            The change is made to the configuration held by the store, and
+            is saved a short while later, along with any other changes made
+            in the meantime.
+        """
+        with self._lock:
+            changes = {
+                name: value
+                for name, value in after.items()
+                if before.get(name) != value
+            }
+            self._pending.update(changes)
+            if self._configuration is not None:
+                for name, value in changes.items():
+                    setattr(self._configuration, name, value)
+            if self._pending and self._timer is None:
+                self._timer = Timer(FLUSH_DELAY, self._background_flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _background_flush(self) -> None:
+        """Save the pending changes from the timer."""
+        # If the file can't be saved right now the changes are still
+        # pending, and will be saved with the next change, or on exit.
+        with suppress(OSError):
+            self.flush()
+
+    def flush(self, force: bool = False) -> None:
+        """Save any pending changes to the configuration.
+
+        Args:
+            force: Save the configuration even if there are no changes?
+
+        Raises:
+            OSError: If the configuration couldn't be saved.
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not (self._pending or force):
+                return
+            with _locked():
+                if self._current_state() not in (None, self._state):
+                    with suppress(OSError, ValueError, TypeError):
+                        self._configuration, self._state = self._read()
+                if self._configuration is None:
+                    self._configuration = replace(Configuration(), **self._pending)
+                temporary: Path | None = None
+                try:
+                    with NamedTemporaryFile(
+                        "w",
+                        encoding="utf-8",
+                        dir=configuration_file().parent,
+                        prefix="configuration.",
+                        suffix=".tmp",
+                        delete=False,
+                    ) as saving:
+                        temporary = Path(saving.name)
+                        saving.write(dumps(asdict(self._configuration), indent=4))
+                    temporary.replace(configuration_file())
+                except OSError:
+                    if temporary is not None:
+                        with suppress(OSError):
+                            temporary.unlink()
+                    raise
+                self._state = self._current_state()
+                self._pending = {}
+
+
+##############################################################################
+_store = _ConfigurationStore()
+"""The store that holds the configuration."""
+
+
 ##############################################################################
 def save_configuration(configuration: Configuration) -> Configuration:
     """Save the given configuration.
 
     Args:
-        The configuration to store.
+        configuration: The configuration to store.
 
     Returns:
         The configuration.
+
+    Notes:
+        Unlike changes made with `update_configuration`, the configuration
+        is saved straight away. Only the settings that differ from the
+        current configuration are written over what is in the file; if
+        the configuration given is the current configuration, all of its
+        settings are.
     """
-    load_configuration.cache_clear()
-    configuration_file().write_text(
-        dumps(asdict(configuration), indent=4), encoding="utf-8"
+    current = load_configuration()
+    _store.changed(
+        {} if configuration is current else asdict(current), asdict(configuration)
     )
+    _store.flush()
     return load_configuration()
 
 
 ##############################################################################
-@cache
 def load_configuration() -> Configuration:
     """Load the configuration.
 
@@ -87,15 +358,25 @@ def load_configuration() -> Configuration:
         will be saved to storage.
 
         This function is designed so that it's safe and low-cost to
-        repeatedly call it. The configuration is cached and will only be
-        loaded from storage when necessary.
+        repeatedly call it. The configuration is held in memory and will
+        only be loaded from storage when the file has been changed by
+        something else; the file is checked for that every so often,
+        rather than on every call.
     """
-    source = configuration_file()
-    return (
-        Configuration(**loads(source.read_text(encoding="utf-8")))
-        if source.exists()
-        else save_configuration(Configuration())
-    )
+    return _store.load()
+
+
+##############################################################################
+def flush_configuration() -> None:
+    """Save any changes to the configuration that are yet to be saved.
+
+    Notes:
+        Changes made with `update_configuration` are saved a short while
+        after they're made; this should be called before the application
+        exits to be sure they're all saved.
+    """
+    with suppress(OSError):
+        _store.flush()
 
 
 ##############################################################################
@@ -111,12 +392,17 @@ def update_configuration() -> Iterator[Configuration]:
         with update_configuration() as config:
             config.meaning = 42
         ```
+
+    Notes:
+        The changes are saved a short while later, along with any other
+        changes made in the meantime; see `flush_configuration`.
     """
     configuration = load_configuration()
+    before = asdict(configuration)
     try:
         yield configuration
     finally:
-        save_configuration(configuration)
+        _store.changed(before, asdict(configuration))
 
 
 ### config.py ends here
@@ -6,7 +6,7 @@ from pathlib import Path
 
 ##############################################################################
 # XDG imports.
-from xdg_base_dirs import xdg_config_home
+from xdg_base_dirs import xdg_cache_home, xdg_config_home
 
 
 ##############################################################################
@@ -41,4 +41,28 @@ def config_dir() -> Path:
     return _app_dir(xdg_config_home())
 
 
+##############################################################################
+def cache_dir() -> Path:
+    """The path to the cache directory for the application.
+
+    Returns:
+        The path to the cache directory for the application.
+
+    Note:
+        If the directory doesn't exist, it will be created as a side-effect
+        of calling this function.
+    """
+    return _app_dir(xdg_cache_home())
+
+
+##############################################################################
+def analysis_cache_dir() -> Path:
+    """The path to the directory that holds the on-disk cache of analyses.
+
+    Returns:
+        The path to the analysis cache directory.
+    """
+    return cache_dir() / "analyses"
+
+
 ### locations.py ends here
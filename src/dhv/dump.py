@@ -0,0 +1,341 @@
+"""Dump the disassembly of Python code without the user interface."""
+
+##############################################################################
+# Python imports.
+from ast import AST
+from ast import dump as dump_ast
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from functools import partial
+from importlib.util import decode_source
+from json import dumps
+from pathlib import Path
+from sys import stdin
+from typing import Any, Literal, NamedTuple, TextIO
+
+##############################################################################
+# Local imports.
+from .analysis import (
+    Analysis,
+    CodeHeading,
+    DisplaySettings,
+    FailedBlock,
+    analyse,
+    format_operation,
+    listing,
+    location_of,
+    operation_argument,
+    python_files,
+)
+
+##############################################################################
+type DumpFormat = Literal["text", "jsonl"]
+"""The formats that a dump can be made in."""
+
+
+##############################################################################
+def sources_of(paths: Iterable[Path]) -> Iterator[Path | None]:
+    """Get the sources to dump from the paths given on the command line.
+
+    Args:
+        paths: The paths to get the sources from.
+
+    Yields:
+        The path of each source to dump, or `None` for standard input.
+
+    Notes:
+        A path of `-` is standard input, and a directory is taken to mean
+        all of the Python source files within it; see
+        [`python_files`][dhv.analysis.python_files].
+    """
+    for path in paths:
+        if str(path) == "-":
+            yield None
+        elif path.is_dir():
+            yield from python_files(path)
+        else:
+            yield path
+
+
+##############################################################################
+def _error_text(name: str, error: SyntaxError) -> str:
+    """Describe a syntax error in the conventional style.
+
+    Args:
+        name: The name of the source the error is in.
+        error: The error.
+
+    Returns:
+        The description of the error.
+    """
+    return f"{name}:{error.lineno}:{error.offset}: SyntaxError: {error.msg}"
+
+
+##############################################################################
+def _text(
+    name: str, analysis: Analysis, settings: DisplaySettings, ast: bool
+) -> Iterator[str]:
+    """Make the plain text dump of some analysed code.
+
+    Args:
+        name: The name of the source that was analysed.
+        analysis: The analysis of the source.
+        settings: The settings to format the operations with.
+        ast: Include the abstract syntax tree?
+
+    Yields:
+        The lines of the dump.
+    """
+    yield f"# {name}"
+    for item in listing(analysis):
+        if isinstance(item, CodeHeading):
+            yield f"\n@{item.name}"
+        elif isinstance(item, FailedBlock):
+            yield f"\n!{_error_text(name, item.error)}"
+        else:
+            yield format_operation(item.operation, settings)
+    if ast and analysis.ast is not None:
+        yield ""
+        yield dump_ast(analysis.ast, indent=2)
+
+
+##############################################################################
+def _jsonable(value: Any) -> Any:
+    """Turn a value from an abstract syntax tree into something JSON can hold.
+
+    Args:
+        value: The value to convert.
+
+    Returns:
+        The value, in a form that can be turned into JSON.
+    """
+    if isinstance(value, AST):
+        return {
+            "node": value.__class__.__name__,
+            **{
+                field: _jsonable(getattr(value, field, None)) for field in value._fields
+            },
+            **(
+                {}
+                if (location := location_of(value)) is None
+                else {"location": list(location)}
+            ),
+        }
+    if isinstance(value, list):
+        return [_jsonable(item) for item in value]
+    if value is None or isinstance(value, str | int | float):
+        return value
+    return repr(value)
+
+
+##############################################################################
+def _records(name: str, analysis: Analysis, ast: bool) -> Iterator[dict[str, Any]]:
+    """Make the JSON records for some analysed code.
+
+    Args:
+        name: The name of the source that was analysed.
+        analysis: The analysis of the source.
+        ast: Include the abstract syntax tree?
+
+    Yields:
+        The records of the dump.
+    """
+    for item in listing(analysis):
+        if isinstance(item, CodeHeading):
+            yield {
+                "file": name,
+                "type": "code",
+                "key": item.key,
+                "name": item.name,
+            }
+        elif isinstance(item, FailedBlock):
+            yield _error_record(name, item.error)
+        else:
+            operation = item.operation
+            yield {
+                "file": name,
+                "type": "operation",
+                "code": item.code_key,
+                "line": operation.line_number,
+                "starts_line": operation.starts_line,
+                "offset": operation.offset,
+                "opname": operation.opname,
+                "opcode": operation.opcode,
+                "argument": operation_argument(operation),
+                "argument_code": item.argval_key,
+                "label": operation.label if operation.is_jump_target else None,
+                "jump_target": operation.jump_target,
+                "positions": None
+                if operation.positions is None
+                else list(operation.positions),
+            }
+    if ast and analysis.ast is not None:
+        yield {"file": name, "type": "ast", "ast": _jsonable(analysis.ast)}
+
+
+##############################################################################
+def _error_record(name: str, error: Exception) -> dict[str, Any]:
+    """Make the JSON record for an error.
+
+    Args:
+        name: The name of the source the error relates to.
+        error: The error.
+
+    Returns:
+        The record of the error.
+    """
+    return {
+        "file": name,
+        "type": "error",
+        "error": error.__class__.__name__,
+        "message": error.msg if isinstance(error, SyntaxError) else str(error),
+        "line": error.lineno if isinstance(error, SyntaxError) else None,
+        "column": error.offset if isinstance(error, SyntaxError) else None,
+    }
+
+
+##############################################################################
+class DumpedFile(NamedTuple):
+    """The dump of a single file."""
+
+    output: str
+    """The text to write to the output."""
+    errors: str
+    """The text to write to the errors."""
+    success: bool
+    """Could the file be dumped?"""
+
+
+##############################################################################
+def _analyse(source: Path | bytes) -> tuple[Analysis | None, Exception | None]:
+    """Analyse the code to dump.
+
+    Args:
+        source: The path of the file to analyse, or its content.
+
+    Returns:
+        The analysis of the code, if the code could be read, and the error
+        that stopped it being read or compiled, if there was one.
+    """
+    try:
+        # Note that decoding the source raises a SyntaxError if the source
+        # has a bad encoding declaration.
+        analysis = analyse(
+            decode_source(source.read_bytes() if isinstance(source, Path) else source)
+        )
+    except (OSError, SyntaxError, UnicodeDecodeError) as error:
+        return None, error
+    return analysis, analysis.error
+
+
+##############################################################################
+def _dump_file(
+    name: str,
+    source: Path | bytes,
+    dump_format: DumpFormat,
+    settings: DisplaySettings,
+    ast: bool,
+) -> DumpedFile:
+    """Dump a single file.
+
+    Args:
+        name: The name of the file.
+        source: The path of the file, or its content.
+        dump_format: The format to dump in.
+        settings: The settings to format operations with, when dumping as text.
+        ast: Include the abstract syntax tree?
+
+    Returns:
+        The dump of the file.
+    """
+    analysis, failure = _analyse(source)
+    if dump_format == "jsonl":
+        return DumpedFile(
+            "".join(
+                f"{dumps(record)}\n"
+                for record in (
+                    *(() if analysis is None else _records(name, analysis, ast)),
+                    *(() if failure is None else (_error_record(name, failure),)),
+                )
+            ),
+            "",
+            failure is None,
+        )
+    if failure is not None:
+        return DumpedFile(
+            "",
+            f"{_error_text(name, failure)}\n"
+            if isinstance(failure, SyntaxError)
+            else f"{name}: {failure}\n",
+            False,
+        )
+    return DumpedFile(
+        ""
+        if analysis is None
+        else "".join(f"{line}\n" for line in _text(name, analysis, settings, ast)),
+        "",
+        True,
+    )
+
+
+##############################################################################
+def dump(
+    paths: Iterable[Path],
+    output: TextIO,
+    errors: TextIO,
+    *,
+    dump_format: DumpFormat = "text",
+    settings: DisplaySettings | None = None,
+    ast: bool = False,
+    jobs: int = 1,
+) -> bool:
+    """Dump the disassembly of some Python source files.
+
+    Args:
+        paths: The paths of the files to dump; see `sources_of`.
+        output: Where to write the dump.
+        errors: Where to report errors, when dumping as text.
+        dump_format: The format to dump in.
+        settings: The settings to format operations with, when dumping as text.
+        ast: Include the abstract syntax tree of each file?
+        jobs: The number of processes to dump with, or `0` for one per CPU.
+
+    Returns:
+        `True` if every file could be dumped, `False` if any couldn't.
+
+    Notes:
+        Each file is written out, in order, as soon as it has been dumped,
+        so the dump can be consumed as it is being made. When dumping as
+        JSON Lines, errors are written to the output as records of their
+        own.
+    """
+    sources = [
+        ("<stdin>", stdin.buffer.read()) if source is None else (str(source), source)
+        for source in sources_of(paths)
+    ]
+    dump_one = partial(
+        _dump_file,
+        dump_format=dump_format,
+        settings=settings or DisplaySettings(),
+        ast=ast,
+    )
+    if not sources:
+        return True
+    success = True
+    with (
+        nullcontext(None)
+        if jobs == 1 or len(sources) < 2
+        else ProcessPoolExecutor(jobs or None)
+    ) as pool:
+        for dumped in (pool.map if pool else map)(
+            dump_one, *zip(*sources, strict=True)
+        ):
+            output.write(dumped.output)
+            output.flush()
+            errors.write(dumped.errors)
+            success = success and dumped.success
+    return success
+
+
+### dump.py ends here
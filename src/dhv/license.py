@@ -0,0 +1,27 @@
+"""Provides the license text for the application."""
+
+##############################################################################
+# Python imports.
+from typing import Final
+
+##############################################################################
+LICENSE: Final[str] = """
+DHV - A Python code explorer for the terminal.  \nCopyright (C) 2025 Dave Pearson
+
+This program is free software: you can redistribute it and/or modify it
+under the terms of the GNU General Public License as published by the Free
+Software Foundation, either version 3 of the License, or (at your option)
+any later version.
+
+This program is distributed in the hope that it will be useful, but WITHOUT
+ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for
+more details.
+
+You should have received a copy of the GNU General Public License along with
+this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+"""The license text for the application."""
+
+
+### license.py ends here
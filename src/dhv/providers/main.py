@@ -13,16 +13,23 @@ from textual_enhanced.commands import (
 ##############################################################################
 # Local imports.
 from ..commands import (
+    BrowseDirectory,
     ChangeCodeTheme,
     LoadFile,
+    LoadModule,
     NewCode,
     OpcodeCounts,
+    ProjectOpcodeCounts,
     ShowASTOnly,
     ShowDisassemblyAndAST,
     ShowDisassemblyOnly,
     SwitchLayout,
+    ToggleCompactAST,
+    ToggleHighlighting,
     ToggleOffsets,
     ToggleOpcodes,
+    TogglePackageBrowser,
+    ToggleWatch,
 )
 
 
@@ -36,16 +43,23 @@ class MainCommands(CommandsProvider):
         Yields:
             The commands for the command palette.
         """
+        yield BrowseDirectory()
         yield ChangeCodeTheme()
         yield ChangeTheme()
         yield Help()
         yield Quit()
         yield LoadFile()
+        yield LoadModule()
         yield NewCode()
         yield OpcodeCounts()
+        yield ProjectOpcodeCounts()
         yield SwitchLayout()
         yield ToggleOffsets()
         yield ToggleOpcodes()
+        yield ToggleCompactAST()
+        yield ToggleHighlighting()
+        yield TogglePackageBrowser()
+        yield ToggleWatch()
         yield ShowASTOnly()
         yield ShowDisassemblyAndAST()
         yield ShowDisassemblyOnly()
@@ -0,0 +1,146 @@
+"""Dialog for picking a Python module from within an archive."""
+
+##############################################################################
+# Python imports.
+from collections.abc import Sequence
+
+##############################################################################
+# Rich imports.
+from rich.text import Text
+
+##############################################################################
+# Textual imports.
+from textual import on
+from textual.app import ComposeResult
+from textual.containers import Center, Vertical
+from textual.screen import ModalScreen
+from textual.widgets import Button, Input, OptionList
+from textual.widgets.option_list import Option
+
+##############################################################################
+# Textual enhanced imports.
+from textual_enhanced.tools import add_key
+
+##############################################################################
+# Local imports.
+from ..analysis import ArchivedModule
+
+
+##############################################################################
+class ArchiveModulesView(ModalScreen[ArchivedModule | None]):
+    """Dialog that lists the Python modules within an archive to pick from."""
+
+    CSS = """
+    ArchiveModulesView {
+        align: center middle;
+
+        & > Vertical {
+            width: 80%;
+            height: 80%;
+            background: $panel;
+            border: panel $border;
+
+            Input, OptionList {
+                margin: 1 2 0 2;
+            }
+
+            OptionList {
+                height: 1fr;
+                background: $panel;
+            }
+
+            Center {
+                width: 100%;
+                height: auto;
+                margin-top: 1;
+            }
+        }
+    }
+    """
+
+    BINDINGS = [("escape", "close"), ("down", "modules")]
+
+    def __init__(self, modules: Sequence[ArchivedModule]) -> None:
+        """Initialise the dialog.
+
+        Args:
+            modules: The modules to pick from.
+        """
+        super().__init__()
+        self._modules = modules
+        """The modules to pick from."""
+
+    def compose(self) -> ComposeResult:
+        """Compose the dialog.
+
+        Returns:
+            The content of the dialog.
+        """
+        with Vertical() as dialog:
+            dialog.border_title = (
+                f"Python code in {self._modules[0].archive}"
+                if self._modules
+                else "Python code"
+            )
+            dialog.border_subtitle = f"{len(self._modules)} files"
+            yield Input(placeholder="Filter")
+            yield OptionList()
+            with Center():
+                yield Button(add_key("Close", "Esc"))
+
+    def on_mount(self) -> None:
+        """Populate the dialog once the DOM is loaded."""
+        self._show_modules()
+
+    def _show_modules(self, show: str = "") -> None:
+        """Show the modules that match a filter.
+
+        Args:
+            show: The text that the names of the modules must contain.
+        """
+        modules = self.query_one(OptionList).clear_options()
+        modules.add_options(
+            Option(Text(module.member), id=str(index))
+            for index, module in enumerate(self._modules)
+            if show.casefold() in module.member.casefold()
+        )
+        if modules.option_count:
+            modules.highlighted = 0
+
+    @on(Input.Changed)
+    def _filter(self, message: Input.Changed) -> None:
+        """Filter the modules that are shown.
+
+        Args:
+            message: The message to react to.
+        """
+        self._show_modules(message.value.strip())
+
+    @on(Input.Submitted)
+    def _pick_highlighted(self) -> None:
+        """Pick the highlighted module, if there is one."""
+        modules = self.query_one(OptionList)
+        if modules.highlighted is not None:
+            modules.action_select()
+
+    def action_modules(self) -> None:
+        """Move focus to the list of modules."""
+        self.query_one(OptionList).focus()
+
+    @on(OptionList.OptionSelected)
+    def _pick(self, message: OptionList.OptionSelected) -> None:
+        """Pick the selected module.
+
+        Args:
+            message: The message to react to.
+        """
+        if message.option.id is not None:
+            self.dismiss(self._modules[int(message.option.id)])
+
+    @on(Button.Pressed)
+    def action_close(self) -> None:
+        """Close the dialog."""
+        self.dismiss(None)
+
+
+### archive_modules.py ends here
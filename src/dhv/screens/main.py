@@ -3,6 +3,10 @@
 ##############################################################################
 # Python imports.
 from argparse import Namespace
+from contextlib import closing
+from functools import reduce
+from importlib.machinery import SOURCE_SUFFIXES
+from importlib.util import decode_source
 from pathlib import Path
 from platform import python_version
 
@@ -12,37 +16,59 @@ from textual import on, work
 from textual.app import ComposeResult
 from textual.containers import Vertical
 from textual.reactive import var
+from textual.timer import Timer
 from textual.widgets import Footer, Header
+from textual.worker import Worker, get_current_worker
 
 ##############################################################################
 # Textual enhanced imports.
-from textual_enhanced.commands import ChangeTheme, Command, Help, Quit
+from textual_enhanced.commands import Command
+from textual_enhanced.dialogs import ModalInput
 from textual_enhanced.screen import EnhancedScreen
 
-##############################################################################
-# Textual fspicker imports.
-from textual_fspicker import FileOpen, Filters
-
 ##############################################################################
 # Local imports.
 from .. import __version__
-from ..commands import (
-    ChangeCodeTheme,
-    LoadFile,
-    NewCode,
-    OpcodeCounts,
-    ShowASTOnly,
-    ShowDisassemblyAndAST,
-    ShowDisassemblyOnly,
-    SwitchLayout,
-    ToggleOffsets,
-    ToggleOpcodes,
+from ..analysis import (
+    ARCHIVE_SUFFIXES,
+    COMPILED_SUFFIXES,
+    READ_CHUNK_SIZE,
+    Analysis,
+    AnalysisCache,
+    ArchivedModule,
+    ArchiveError,
+    CodeSignature,
+    CompilationFailed,
+    CompiledCodeError,
+    DiskCache,
+    IsolatedCompiler,
+    analyse_archived_compiled,
+    analyse_compiled,
+    analyse_compiled_directory,
+    analyse_with_compiled,
+    archived_modules,
+    code_signature,
+    compile_source,
+    locate_module,
+    parse_source,
+    prefetch_order,
+    read_archived,
+    read_source,
+)
+from ..commands import MAIN_COMMANDS, OpcodeCounts
+from ..data import (
+    analysis_cache_dir,
+    load_configuration,
+    update_configuration,
 )
-from ..data import load_configuration, update_configuration
 from ..messages import LocationChanged, SetCodeTheme
 from ..providers import CodeThemeCommands, MainCommands
-from ..widgets import AbstractSyntaxTree, Disassembly, Source
+from ..types import EditedLines
+from ..watcher import FileState, FileWatcher, text_hash
+from ..widgets import AbstractSyntaxTree, Disassembly, PackageBrowser, Source
+from .archive_modules import ArchiveModulesView
 from .opcode_counts import OpcodeCountsView
+from .project_counts import ProjectOpcodeCountsView
 
 
 ##############################################################################
@@ -57,7 +83,7 @@ class Main(EnhancedScreen[None]):
         layout: horizontal;
     }
 
-    Source, Disassembly, AbstractSyntaxTree {
+    Source, Disassembly, AbstractSyntaxTree, PackageBrowser {
         width: 1fr;
         height: 1fr;
         border: none;
@@ -76,6 +102,11 @@ class Main(EnhancedScreen[None]):
             display: none;
         }
     }
+
+    PackageBrowser {
+        dock: left;
+        width: 32;
+    }
     """
 
     HELP = """
@@ -84,31 +115,14 @@ class Main(EnhancedScreen[None]):
     The following key bindings and commands are available:
     """
 
-    COMMAND_MESSAGES = (
-        # Keep these together as they're bound to function keys and destined
-        # for the footer.
-        Help,
-        OpcodeCounts,
-        Quit,
-        NewCode,
-        LoadFile,
-        # Everything else.
-        ChangeCodeTheme,
-        ChangeTheme,
-        SwitchLayout,
-        ToggleOffsets,
-        ToggleOpcodes,
-        ShowASTOnly,
-        ShowDisassemblyAndAST,
-        ShowDisassemblyOnly,
-    )
+    COMMAND_MESSAGES = MAIN_COMMANDS
 
     BINDINGS = Command.bindings(*COMMAND_MESSAGES)
 
     COMMANDS = {MainCommands}
 
-    code: var[str | None] = var(None)
-    """The code we're viewing."""
+    analysis: var[Analysis | None] = var(None)
+    """The analysis of the code we're viewing."""
 
     horizontal_layout: var[bool] = var(True)
     """Should the panes lay out horizontally?"""
@@ -119,6 +133,9 @@ class Main(EnhancedScreen[None]):
     show_ast: var[bool] = var(False)
     """Should we show the AST panel?"""
 
+    show_package_browser: var[bool] = var(False)
+    """Should we show the package browser?"""
+
     def __init__(self, arguments: Namespace) -> None:
         """Initialise the main screen.
 
@@ -127,42 +144,584 @@ class Main(EnhancedScreen[None]):
         """
         self._arguments = arguments
         """The arguments passed on the command line."""
+        self._analysis_timer: Timer | None = None
+        """The timer used to delay the analysis of the code."""
+        self._code_signature: CodeSignature | None = None
+        """The signature of the code that was last analysed."""
+        self._pending_edits: list[EditedLines] | None = []
+        """The edits made since the current analysis, if known."""
+        self._pending_location: LocationChanged | None = None
+        """The latest location change that is yet to be synced to the panels."""
+        self._last_location: LocationChanged | None = None
+        """The latest location change that was synced to the panels."""
+        self._loaded_path: Path | None = None
+        """The path to the file the source was loaded from, if it was."""
+        self._loaded_text = ""
+        """The source as it was loaded, or last reloaded, from the file."""
+        config = load_configuration()
+        self._compiler = (
+            IsolatedCompiler(
+                config.compilation_timeout, config.compilation_memory_limit
+            )
+            if config.isolate_compilation
+            else None
+        )
+        """The compiler that compiles code in a separate process, if one is used."""
+        self._analyses = AnalysisCache(
+            config.analysis_cache_entries,
+            config.analysis_cache_source_size,
+            DiskCache(analysis_cache_dir(), config.analysis_disk_cache_size)
+            if config.analysis_disk_cache_size
+            else None,
+            config.incremental_analysis_lines,
+            compiler=self._compiler or compile_source,
+            parser=parse_source if self._compiler is None else self._compiler.parse,
+        )
+        """The cache of analyses of the code."""
         super().__init__()
 
     def compose(self) -> ComposeResult:
         """Compose the content of the screen."""
         yield Header()
+        config = load_configuration()
+        yield PackageBrowser(self._browse_root())
         yield Source()
         with Vertical():
-            yield Disassembly().data_bind(Main.code)
-            yield AbstractSyntaxTree().data_bind(Main.code)
+            yield Disassembly(
+                cache_entries=config.analysis_cache_entries,
+                cache_source_size=config.analysis_cache_source_size,
+            ).data_bind(Main.analysis)
+            yield AbstractSyntaxTree(expand_depth=config.ast_expand_depth).data_bind(
+                Main.analysis
+            )
         yield Footer()
 
+    def _browse_root(self) -> Path:
+        """Get the directory that the package browser should start in.
+
+        Returns:
+            The directory given on the command line, if one was, otherwise
+            the directory that code was last loaded from.
+        """
+        if isinstance(source := self._arguments.source, Path) and self._browsable(
+            source
+        ):
+            return source
+        if not (
+            location := Path(load_configuration().last_load_location or ".")
+        ).is_dir():
+            location = Path(".")
+        return location
+
+    @staticmethod
+    def _browsable(source: Path) -> bool:
+        """Is the given path a directory to browse in the package browser?
+
+        Args:
+            source: The path to check.
+
+        Returns:
+            `True` if the path is a directory of code to browse, `False` if not.
+        """
+        return source.is_dir() and source.name != "__pycache__"
+
     def _show_source(self, source: Path) -> None:
         """Load up the content of a Python source file.
 
         Args:
             source: The path to the source file to load.
+
+        Notes:
+            If the path is to a compiled Python file, or to a `__pycache__`
+            directory, the compiled code is loaded instead; if the path is
+            to an archive, the module to load is picked from within it; if
+            the path is to any other directory, it is shown in the package
+            browser.
         """
-        try:
-            self.query_one(Source).load_text(source.read_text())
-        except OSError as error:
-            self.notify(str(error), title=f"Unable to load {source}", severity="error")
+        self._cancel_prefetch()
+        if self._browsable(source):
+            self._browse(source)
             return
+        if source.is_dir() or (suffix := source.suffix.lower()) in COMPILED_SUFFIXES:
+            self._load_compiled(source)
+        elif suffix in ARCHIVE_SUFFIXES:
+            self._browse_archive(source)
+        else:
+            self._read_source(source)
         with update_configuration() as config:
             config.last_load_location = str(source.absolute().parent)
 
+    def _load_source(self, source: str, path: Path | None = None) -> None:
+        """Load some source into the source panel and analyse it straight away.
+
+        Args:
+            source: The source to load.
+            path: The path to the file the source was loaded from, if it was.
+
+        Notes:
+            Unlike an edit, there's no point in waiting to see if more
+            changes are coming when a whole source is loaded.
+        """
+        if self._analysis_timer is not None:
+            self._analysis_timer.stop()
+        self._show_text(source)
+        self._loaded_from(path, source)
+        self._analyse_code()
+
+    def _show_text(self, source: str, compiled_from: str | None = None) -> None:
+        """Show some source that has been loaded in the source panel.
+
+        Args:
+            source: The source to show.
+            compiled_from: The name of the compiled code being viewed, if
+                the source is the source of compiled code.
+
+        Notes:
+            Large source isn't syntax highlighted, has its disassembly
+            collapsed to the top-level code, and doesn't have its AST shown
+            until it's asked for; what counts as large for each of these is
+            set in the configuration.
+        """
+        config = load_configuration()
+        size = len(source)
+        with self.prevent(Source.Changed):
+            self.query_one(Source).load_text(
+                source, compiled_from, not 0 < config.highlight_source_size < size
+            )
+        self.query_one(Disassembly).collapse(0 < config.expand_disassembly_size < size)
+        self.query_one(AbstractSyntaxTree).deferred = 0 < config.show_ast_size < size
+
+    @work(thread=True, exclusive=True, group="analysis")
+    def _read_source(self, source: Path) -> None:
+        """Read a Python source file in the background, then show it.
+
+        Args:
+            source: The path to the source file to read.
+
+        Notes:
+            The progress of reading a file that takes more than one chunk
+            to read is shown as it is read.
+        """
+        worker = get_current_worker()
+        text: list[str] = []
+        try:
+            for chunk in read_source(source):
+                if worker.is_cancelled:
+                    return
+                text.append(chunk.text)
+                if chunk.size > READ_CHUNK_SIZE:
+                    self.app.call_from_thread(
+                        self._show_progress, worker, source, chunk.progress
+                    )
+        except (OSError, UnicodeDecodeError) as error:
+            self.app.call_from_thread(self._show_progress, worker, source, None)
+            self.app.call_from_thread(
+                self.notify,
+                str(error),
+                title=f"Unable to load {source}",
+                severity="error",
+            )
+            return
+        if not worker.is_cancelled:
+            self.app.call_from_thread(
+                self._use_loaded_source,
+                worker,
+                "".join(text),
+                None,
+                None,
+                source,
+            )
+
+    def _show_progress(
+        self, worker: Worker[None], source: Path, progress: float | None
+    ) -> None:
+        """Show the progress of reading a source file.
+
+        Args:
+            worker: The worker that is reading the file.
+            source: The path to the source file.
+            progress: How much of the file has been read, from 0 to 1, or
+                `None` if reading it failed.
+        """
+        if not worker.is_cancelled:
+            self.query_one(Source).show_progress(source.name, progress)
+
+    def _loaded_from(self, path: Path | None, source: str) -> None:
+        """Record where the source in the source panel was loaded from.
+
+        Args:
+            path: The path to the file the source was loaded from, if it was.
+            source: The source that was loaded.
+
+        Notes:
+            If watching is turned on, the file is watched for changes.
+        """
+        self._loaded_path = path
+        self._loaded_text = source
+        self._monitor_loaded_file()
+
+    def _monitor_loaded_file(self) -> None:
+        """Start watching the loaded file for changes, if that's wanted."""
+        self.workers.cancel_group(self, "watch")
+        if self._loaded_path is not None and load_configuration().watch_files:
+            self._monitor(self._loaded_path, self._loaded_text)
+
+    @work(thread=True, exclusive=True, group="watch")
+    def _monitor(self, path: Path, source: str) -> None:
+        """Watch a file for changes, reloading the source when it changes.
+
+        Args:
+            path: The path to the file to watch.
+            source: The source as it was loaded from the file.
+
+        Notes:
+            The file is only read when its modification time or size
+            change, and the source is only reloaded if what's read differs
+            from what was last loaded.
+        """
+        worker = get_current_worker()
+        state = FileState.of(path)
+        loaded = text_hash(source)
+        with closing(FileWatcher(path)) as watcher:
+            while not worker.is_cancelled:
+                if (
+                    not watcher.wait()
+                    or (now := FileState.of(path)) is None
+                    or now == state
+                ):
+                    continue
+                state = now
+                try:
+                    source = path.read_text()
+                except (OSError, UnicodeDecodeError):
+                    continue
+                if (changed := text_hash(source)) != loaded and not worker.is_cancelled:
+                    loaded = changed
+                    self.app.call_from_thread(self._reload, worker, path, source)
+
+    def _reload(self, worker: Worker[None], path: Path, source: str) -> None:
+        """Reload the source after the file it came from changed.
+
+        Args:
+            worker: The worker that is watching the file.
+            path: The path to the file.
+            source: The new source.
+
+        Notes:
+            The source is reloaded as an edit, so the selection and scroll
+            position are kept and the change is analysed incrementally. If
+            the source has been edited since it was loaded, it's left alone.
+        """
+        if worker.is_cancelled:
+            return
+        editor = self.query_one(Source)
+        if editor.text != self._loaded_text:
+            self.notify(
+                f"{path} has changed, but has been edited here, so it hasn't been reloaded",
+                title="Not reloaded",
+                severity="warning",
+            )
+            return
+        if self._analysis_timer is not None:
+            self._analysis_timer.stop()
+        with self.prevent(Source.Changed):
+            editor.reload_text(source)
+        self._loaded_text = editor.text
+        self._analyse_code()
+
+    def _browse(self, directory: Path) -> None:
+        """Browse a directory of code in the package browser.
+
+        Args:
+            directory: The directory to browse.
+        """
+        self.query_one(PackageBrowser).path = directory
+        if not self.show_package_browser:
+            self.show_package_browser = True
+            self._save_panels()
+        self.query_one(PackageBrowser).focus()
+        with update_configuration() as config:
+            config.last_load_location = str(directory.absolute())
+
+    @on(PackageBrowser.FileSelected)
+    def _module_selected(self, message: PackageBrowser.FileSelected) -> None:
+        """Load the module selected in the package browser.
+
+        Args:
+            message: The message to react to.
+        """
+        message.stop()
+        self._show_source(message.path)
+        if message.path.suffix in SOURCE_SUFFIXES:
+            self._prefetch(message.path, include_module=False)
+
+    @on(PackageBrowser.ModuleHighlighted)
+    def _module_highlighted(self, message: PackageBrowser.ModuleHighlighted) -> None:
+        """Start analysing the modules around the module highlighted in the browser.
+
+        Args:
+            message: The message to react to.
+        """
+        if message.module.suffix in SOURCE_SUFFIXES:
+            self._prefetch(message.module)
+        else:
+            self._cancel_prefetch()
+
+    @work(thread=True, exclusive=True, group="prefetch")
+    def _prefetch(self, module: Path, include_module: bool = True) -> None:
+        """Analyse the modules around a module, before they're asked for.
+
+        Args:
+            module: The module to analyse around.
+            include_module: Analyse the module itself too?
+
+        Notes:
+            The modules most likely to be looked at next are analysed
+            first, and the analyses are left in the cache so that looking
+            at one of them is instant. The total size of the modules that
+            are analysed is limited by `prefetch_source_size`, and only so
+            many are analysed that the cache can still hold the code that's
+            being looked at. Starting another prefetch cancels this one.
+        """
+        worker = get_current_worker()
+        config = load_configuration()
+        budget = config.prefetch_source_size
+        for path in prefetch_order(module, include_module)[
+            : config.analysis_cache_entries // 2
+        ]:
+            if worker.is_cancelled:
+                return
+            try:
+                # Note that this is read the same way as a module that is
+                # loaded, so that the analysis is of the exact same source.
+                source = path.read_text()
+            except (OSError, UnicodeDecodeError):
+                continue
+            if (budget := budget - len(source)) < 0:
+                return
+            self._analyses.analysis_of(source, persist=True)
+
+    def _cancel_prefetch(self) -> None:
+        """Cancel any analysis of modules that is being done ahead of time."""
+        self.workers.cancel_group(self, "prefetch")
+
+    @work
+    async def _browse_archive(self, archive: Path) -> None:
+        """Pick a Python module from within an archive and load it.
+
+        Args:
+            archive: The path to the archive.
+        """
+        try:
+            modules = archived_modules(archive)
+        except ArchiveError as error:
+            self.notify(str(error), title=f"Unable to load {archive}", severity="error")
+            return
+        if not modules:
+            self.notify(
+                f"There is no Python code in {archive}",
+                title="Nothing to load",
+                severity="warning",
+            )
+        elif module := await self.app.push_screen_wait(ArchiveModulesView(modules)):
+            self._load_archived(module)
+
+    @work(thread=True, exclusive=True, group="analysis")
+    def _load_archived(self, module: ArchivedModule) -> None:
+        """Load a Python module from within an archive.
+
+        Args:
+            module: The module to load.
+        """
+        worker = get_current_worker()
+        try:
+            if module.is_compiled:
+                analysis = analyse_archived_compiled(module)
+                if not worker.is_cancelled:
+                    self.app.call_from_thread(
+                        self._use_compiled, worker, module.path, analysis, []
+                    )
+                return
+            source = decode_source(read_archived(module))
+        except (
+            ArchiveError,
+            CompiledCodeError,
+            SyntaxError,
+            UnicodeDecodeError,
+        ) as error:
+            self.app.call_from_thread(
+                self.notify,
+                str(error),
+                title=f"Unable to load {module.member}",
+                severity="error",
+            )
+            return
+        if not worker.is_cancelled:
+            self.app.call_from_thread(
+                self._use_loaded_source, worker, source, None, None, None
+            )
+
+    @work(thread=True, exclusive=True, group="analysis")
+    def _load_compiled(self, compiled: Path) -> None:
+        """Load compiled Python code.
+
+        Args:
+            compiled: The path to a compiled file, or to a directory of them.
+        """
+        worker = get_current_worker()
+        failures: list[CompiledCodeError] = []
+        try:
+            if compiled.is_dir():
+                analysis, failures = analyse_compiled_directory(compiled)
+            else:
+                analysis = analyse_compiled(compiled)
+        except (CompiledCodeError, OSError) as error:
+            self.app.call_from_thread(
+                self.notify,
+                str(error),
+                title=f"Unable to load {compiled}",
+                severity="error",
+            )
+            return
+        if not worker.is_cancelled:
+            self.app.call_from_thread(
+                self._use_compiled, worker, compiled, analysis, failures
+            )
+
+    def _use_compiled(
+        self,
+        worker: Worker[None],
+        compiled: Path,
+        analysis: Analysis,
+        failures: list[CompiledCodeError],
+    ) -> None:
+        """Use the analysis of some compiled code as the code we're viewing.
+
+        Args:
+            worker: The worker that loaded the code.
+            compiled: The path to the compiled code.
+            analysis: The analysis of the compiled code.
+            failures: The errors for any compiled files that couldn't be loaded.
+        """
+        if worker.is_cancelled:
+            return
+        if self._analysis_timer is not None:
+            self._analysis_timer.stop()
+            self._analysis_timer = None
+        # The source is only there to look at; it's the compiled code that
+        # is being viewed, so the source mustn't be analysed.
+        self._show_text(analysis.source, compiled.name)
+        self._loaded_from(None, analysis.source)
+        self._code_signature = None
+        self._pending_edits = []
+        self.analysis = analysis
+        self.refresh_bindings()
+        for failure in failures:
+            self.notify(str(failure), title="Unable to load", severity="warning")
+
+    @work(thread=True, exclusive=True, group="analysis")
+    def _load_module(self, name: str) -> None:
+        """Load the source of an installed Python module.
+
+        Args:
+            name: The dotted name of the module.
+
+        Notes:
+            If the compiled code for the module is cached, and is up to date
+            with the source, the cached code is used rather than the source
+            being compiled again.
+        """
+        worker = get_current_worker()
+        try:
+            module = locate_module(name)
+            if module.is_compiled:
+                self.app.call_from_thread(
+                    self._use_compiled,
+                    worker,
+                    module.origin,
+                    analyse_compiled(module.origin),
+                    [],
+                )
+                return
+            source, analysis = analyse_with_compiled(module.origin, module.cached)
+        except (
+            CompiledCodeError,
+            ImportError,
+            OSError,
+            SyntaxError,
+            UnicodeDecodeError,
+        ) as error:
+            self.app.call_from_thread(
+                self.notify,
+                str(error),
+                title=f"Unable to load {name}",
+                severity="error",
+            )
+            return
+        signature = None if analysis is None else code_signature(source)
+        if not worker.is_cancelled:
+            self.app.call_from_thread(
+                self._use_loaded_source,
+                worker,
+                source,
+                analysis,
+                signature,
+                module.origin,
+            )
+
+    def _use_loaded_source(
+        self,
+        worker: Worker[None],
+        source: str,
+        analysis: Analysis | None,
+        signature: CodeSignature | None,
+        path: Path | None,
+    ) -> None:
+        """Show some source that was loaded in the background.
+
+        Args:
+            worker: The worker that loaded the source.
+            source: The source.
+            analysis: The analysis of the source made from its cached
+                compiled code, if there is one.
+            signature: The signature of the source, if it has an analysis.
+            path: The path to the file the source was loaded from, if it was.
+        """
+        if worker.is_cancelled:
+            return
+        if analysis is None:
+            self._load_source(source, path)
+            return
+        if self._analysis_timer is not None:
+            self._analysis_timer.stop()
+            self._analysis_timer = None
+        # The source has already been analysed, so there's no need for the
+        # change of source to cause it to be analysed again.
+        self._show_text(source)
+        self._loaded_from(path, source)
+        self._analyses.put(analysis.key, analysis)
+        self._use_analysis(worker, analysis, signature)
+
     def on_mount(self) -> None:
         """Configure the display once the DOM is mounted."""
         config = load_configuration()
         self.horizontal_layout = config.horizontal_layout
         self.show_ast = config.show_ast
         self.show_disassembly = config.show_disassembly
+        self.show_package_browser = config.show_package_browser
         self.query_one(Disassembly).show_offset = config.show_offsets
         self.query_one(Disassembly).show_opcodes = config.show_opcodes
+        self.query_one(AbstractSyntaxTree).compact = config.compact_ast
         self.query_one(Source).theme = config.code_theme or "css"
         if isinstance(to_open := self._arguments.source, Path):
             self._show_source(to_open)
+        elif self._arguments.module:
+            self._load_module(self._arguments.module)
+
+    def on_unmount(self) -> None:
+        """Tidy up once the screen is unmounted."""
+        if self._compiler is not None:
+            self._compiler.close()
 
     def _watch_horizontal_layout(self) -> None:
         """React to the horizontal layout setting being changed."""
@@ -170,11 +729,21 @@ class Main(EnhancedScreen[None]):
 
     def _watch_show_disassembly(self) -> None:
         """React to the disassembly visibility state change."""
-        self.query_one(Disassembly).set_class(not self.show_disassembly, "--hidden")
+        self.query_one(Disassembly).hidden = not self.show_disassembly
+        if self.show_disassembly:
+            self.call_after_refresh(self._catch_up_with_location, Disassembly)
 
     def _watch_show_ast(self) -> None:
         """React to the AST visibility state change."""
-        self.query_one(AbstractSyntaxTree).set_class(not self.show_ast, "--hidden")
+        self.query_one(AbstractSyntaxTree).hidden = not self.show_ast
+        if self.show_ast:
+            self.call_after_refresh(self._catch_up_with_location, AbstractSyntaxTree)
+
+    def _watch_show_package_browser(self) -> None:
+        """React to the package browser visibility state change."""
+        self.query_one(PackageBrowser).hidden = not self.show_package_browser
+        if not self.show_package_browser:
+            self._cancel_prefetch()
 
     @on(LocationChanged)
     def _location_changed(self, message: LocationChanged) -> None:
@@ -182,7 +751,23 @@ class Main(EnhancedScreen[None]):
 
         Args:
             message: The message to handle.
+
+        Notes:
+            The other panels are synced with the location after the next
+            refresh, and only with the latest location, so that rapid
+            movement in one panel doesn't get held up by the others.
         """
+        if self._pending_location is None:
+            self.call_after_refresh(self._sync_location)
+        self._pending_location = message
+
+    def _sync_location(self) -> None:
+        """Sync the panels with the latest location change."""
+        if (message := self._pending_location) is None:
+            return
+        self._pending_location = None
+        self._last_location = message
+
         # If we're not in the source, or we're not getting an update from
         # the source, update the source.
         if not isinstance(message.changer, Source) and not isinstance(
@@ -191,40 +776,168 @@ class Main(EnhancedScreen[None]):
             self.query_one(Source).highlight_location(message.location)
 
         # If we're not in the disassembly, or we're not getting an update
-        # from the disassembly, update the disassembly.
+        # from the disassembly, update the disassembly (if it's visible).
         if (
-            not isinstance(message.changer, Disassembly)
+            self.show_disassembly
+            and not isinstance(message.changer, Disassembly)
             and not isinstance(self.focused, Disassembly)
             and message.location.start_line is not None
         ):
-            self.query_one(Disassembly).goto_first_instruction_on_line(
-                message.location.start_line
-            )
+            self.query_one(Disassembly).goto_location(message.location)
 
         # If we're not in the AST, or we're not getting an update from the
-        # AST, update the AST.
+        # AST, update the AST (if it's visible).
         if (
-            not isinstance(message.changer, AbstractSyntaxTree)
+            self.show_ast
+            and not isinstance(message.changer, AbstractSyntaxTree)
             and not isinstance(self.focused, AbstractSyntaxTree)
             and message.location.start_line is not None
         ):
-            self.query_one(AbstractSyntaxTree).goto_first_node_on_line(
-                message.location.start_line
-            )
+            self.query_one(AbstractSyntaxTree).goto_location(message.location)
+
+    def _catch_up_with_location(
+        self, panel: type[Disassembly] | type[AbstractSyntaxTree]
+    ) -> None:
+        """Bring a panel that has just been shown up to the latest location.
+
+        Args:
+            panel: The type of the panel that has been shown.
+
+        Notes:
+            Panels that are hidden don't follow changes of location, so
+            once one is shown again (and has been refreshed with the
+            current analysis) it is moved to the latest location.
+        """
+        if (
+            message := self._last_location
+        ) is not None and message.location.start_line is not None:
+            self.query_one(panel).goto_location(message.location)
 
     @on(Source.Changed)
     def _code_changed(self) -> None:
         """Handle the fact that the code has changed."""
-        self.code = self.query_one(Source).document.text
+        if self._analysis_timer is not None:
+            self._analysis_timer.stop()
+        self._analysis_timer = self.set_timer(
+            load_configuration().analysis_delay, self._analyse_code
+        )
+
+    def _analyse_code(self) -> None:
+        """Start the analysis of the code that's in the source editor."""
+        self._analysis_timer = None
+        source = self.query_one(Source)
+        edits = source.take_edits()
+        self._pending_edits = (
+            None
+            if self._pending_edits is None or edits is None
+            else [*self._pending_edits, *edits]
+        )
+        self._analyse(
+            text := source.document.text,
+            reduce(EditedLines.then, self._pending_edits)
+            if self._pending_edits
+            else None,
+            self.analysis,
+            text == self._loaded_text,
+        )
+
+    @work(thread=True, exclusive=True, group="analysis")
+    def _analyse(
+        self,
+        code: str,
+        edited: EditedLines | None,
+        base: Analysis | None,
+        loaded: bool = False,
+    ) -> None:
+        """Analyse the given code.
+
+        Args:
+            code: The code to analyse.
+            edited: The lines edited since the current analysis, if known.
+            base: The current analysis.
+            loaded: Is the code the code as it was loaded?
+
+        Notes:
+            If the significant content of the code hasn't changed since the
+            last time it was analysed (for example, only comments or
+            whitespace were edited) the code is left as it is.
+
+            If the edits are known, and the code is large, a quick preview
+            of the analysis is made; the code is then fully analysed once
+            the editing settles.
+
+            Only the analysis of code as it was loaded is kept in the
+            on-disk cache; every revision made while editing isn't.
+        """
+        worker = get_current_worker()
+        signature = code_signature(code)
+        if worker.is_cancelled:
+            return
+        if signature is not None and signature == self._code_signature:
+            return
+        if edited is not None and (
+            preview := self._analyses.preview_of(code, edited, base)
+        ):
+            if not worker.is_cancelled:
+                self.app.call_from_thread(
+                    self._use_analysis, worker, preview, signature, True
+                )
+            return
+        analysis = self._analyses.analysis_of(code, persist=loaded)
+        if not worker.is_cancelled:
+            self.app.call_from_thread(self._use_analysis, worker, analysis, signature)
+
+    def _use_analysis(
+        self,
+        worker: Worker[None],
+        analysis: Analysis,
+        signature: CodeSignature | None,
+        preview: bool = False,
+    ) -> None:
+        """Use the given analysis as the analysis of the code we're viewing.
+
+        Args:
+            worker: The worker that analysed the code.
+            analysis: The analysis to use.
+            signature: The signature of the code that was analysed.
+            preview: Is the analysis a preview, made while the code is edited?
+        """
+        if worker.is_cancelled:
+            return
+        if isinstance(analysis.error, CompilationFailed):
+            self.notify(
+                analysis.error.msg, title="Unable to compile", severity="warning"
+            )
+        # An approximate analysis doesn't count as the code having been
+        # analysed, so that the code will be fully analysed even if nothing
+        # significant changes.
+        self._code_signature = None if analysis.approximate else signature
+        self._pending_edits = []
+        self.analysis = analysis
         self.refresh_bindings()
+        if preview and analysis.approximate and self._analysis_timer is None:
+            self._analysis_timer = self.set_timer(
+                load_configuration().full_analysis_delay, self._analyse_fully
+            )
+
+    def _analyse_fully(self) -> None:
+        """Fully analyse the code in the source editor, once editing settles."""
+        self._analysis_timer = None
+        text = self.query_one(Source).document.text
+        self._analyse(text, None, self.analysis, text == self._loaded_text)
 
     def action_new_code_command(self) -> None:
         """Handle the new code command."""
-        self.query_one(Source).load_text("")
+        self._cancel_prefetch()
+        self._load_source("")
 
     @work
     async def action_load_file_command(self) -> None:
-        """Browse for and open a Python source file."""
+        """Browse for and open a Python source or compiled file."""
+        # The file picker is only imported when it's needed, so that it
+        # doesn't add to the time it takes to start up.
+        from textual_fspicker import FileOpen, Filters
+
         if not (
             start_location := Path(load_configuration().last_load_location or ".")
         ).is_dir():
@@ -240,12 +953,63 @@ class Main(EnhancedScreen[None]):
                         "Python",
                         lambda p: p.suffix.lower() in (".py", ".pyi", ".pyw", ".py3"),
                     ),
+                    ("Compiled", lambda p: p.suffix.lower() in COMPILED_SUFFIXES),
+                    ("Archives", lambda p: p.suffix.lower() in ARCHIVE_SUFFIXES),
                     ("All", lambda _: True),
                 ),
             )
         ):
             self._show_source(python_file)
 
+    @work
+    async def action_load_module_command(self) -> None:
+        """Ask for the name of an installed Python module and open it."""
+        if module := await self.app.push_screen_wait(
+            ModalInput(
+                placeholder="Dotted module name; for example: json.decoder",
+                title="Load Python module",
+            )
+        ):
+            self._load_module(module)
+
+    def action_toggle_package_browser_command(self) -> None:
+        """Toggle the display of the package browser."""
+        self.show_package_browser = not self.show_package_browser
+        self._save_panels()
+        if self.show_package_browser:
+            self.query_one(PackageBrowser).focus()
+
+    @work
+    async def action_browse_directory_command(self) -> None:
+        """Pick a directory of code to browse in the package browser."""
+        # As with loading a file, the picker is only imported when needed.
+        from textual_fspicker import SelectDirectory
+
+        if directory := await self.app.push_screen_wait(
+            SelectDirectory(
+                location=self.query_one(PackageBrowser).path,
+                title="Browse Python code in",
+                select_button="Browse",
+            )
+        ):
+            self._browse(directory)
+
+    def action_toggle_watch_command(self) -> None:
+        """Toggle watching the loaded file for changes."""
+        with update_configuration() as config:
+            config.watch_files = not config.watch_files
+        self._monitor_loaded_file()
+        self.notify(
+            "Loaded files will be reloaded when they change"
+            if load_configuration().watch_files
+            else "Loaded files will no longer be reloaded when they change",
+            title="Watching",
+        )
+
+    def action_toggle_highlighting_command(self) -> None:
+        """Toggle the syntax highlighting of the source."""
+        self.query_one(Source).toggle_highlighting()
+
     def action_switch_layout_command(self) -> None:
         """Switch the layout of the window."""
         self.horizontal_layout = not self.horizontal_layout
@@ -266,11 +1030,19 @@ class Main(EnhancedScreen[None]):
         with update_configuration() as config:
             config.show_opcodes = show
 
+    def action_toggle_compact_ast_command(self) -> None:
+        """Toggle the compact display of the AST."""
+        compact = not self.query_one(AbstractSyntaxTree).compact
+        self.query_one(AbstractSyntaxTree).compact = compact
+        with update_configuration() as config:
+            config.compact_ast = compact
+
     def _save_panels(self) -> None:
         """Remember which panels are visible."""
         with update_configuration() as config:
             config.show_ast = self.show_ast
             config.show_disassembly = self.show_disassembly
+            config.show_package_browser = self.show_package_browser
 
     def check_action(self, action: str, parameters: tuple[object, ...]) -> bool | None:
         """Check if an action is possible to perform right now.
@@ -290,7 +1062,7 @@ class Main(EnhancedScreen[None]):
             # little MRE I'll report it).
             return True
         if action == OpcodeCounts.action_name():
-            return not self.query_one(Disassembly).error or None
+            return (self.analysis is not None and self.analysis.error is None) or None
         return True
 
     def action_show_disassembly_only_command(self) -> None:
@@ -317,8 +1089,47 @@ class Main(EnhancedScreen[None]):
 
     def action_opcode_counts_command(self) -> None:
         """Show the count of opcodes in the current code."""
-        if not self.query_one(Disassembly).error:
-            self.app.push_screen(OpcodeCountsView(self.code or ""))
+        if self.analysis is not None and self.analysis.error is None:
+            self.app.push_screen(OpcodeCountsView(self.analysis), self._goto_code)
+
+    def _goto_code(self, key: str | None) -> None:
+        """Go to a code object in the disassembly.
+
+        Args:
+            key: The key that identifies the code object, or `None` to stay put.
+        """
+        if key is None:
+            return
+        if not self.show_disassembly:
+            self.show_disassembly = True
+            self._save_panels()
+        if (disassembly := self.query_one(Disassembly)).goto_code(key):
+            disassembly.focus()
+        else:
+            self.notify(
+                "Unable to find that code in the disassembly",
+                title="Error",
+                severity="error",
+            )
+
+    @work
+    async def action_project_opcode_counts_command(self) -> None:
+        """Browse for a directory and show the count of opcodes within it."""
+        # As with loading a file, the picker is only imported when needed.
+        from textual_fspicker import SelectDirectory
+
+        if not (
+            start_location := Path(load_configuration().last_load_location or ".")
+        ).is_dir():
+            start_location = Path(".")
+        if directory := await self.app.push_screen_wait(
+            SelectDirectory(
+                location=start_location,
+                title="Count opcodes in",
+                select_button="Count",
+            )
+        ):
+            self.app.push_screen(ProjectOpcodeCountsView(directory))
 
     @on(SetCodeTheme)
     def _set_code_theme(self, message: SetCodeTheme) -> None:
@@ -3,17 +3,21 @@
 ##############################################################################
 # Python imports.
 from collections import Counter
-from dis import Bytecode
-from operator import itemgetter
-from types import CodeType
+from typing import Final
+
+##############################################################################
+# Rich imports.
+from rich.text import Text
 
 ##############################################################################
 # Textual imports.
-from textual import on
+from textual import on, work
 from textual.app import ComposeResult
 from textual.containers import Center, Vertical
 from textual.screen import ModalScreen
-from textual.widgets import Button, DataTable
+from textual.widgets import Button, DataTable, TabbedContent, TabPane
+from textual.widgets.data_table import ColumnKey
+from textual.worker import get_current_worker
 
 ##############################################################################
 # Textual enhanced imports.
@@ -21,12 +25,29 @@ from textual_enhanced.tools import add_key
 
 ##############################################################################
 # Local imports.
+from ..analysis import Analysis, CodeCounts, code_counts
 from ..python_docs import visit_operation
 
+##############################################################################
+COUNT_WIDTH: Final[int] = 10
+"""The width of the count column."""
+ROWS_PER_UPDATE: Final[int] = 100
+"""The number of code objects to add to the breakdown at a time."""
+CODE_COLUMN: Final[str] = "code"
+"""The key of the column that holds the name of each code object."""
+TOTAL_COLUMN: Final[str] = "total"
+"""The key of the column that holds the total for each code object."""
+
 
 ##############################################################################
-class OpcodeCountsView(ModalScreen[None]):
-    """Dialog that displays a table of opcode counts."""
+class OpcodeCountsView(ModalScreen[str | None]):
+    """Dialog that displays a table of opcode counts.
+
+    As well as the count of each opcode within all of the code, there is a
+    breakdown of the counts for each code object. If a code object is
+    selected from the breakdown, the dialog is dismissed with the key of
+    the code object.
+    """
 
     CSS = """
     OpcodeCountsView {
@@ -35,19 +56,22 @@ class OpcodeCountsView(ModalScreen[None]):
         & > Vertical {
             width: auto;
             height: auto;
+            max-width: 90%;
             background: $panel;
             border: panel $border;
             max-height: 80%;
 
-            #table-sizer {
+            TabbedContent, TabPane {
+                width: auto;
                 height: auto;
                 max-height: 70vh;
-                width: auto;
             }
 
             DataTable {
                 margin: 1 2;
                 width: auto;
+                height: auto;
+                max-height: 60vh;
                 background: $panel;
                 &:focus {
                     background-tint: $foreground 0%;
@@ -63,15 +87,17 @@ class OpcodeCountsView(ModalScreen[None]):
 
     BINDINGS = [("escape", "close")]
 
-    def __init__(self, code: str) -> None:
+    def __init__(self, analysis: Analysis) -> None:
         """Initialise the dialog.
 
         Args:
-            code: The code to show the counts for.
+            analysis: The analysis of the code to show the counts for.
         """
         super().__init__()
-        self._code = code
-        """The code to show the counts for."""
+        self._analysis = analysis
+        """The analysis of the code to show the counts for."""
+        self._sorted_by: tuple[ColumnKey, bool] | None = None
+        """The column the breakdown is sorted by, and if it's reversed."""
 
     def compose(self) -> ComposeResult:
         """Compose the dialog.
@@ -81,55 +107,143 @@ class OpcodeCountsView(ModalScreen[None]):
         """
         with Vertical() as dialog:
             dialog.border_title = "Opcode counts"
-            with Vertical(id="table-sizer"):
-                yield DataTable()
+            with TabbedContent():
+                with TabPane("Totals"):
+                    yield DataTable(id="totals")
+                with TabPane("By code"):
+                    yield DataTable(id="by-code")
             with Center():
                 yield Button(add_key("Close", "Esc"))
 
-    @classmethod
-    def _operation_count(cls, operations: Bytecode) -> Counter[str]:
-        """Get the operation counts for the given code.
+    def on_mount(self) -> None:
+        """Start counting once the DOM is loaded."""
+        for table in self.query(DataTable):
+            table.cursor_type = "row"
+            table.loading = True
+        self._count()
+
+    @staticmethod
+    def _count_cell(count: int) -> Text:
+        """Make the cell for a count within a table.
 
         Args:
-            operations: The operations to take a count from.
+            count: The count.
 
         Returns:
-            The count of operations within the code.
+            The cell, with any count of zero left empty.
+        """
+        return Text(str(count) if count else "", justify="right")
+
+    @work(thread=True, exclusive=True)
+    def _count(self) -> None:
+        """Count the opcodes, in the background.
+
+        Notes:
+            All of the counting is done in a single pass over the code; the
+            counts for each code object are then added to the breakdown a
+            batch at a time, so that a large body of code fills in
+            progressively. If the breakdown is sorted while it is filling
+            in, it is sorted again once it's filled.
+        """
+        worker = get_current_worker()
+        totals: Counter[str] = Counter()
+        by_code: list[CodeCounts] = []
+        for counts in code_counts(self._analysis):
+            if worker.is_cancelled:
+                return
+            totals.update(counts.counts)
+            by_code.append(counts)
+        opcodes = [opcode for opcode, _ in totals.most_common()]
+        self.app.call_from_thread(self._show_totals, totals, opcodes)
+        for start in range(0, len(by_code), ROWS_PER_UPDATE):
+            if worker.is_cancelled:
+                return
+            self.app.call_from_thread(
+                self._add_code, by_code[start : start + ROWS_PER_UPDATE], opcodes
+            )
+        if not worker.is_cancelled:
+            self.app.call_from_thread(self._finish_breakdown)
+
+    def _show_totals(self, totals: Counter[str], opcodes: list[str]) -> None:
+        """Show the totals for all of the code.
+
+        Args:
+            totals: The count of each opcode within all of the code.
+            opcodes: The opcodes, most common first.
+        """
+        table = self.query_one("#totals", DataTable)
+        table.add_columns("Opcode", "Count".rjust(COUNT_WIDTH))
+        for opcode in opcodes:
+            table.add_row(opcode, f"{totals[opcode]:>{COUNT_WIDTH}}", key=opcode)
+        table.loading = False
+        breakdown = self.query_one("#by-code", DataTable)
+        breakdown.add_column("Code", key=CODE_COLUMN)
+        breakdown.add_column(Text("Total", justify="right"), key=TOTAL_COLUMN)
+        for opcode in opcodes:
+            breakdown.add_column(Text(opcode, justify="right"), key=opcode)
+
+    def _add_code(self, counts: list[CodeCounts], opcodes: list[str]) -> None:
+        """Add some code objects to the breakdown.
+
+        Args:
+            counts: The counts for the code objects to add.
+            opcodes: The opcodes, in the order of the columns of the breakdown.
+        """
+        breakdown = self.query_one("#by-code", DataTable)
+        for code in counts:
+            breakdown.add_row(
+                Text(code.name),
+                self._count_cell(code.counts.total()),
+                *(self._count_cell(code.counts[opcode]) for opcode in opcodes),
+                key=code.key,
+            )
+        breakdown.loading = False
+
+    def _finish_breakdown(self) -> None:
+        """Finish off the breakdown once all of the code objects are added."""
+        self.query_one("#by-code", DataTable).loading = False
+        if self._sorted_by is not None:
+            self._sort(*self._sorted_by)
+
+    def _sort(self, column: ColumnKey, reverse: bool) -> None:
+        """Sort the breakdown.
+
+        Args:
+            column: The column to sort on.
+            reverse: Sort in reverse order?
         """
-        return sum(
-            [
-                cls._operation_count(Bytecode(instruction.argval))
-                for instruction in operations
-                if isinstance(instruction.argval, CodeType)
-            ],
-            Counter(instruction.opname for instruction in operations),
+        self._sorted_by = (column, reverse)
+        self.query_one("#by-code", DataTable).sort(
+            column,
+            key=lambda cell: (
+                cell.plain if column.value == CODE_COLUMN else int(cell.plain or 0)
+            ),
+            reverse=reverse,
         )
 
-    def on_mount(self) -> None:
-        """Populate the dialog once the DOM is loaded."""
-        count_width = 10
-        operations: Bytecode | None = None
-        try:
-            operations = Bytecode(self._code)
-        except SyntaxError:
-            pass
-        if operations is not None:
-            table = self.query_one(DataTable)
-            table.cursor_type = "row"
-            table.add_columns("Opcode", "Count".rjust(count_width))
-            for opcode, count in sorted(
-                self._operation_count(operations).items(),
-                key=itemgetter(1),
-                reverse=True,
-            ):
-                table.add_row(opcode, f"{count:>{count_width}}", key=opcode)
+    @on(DataTable.HeaderSelected, "#by-code")
+    def _sort_breakdown(self, message: DataTable.HeaderSelected) -> None:
+        """Sort the breakdown on the selected column.
+
+        Args:
+            message: The message to react to.
+
+        Notes:
+            Counts are sorted largest first; selecting the same column again
+            flips the order.
+        """
+        if self._sorted_by is not None and self._sorted_by[0] == message.column_key:
+            reverse = not self._sorted_by[1]
+        else:
+            reverse = message.column_key.value != CODE_COLUMN
+        self._sort(message.column_key, reverse)
 
     @on(Button.Pressed)
     def action_close(self) -> None:
         """Close the dialog."""
-        self.dismiss()
+        self.dismiss(None)
 
-    @on(DataTable.RowSelected)
+    @on(DataTable.RowSelected, "#totals")
     def _about_opcode(self, message: DataTable.RowSelected) -> None:
         """Show information about the selected opcode.
 
@@ -139,5 +253,15 @@ class OpcodeCountsView(ModalScreen[None]):
         if (opname := message.row_key.value) is not None:
             visit_operation(opname)
 
+    @on(DataTable.RowSelected, "#by-code")
+    def _goto_code(self, message: DataTable.RowSelected) -> None:
+        """Go to the selected code object.
+
+        Args:
+            message: The message to react to.
+        """
+        if (key := message.row_key.value) is not None:
+            self.dismiss(key)
+
 
 ### opcode_counts.py ends here
@@ -0,0 +1,253 @@
+"""Dialog that shows opcode counts for a whole directory of code."""
+
+##############################################################################
+# Python imports.
+from collections import Counter
+from contextlib import closing
+from pathlib import Path
+from time import monotonic
+from typing import Final
+
+##############################################################################
+# Textual imports.
+from textual import on, work
+from textual.app import ComposeResult
+from textual.containers import Center, Horizontal, Vertical
+from textual.screen import ModalScreen
+from textual.widgets import Button, DataTable, Tree
+from textual.widgets.tree import TreeNode
+from textual.worker import get_current_worker
+
+##############################################################################
+# Textual enhanced imports.
+from textual_enhanced.tools import add_key
+
+##############################################################################
+# Local imports.
+from ..analysis import ModuleCounts, ProjectCounts, count_project
+from ..python_docs import visit_operation
+
+##############################################################################
+UPDATE_INTERVAL: Final[float] = 0.25
+"""How often, in seconds, to update the display while counting."""
+COUNT_WIDTH: Final[int] = 10
+"""The width of the count column."""
+
+
+##############################################################################
+class ProjectOpcodeCountsView(ModalScreen[None]):
+    """Dialog that displays opcode counts for a whole directory of code."""
+
+    CSS = """
+    ProjectOpcodeCountsView {
+        align: center middle;
+
+        & > Vertical {
+            width: 90%;
+            height: 80%;
+            background: $panel;
+            border: panel $border;
+
+            #scopes {
+                height: 1fr;
+                margin: 1 2 0 2;
+            }
+
+            Tree {
+                width: 1fr;
+                background: $panel;
+            }
+
+            DataTable {
+                width: auto;
+                margin-left: 2;
+                background: $panel;
+                &:focus {
+                    background-tint: $foreground 0%;
+                }
+            }
+
+            Center {
+                width: 100%;
+                height: auto;
+                margin-top: 1;
+            }
+        }
+    }
+    """
+
+    BINDINGS = [("escape", "close")]
+
+    def __init__(self, directory: Path) -> None:
+        """Initialise the dialog.
+
+        Args:
+            directory: The directory of code to show the counts for.
+        """
+        super().__init__()
+        self._directory = directory
+        """The directory of code to show the counts for."""
+        self._counts = ProjectCounts()
+        """The counts so far."""
+        self._packages: dict[str, TreeNode[Counter[str]]] = {}
+        """The nodes for the packages that have been seen so far, keyed on name."""
+
+    def compose(self) -> ComposeResult:
+        """Compose the dialog.
+
+        Returns:
+            The content of the dialog.
+        """
+        with Vertical() as dialog:
+            dialog.border_title = f"Opcode counts for {self._directory}"
+            with Horizontal(id="scopes"):
+                yield Tree[Counter[str]]("All code", data=self._counts.overall)
+                yield DataTable()
+            with Center():
+                yield Button(add_key("Close", "Esc"))
+
+    def on_mount(self) -> None:
+        """Start counting once the DOM is loaded."""
+        table = self.query_one(DataTable)
+        table.cursor_type = "row"
+        table.add_column("Opcode", key="opcode")
+        table.add_column("Count".rjust(COUNT_WIDTH), key="count")
+        table.add_column("%".rjust(6), key="percent")
+        self.query_one(Tree).root.expand()
+        self._count()
+
+    @work(thread=True, exclusive=True)
+    def _count(self) -> None:
+        """Count the opcodes in the directory, in the background."""
+        worker = get_current_worker()
+        counted: list[ModuleCounts] = []
+        last_update = monotonic()
+        with closing(count_project(self._directory)) as counts:
+            for module in counts:
+                if worker.is_cancelled:
+                    return
+                counted.append(module)
+                if monotonic() - last_update >= UPDATE_INTERVAL:
+                    self.app.call_from_thread(self._add, counted)
+                    counted = []
+                    last_update = monotonic()
+        if not worker.is_cancelled:
+            self.app.call_from_thread(self._add, counted, True)
+
+    def _node_for(
+        self, package: str, parent: TreeNode[Counter[str]]
+    ) -> TreeNode[Counter[str]]:
+        """Get the node for a package, adding it if it isn't there yet.
+
+        Args:
+            package: The name of the package.
+            parent: The node for the package that contains the package.
+
+        Returns:
+            The node for the package.
+        """
+        if (node := self._packages.get(package)) is None:
+            label = package.rpartition(".")[-1]
+            node = self._packages[package] = parent.add(
+                label,
+                self._counts.packages[package],
+                before=self._insertion_point(parent, label),
+            )
+        return node
+
+    @staticmethod
+    def _insertion_point(
+        parent: TreeNode[Counter[str]], label: str
+    ) -> TreeNode[Counter[str]] | None:
+        """Find where a node should go to keep the children of a node sorted.
+
+        Args:
+            parent: The node the new node will be added to.
+            label: The label of the new node.
+
+        Returns:
+            The node to add the new node before, or `None` to add it at the end.
+        """
+        for child in parent.children:
+            if str(child.label) > label:
+                return child
+        return None
+
+    def _add(self, counted: list[ModuleCounts], finished: bool = False) -> None:
+        """Add some newly-counted modules to the display.
+
+        Args:
+            counted: The modules that have been counted.
+            finished: Is this the last of the modules?
+        """
+        tree = self.query_one(Tree)
+        for module in counted:
+            self._counts.add(module)
+            if module.error is not None:
+                continue
+            parent = tree.root
+            for package in module.packages:
+                parent = self._node_for(package, parent)
+            parent.add_leaf(
+                module.path.stem,
+                module.counts,
+                before=self._insertion_point(parent, module.path.stem),
+            )
+        failures = (
+            f", {len(self._counts.failures)} couldn't be compiled"
+            if self._counts.failures
+            else ""
+        )
+        self.query_one(Vertical).border_subtitle = (
+            f"{len(self._counts.modules)} modules{failures}"
+            f"{'' if finished else ' - counting...'}"
+        )
+        self._show_counts()
+
+    def _show_counts(self) -> None:
+        """Show the counts for the highlighted part of the code."""
+        counts = (
+            self._counts.overall
+            if (node := self.query_one(Tree).cursor_node) is None or node.data is None
+            else node.data
+        )
+        table = self.query_one(DataTable)
+        highlighted = (
+            table.coordinate_to_cell_key(table.cursor_coordinate).row_key.value
+            if table.row_count
+            else None
+        )
+        table.clear()
+        total = counts.total() or 1
+        for opcode, count in counts.most_common():
+            table.add_row(
+                opcode,
+                f"{count:>{COUNT_WIDTH}}",
+                f"{count / total:>6.1%}",
+                key=opcode,
+            )
+        if highlighted is not None and highlighted in counts:
+            table.move_cursor(row=table.get_row_index(highlighted), scroll=False)
+
+    @on(Tree.NodeHighlighted)
+    def _scope_changed(self) -> None:
+        """React to a different part of the code being highlighted."""
+        self._show_counts()
+
+    @on(Button.Pressed)
+    def action_close(self) -> None:
+        """Close the dialog."""
+        self.dismiss()
+
+    @on(DataTable.RowSelected)
+    def _about_opcode(self, message: DataTable.RowSelected) -> None:
+        """Show information about the selected opcode.
+
+        Args:
+            message: The message to react to.
+        """
+        if (opname := message.row_key.value) is not None:
+            visit_operation(opname)
+
+
+### project_counts.py ends here
@@ -2,7 +2,7 @@
 
 ##############################################################################
 # Python imports.
-from typing import NamedTuple
+from typing import NamedTuple, Self
 
 
 ##############################################################################
@@ -36,4 +36,37 @@ class Location(NamedTuple):
         )
 
 
+##############################################################################
+class EditedLines(NamedTuple):
+    """The range of lines affected by one or more edits to some code."""
+
+    first_line: int
+    """The first line affected by the edits."""
+    last_line: int
+    """The last line affected by the edits, as the code is now."""
+    line_delta: int
+    """The change in the number of lines in the code."""
+
+    def then(self, edited: Self) -> Self:
+        """Combine these edits with edits that came after them.
+
+        Args:
+            edited: The lines affected by the later edits.
+
+        Returns:
+            The range of lines affected by both sets of edits.
+        """
+        if self.last_line < edited.first_line:
+            last_line = self.last_line
+        elif self.last_line > edited.last_line - edited.line_delta:
+            last_line = self.last_line + edited.line_delta
+        else:
+            last_line = edited.last_line
+        return self.__class__(
+            min(self.first_line, edited.first_line),
+            max(last_line, edited.last_line),
+            self.line_delta + edited.line_delta,
+        )
+
+
 ### types.py ends here
@@ -0,0 +1,170 @@
+"""Tools for noticing when a file changes on disk."""
+
+##############################################################################
+# Python imports.
+from ctypes import CDLL
+from ctypes.util import find_library
+from hashlib import sha256
+from os import close, read
+from pathlib import Path
+from select import select
+from sys import platform
+from time import sleep
+from typing import Final, NamedTuple
+
+##############################################################################
+WATCH_INTERVAL: Final[float] = 1.0
+"""How often, in seconds, to check a file that can't be watched with inotify."""
+_IN_MODIFY: Final[int] = 0x00000002
+"""inotify event for a file being modified."""
+_IN_ATTRIB: Final[int] = 0x00000004
+"""inotify event for the metadata of a file changing."""
+_IN_CLOSE_WRITE: Final[int] = 0x00000008
+"""inotify event for a file that was open for writing being closed."""
+_IN_MOVED_TO: Final[int] = 0x00000080
+"""inotify event for a file being moved into the watched directory."""
+_IN_CREATE: Final[int] = 0x00000100
+"""inotify event for a file being created."""
+_IN_DELETE: Final[int] = 0x00000200
+"""inotify event for a file being deleted."""
+_IN_NONBLOCK: Final[int] = 0o4000
+"""Flag to make the inotify file descriptor non-blocking."""
+_IN_CLOEXEC: Final[int] = 0o2000000
+"""Flag to close the inotify file descriptor when executing another program."""
+
+
+##############################################################################
+class FileState(NamedTuple):
+    """The state of a file, as far as knowing if it has changed goes."""
+
+    mtime: int
+    """The modification time of the file, in nanoseconds."""
+    size: int
+    """The size of the file."""
+
+    @classmethod
+    def of(cls, path: Path) -> "FileState | None":
+        """Get the state of a file.
+
+        Args:
+            path: The path to the file.
+
+        Returns:
+            The state of the file, or `None` if it can't be found.
+        """
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return cls(stat.st_mtime_ns, stat.st_size)
+
+
+##############################################################################
+def text_hash(text: str) -> str:
+    """Get the hash of the content of a file.
+
+    Args:
+        text: The text of the file.
+
+    Returns:
+        The hash of the text.
+    """
+    return sha256(text.encode("utf-8", errors="surrogatepass")).hexdigest()
+
+
+##############################################################################
+class FileWatcher:
+    """Waits for a file to possibly change.
+
+    On Linux the directory that holds the file is watched with inotify (the
+    directory, rather than the file, so that editors that save by replacing
+    the file are noticed too); anywhere else, or if inotify can't be used,
+    the watcher simply waits for a while and leaves it to the caller to
+    check the file.
+    """
+
+    def __init__(self, path: Path, interval: float = WATCH_INTERVAL) -> None:
+        """Initialise the watcher.
+
+        Args:
+            path: The path to the file to watch.
+            interval: The longest time, in seconds, to wait at a time.
+        """
+        self._interval = interval
+        """The longest time, in seconds, to wait at a time."""
+        self._inotify = self._watch(path.absolute().parent)
+        """The inotify file descriptor, if inotify is being used."""
+
+    @staticmethod
+    def _watch(directory: Path) -> int | None:
+        """Start watching a directory with inotify.
+
+        Args:
+            directory: The directory to watch.
+
+        Returns:
+            The inotify file descriptor, or `None` if inotify can't be used.
+        """
+        if not platform.startswith("linux") or (library := find_library("c")) is None:
+            return None
+        try:
+            libc = CDLL(library, use_errno=True)
+            if (inotify := libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)) < 0:
+                return None
+        except (AttributeError, OSError):
+            return None
+        if (
+            libc.inotify_add_watch(
+                inotify,
+                bytes(directory),
+                _IN_MODIFY
+                | _IN_ATTRIB
+                | _IN_CLOSE_WRITE
+                | _IN_MOVED_TO
+                | _IN_CREATE
+                | _IN_DELETE,
+            )
+            < 0
+        ):
+            close(inotify)
+            return None
+        return int(inotify)
+
+    @property
+    def uses_inotify(self) -> bool:
+        """Is the file being watched with inotify?"""
+        return self._inotify is not None
+
+    def wait(self) -> bool:
+        """Wait for the file to possibly change.
+
+        Returns:
+            `True` if the file may have changed, `False` if it hasn't.
+
+        Notes:
+            This waits no longer than the interval given when the watcher
+            was made, so that the caller can stop watching if it wants.
+            When inotify isn't in use the file may always have changed.
+        """
+        if self._inotify is None:
+            sleep(self._interval)
+            return True
+        if not select([self._inotify], [], [], self._interval)[0]:
+            return False
+        # None of the detail of the events is needed, as the caller checks
+        # the file itself, so all that's needed is to clear them out.
+        try:
+            while read(self._inotify, 65536):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self) -> None:
+        """Stop watching the file."""
+        if self._inotify is not None:
+            close(self._inotify)
+            self._inotify = None
+
+
+### watcher.py ends here
@@ -4,11 +4,12 @@
 # Local imports.
 from .ast import AbstractSyntaxTree
 from .disassembly import Disassembly
+from .package_browser import PackageBrowser
 from .source import Source
 
 ##############################################################################
 # Exports
-__all__ = ["AbstractSyntaxTree", "Disassembly", "Source"]
+__all__ = ["AbstractSyntaxTree", "Disassembly", "PackageBrowser", "Source"]
 
 
 ### __init__.py ends here
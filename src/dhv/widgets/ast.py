@@ -2,8 +2,10 @@
 
 ##############################################################################
 # Python imports.
-from ast import AST, AsyncFunctionDef, ClassDef, FunctionDef, parse
+from ast import AST, AsyncFunctionDef, ClassDef, FunctionDef
+from collections.abc import Iterator
 from functools import singledispatchmethod
+from itertools import islice
 from typing import Any, Self
 
 ##############################################################################
@@ -12,10 +14,11 @@ from rich.markup import escape
 
 ##############################################################################
 # Textual imports.
-from textual import on
+from textual import on, work
 from textual.reactive import var
 from textual.widgets import Tree
 from textual.widgets.tree import TreeNode
+from textual.worker import get_current_worker
 
 ##############################################################################
 # Textual enhanced imports.
@@ -23,6 +26,7 @@ from textual_enhanced.binding import HelpfulBinding
 
 ##############################################################################
 # Local imports.
+from ..analysis import Analysis, ASTIndex, index_ast, location_of
 from ..messages import LocationChanged
 from ..python_docs import visit_ast
 from ..types import Location
@@ -60,21 +64,38 @@ class AbstractSyntaxTree(Tree[Any]):
 
     This panel is the abstract syntax tree of the Python source code.
 
+    For large code the tree isn't shown until it is asked for; select the
+    placeholder to show it.
+
     The following keys can be used as shortcuts in this panel:
     """
 
-    code: var[str | None] = var(None)
-    """The code to show the AST of."""
+    analysis: var[Analysis | None] = var(None)
+    """The analysis of the code to show the AST of."""
 
     error: var[bool] = var(False)
     """Is there an error with the code we've been given?"""
 
+    compact: var[bool] = var(False, init=False)
+    """Should the AST be shown in compact form?"""
+
+    hidden: var[bool] = var(False)
+    """Is the AST hidden?"""
+
+    deferred: var[bool] = var(False, init=False)
+    """Is showing the AST put off until it is asked for?"""
+
     def __init__(
-        self, id: str | None = None, classes: str | None = None, disabled: bool = False
+        self,
+        expand_depth: int = 3,
+        id: str | None = None,
+        classes: str | None = None,
+        disabled: bool = False,
     ) -> None:
         """Initialise the object.
 
         Args:
+            expand_depth: How many levels of the tree to expand by default.
             id: The ID of the AST widget in the DOM.
             classes: The CSS classes of the AST widget.
             disabled: Whether the AST widget is disabled or not.
@@ -84,12 +105,19 @@ class AbstractSyntaxTree(Tree[Any]):
         self.border_title = "AST"
         self.show_guides = False
         self.guide_depth = 1
-        self._line_to_node_map: dict[int, ASTNode] = {}
-        """A map to help translate a line number to a node in the tree."""
+        self._expand_depth = expand_depth
+        """How many levels of the tree to expand by default."""
+        self._unpopulated: dict[int, Any] = {}
+        """The values yet to be added below nodes, keyed on the node's ID."""
+        self._stale = False
+        """Has the AST to show changed while the AST was hidden?"""
+        self._index: ASTIndex | None = None
+        """The index of the locations of the items in the AST being shown."""
 
     def clear(self) -> Self:
         """Clear down the AST tree."""
-        self._line_to_node_map = {}
+        self._unpopulated = {}
+        self._index = None
         return super().clear()
 
     @classmethod
@@ -114,32 +142,95 @@ class AbstractSyntaxTree(Tree[Any]):
         Returns:
             The location, or `None` if nothing could be worked out.
         """
-        if all(
-            hasattr(node.data, location_property)
-            for location_property in (
-                "lineno",
-                "col_offset",
-                "end_lineno",
-                "end_col_offset",
-            )
-        ):
-            return Location(
-                getattr(node.data, "lineno", None),
-                getattr(node.data, "col_offset", None),
-                getattr(node.data, "end_lineno", None),
-                getattr(node.data, "end_col_offset", None),
-            )
+        if isinstance(node.data, AST) and (location := location_of(node.data)):
+            return location
         elif node.parent is not None:
             return cls._location_of(node.parent)
         return None
 
+    @classmethod
+    def _inlined(cls, value: Any) -> bool:
+        """Should the value be shown as part of its parent in compact form?
+
+        Args:
+            value: The value to consider.
+
+        Returns:
+            `True` if the value is to be inlined, `False` if not.
+
+        Notes:
+            Scalar values, along with AST items that have no fields (the
+            likes of expression contexts and operators), are inlined.
+        """
+        if isinstance(value, (list, tuple)):
+            return all(cls._inlined(child) for child in value)
+        return not (isinstance(value, AST) and value._fields)
+
+    @classmethod
+    def _inline_text(cls, value: Any) -> str:
+        """Get the text to show for an inlined value.
+
+        Args:
+            value: The value to get the text for.
+
+        Returns:
+            The text for the value.
+        """
+        if isinstance(value, AST):
+            return value.__class__.__name__
+        if isinstance(value, (list, tuple)):
+            return f"[{', '.join(cls._inline_text(child) for child in value)}]"
+        return repr(value)
+
+    def _fields_of(self, item: AST) -> Iterator[tuple[str, Any]]:
+        """Get the fields of an AST item that get their own nodes.
+
+        Args:
+            item: The AST item to get the fields of.
+
+        Yields:
+            The name and value of each field.
+        """
+        for field in item._fields:
+            if self.maybe_add(value := getattr(item, field)) and not (
+                self.compact and self._inlined(value)
+            ):
+                yield field, value
+
+    def _compact_label(self, item: AST, field: str | None) -> str:
+        """Get the label for an AST item in compact form.
+
+        Args:
+            item: The AST item to get the label for.
+            field: The name of the field the item is in.
+
+        Returns:
+            The label for the item.
+        """
+        return " ".join(
+            (
+                *((f"[dim]{escape(field)}:[/]",) if field else ()),
+                escape(item.__class__.__name__),
+                *(
+                    f"[dim]{escape(name)}=[/]{escape(self._inline_text(value))}"
+                    for name in item._fields
+                    if (value := getattr(item, name)) is not None
+                    and self.maybe_add(value)
+                    and self._inlined(value)
+                ),
+            )
+        )
+
     @singledispatchmethod
-    def _base_node(self, item: Any, to_node: ASTNode) -> ASTNode:
+    def _base_node(
+        self, item: Any, to_node: ASTNode, field: str | None = None
+    ) -> ASTNode:
         """Attach a base node.
 
         Args:
             item: The item to associate with the node.
             to_node: The node to attach to.
+            field: The name of the field the item is in.
 
         Returns:
             The new node.
@@ -147,33 +238,32 @@ class AbstractSyntaxTree(Tree[Any]):
         return to_node.add(escape(item.__class__.__name__), data=item)
 
     @_base_node.register
-    def _(self, item: AST, to_node: ASTNode) -> ASTNode:
+    def _(self, item: AST, to_node: ASTNode, field: str | None = None) -> ASTNode:
         """Attach a base node.
 
         Args:
             item: The item to associate with the node.
             to_node: The node to attach to.
+            field: The name of the field the item is in.
 
         Returns:
             The new node.
         """
+        if self.compact:
+            return to_node.add(self._compact_label(item, field), data=item)
         label = f"{escape(item.__class__.__name__)}"
         if isinstance(item, (ClassDef, FunctionDef, AsyncFunctionDef)):
             label = f"{label} [dim italic]{escape(item.name)}[/]"
-        node = to_node.add(label, data=item)
-        if (
-            location := self._location_of(to_node)
-        ) is not None and location.line_number not in self._line_to_node_map:
-            self._line_to_node_map[location.line_number] = node
-        return node
+        return to_node.add(label, data=item)
 
     @_base_node.register
-    def _(self, item: str, to_node: ASTNode) -> ASTNode:
+    def _(self, item: str, to_node: ASTNode, field: str | None = None) -> ASTNode:
         """Attach a base node.
 
         Args:
             item: The item to associate with the node.
             to_node: The node to attach to.
+            field: The name of the field the item is in.
 
         Returns:
             The new node.
@@ -181,54 +271,175 @@ class AbstractSyntaxTree(Tree[Any]):
         return to_node.add(escape(item), data=item)
 
     @singledispatchmethod
-    def _add(self, item: Any, to_node: ASTNode) -> Self:
+    def _add(self, item: Any, to_node: ASTNode, field: str | None = None) -> Self:
         """Add an AST item to the tree.
 
         Args:
             item: The AST item to add.
             to_node: The node to add it to.
+            field: The name of the field the item is in.
         """
         if isinstance(item, (list, tuple)):
             for child_item in item:
-                self._add(child_item, to_node)
+                self._add(child_item, to_node, field)
         else:
             to_node.add_leaf(escape(repr(item)), data=item)
         return self
 
     @_add.register
-    def _(self, item: AST, to_node: ASTNode) -> Self:
+    def _(self, item: AST, to_node: ASTNode, field: str | None = None) -> Self:
         """Add an AST item to the tree.
 
         Args:
             item: The ast entry to add.
             to_node: The node to add to.
+            field: The name of the field the item is in.
         """
-        node = self._base_node(item, to_node)
-        if item._fields:
-            for field in item._fields:
-                if self.maybe_add(value := getattr(item, field)):
-                    self._add(value, self._base_node(field, node))
-        else:
-            node.allow_expand = False
+        node = self._base_node(item, to_node, field)
+        node.allow_expand = any(True for _ in self._fields_of(item))
+        if node.allow_expand:
+            self._unpopulated[node.id] = item
         return self
 
+    def _populate(self, node: ASTNode) -> ASTNode:
+        """Add the children of a node, if they've not been added yet.
+
+        Args:
+            node: The node to populate.
+
+        Returns:
+            The node.
+        """
+        if node.id in self._unpopulated:
+            item = self._unpopulated.pop(node.id)
+            if item is node.data and isinstance(item, AST):
+                for field, value in self._fields_of(item):
+                    if self.compact:
+                        self._add(value, node, field)
+                    else:
+                        self._unpopulated[self._base_node(field, node).id] = value
+            else:
+                self._add(item, node)
+        return node
+
+    def _expand_to_depth(self, node: ASTNode, depth: int) -> None:
+        """Expand a node, and those below it, down to a given depth.
+
+        Args:
+            node: The node to expand.
+            depth: The number of levels to expand.
+        """
+        if depth > 0 and node.allow_expand:
+            self._populate(node).expand()
+            for child in node.children:
+                self._expand_to_depth(child, depth - 1)
+
+    @on(Tree.NodeExpanded)
+    def _node_expanded(self, message: Tree.NodeExpanded[Any]) -> None:
+        """Populate a node when it is expanded.
+
+        Args:
+            message: The message to handle.
+        """
+        self._populate(message.node)
+
     def _watch_error(self) -> None:
         """React to the error state being toggled."""
         self.set_class(self.error, "--error")
 
-    def _watch_code(self) -> None:
-        """React to the code being changed."""
-        if not self.code:
+    def _watch_compact(self) -> None:
+        """React to the compact setting being changed."""
+        self._show_analysis()
+
+    def _watch_deferred(self) -> None:
+        """React to showing the AST being put off, or asked for."""
+        self._show_analysis()
+
+    def _watch_analysis(self) -> None:
+        """React to the analysis being changed."""
+        self._show_analysis()
+
+    def _watch_hidden(self) -> None:
+        """React to the AST being hidden or shown."""
+        self.set_class(self.hidden, "--hidden")
+        if not self.hidden and self._stale:
+            self._show_analysis()
+
+    def _show_analysis(self) -> None:
+        """Show the AST of the current analysis.
+
+        Notes:
+            Nothing is done with the AST while the panel is hidden, or while
+            showing the AST is put off; the AST is always parsed, and
+            indexed, away from the UI thread.
+        """
+        if self.hidden:
+            self._stale = True
+            return
+        self._stale = False
+        if self.analysis is None or not self.analysis.source:
             self.clear()
             return
-        try:
-            ast = parse(self.code)
-        except SyntaxError:
+        if self.deferred:
+            self.error = False
+            self.move_cursor(
+                self.clear().root.add_leaf(
+                    "[dim italic]The AST of large code isn't shown until asked for; select this to show it[/]"
+                )
+            )
+            return
+        if self.analysis.ast is None:
             self.error = True
             return
         self.error = False
-        self.clear()._add(ast, self.root).root.expand_all()
+        self.clear()._add(self.analysis.ast, self.root)
+        with self.prevent(Tree.NodeExpanded):
+            for node in self.root.children:
+                self._expand_to_depth(node, self._expand_depth)
         self.move_cursor(self.root)
+        self._index_ast(self.analysis.ast)
+
+    @work(thread=True, exclusive=True)
+    def _index_ast(self, tree: AST) -> None:
+        """Index the locations of the items in an AST.
+
+        Args:
+            tree: The AST to index.
+        """
+        index = index_ast(tree)
+        if not get_current_worker().is_cancelled:
+            self.app.call_from_thread(self._use_index, tree, index)
+
+    def _use_index(self, tree: AST, index: ASTIndex) -> None:
+        """Use an index of the locations of the items in an AST.
+
+        Args:
+            tree: The AST that was indexed.
+            index: The index of the AST.
+        """
+        if (root := self._tree_root()) is not None and root.data is tree:
+            self._index = index
+
+    def _tree_root(self) -> ASTNode | None:
+        """Get the node for the root of the AST being shown.
+
+        Returns:
+            The node, or `None` if there isn't an AST being shown.
+        """
+        if self.root.children and isinstance(self.root.children[0].data, AST):
+            return self.root.children[0]
+        return None
+
+    @on(Tree.NodeSelected)
+    def _show_deferred(self, message: Tree.NodeSelected[Any]) -> None:
+        """Show the AST if it was put off and has now been asked for.
+
+        Args:
+            message: The message to handle.
+        """
+        if self.deferred:
+            message.stop()
+            self.deferred = False
 
     @on(Tree.NodeHighlighted)
     def _ast_node_highlighted(self, message: Tree.NodeHighlighted[ASTNode]) -> None:
@@ -241,15 +452,128 @@ class AbstractSyntaxTree(Tree[Any]):
             message.stop()
             self.post_message(LocationChanged(self, location))
 
+    @staticmethod
+    def _children_of(item: AST) -> Iterator[tuple[str, AST]]:
+        """Get the AST items directly below an AST item.
+
+        Args:
+            item: The AST item to get the children of.
+
+        Yields:
+            The name of the field each child is in, along with the child.
+        """
+        for field in item._fields:
+            value = getattr(item, field)
+            for child in value if isinstance(value, (list, tuple)) else (value,):
+                if isinstance(child, AST):
+                    yield field, child
+
+    @classmethod
+    def _path_to_line(cls, item: AST, line: int) -> list[tuple[str, AST]] | None:
+        """Find the path to the first AST item that's related to a line.
+
+        Args:
+            item: The AST item to search within.
+            line: The line to find the AST item for.
+
+        Returns:
+            The path to the AST item, as a list of field names and AST
+            items, or `None` if nothing could be found.
+
+        Notes:
+            The item related to a line is the first item within the
+            outermost item that starts on that line.
+        """
+        for field, child in cls._children_of(item):
+            if (location := location_of(child)) is not None:
+                if (start := location.line_number) == line:
+                    return [(field, child), *islice(cls._children_of(child), 1)]
+                # Decorators come before the line a definition starts on.
+                start = min(
+                    [
+                        start,
+                        *(
+                            decorator.lineno
+                            for decorator in getattr(child, "decorator_list", ())
+                        ),
+                    ]
+                )
+                if not start <= line <= (location.end_line or start):
+                    continue
+            if (path := cls._path_to_line(child, line)) is not None:
+                return [(field, child), *path]
+        return None
+
     def goto_first_node_on_line(self, line: int) -> None:
         """Go to the first node that's related to the given line.
 
         Args:
             line: The line to find a node for.
+
+        Notes:
+            Only the nodes on the path to the node that is found are added
+            to the tree.
+        """
+        if (
+            (root := self._tree_root()) is not None
+            and isinstance(tree := root.data, AST)
+            and (path := self._path_to_line(tree, line)) is not None
+        ):
+            self._goto_path(root, path)
+
+    def goto_location(self, location: Location) -> None:
+        """Go to the node that most closely relates to a location.
+
+        Args:
+            location: The location to find a node for.
+
+        Notes:
+            If the location is a span the innermost node that encloses it is
+            preferred; failing that the innermost node at the start of the
+            location is used, and failing that the first node related to the
+            line.
+        """
+        if (root := self._tree_root()) is None or location.start_line is None:
+            return
+        if (index := self._index) is not None:
+            item = index.items.enclosing(location)
+            if item is None and location.start_column is not None:
+                item = index.items.innermost(location.start_line, location.start_column)
+            if item is not None:
+                self._goto_path(root, index.path_to(item))
+                return
+        self.goto_first_node_on_line(location.start_line)
+
+    def _goto_path(self, node: ASTNode, path: list[tuple[str, AST]]) -> None:
+        """Go to the node at the end of a path through the AST.
+
+        Args:
+            node: The node to start from.
+            path: The path to follow, as a list of field names and AST items.
+
+        Notes:
+            Only the nodes on the path are added to the tree.
         """
-        if (node := self._line_to_node_map.get(line)) is not None:
-            with self.prevent(Tree.NodeHighlighted):
-                self.move_cursor(node)
+        with self.prevent(Tree.NodeExpanded, Tree.NodeHighlighted):
+            for field, item in path:
+                parent = self._populate(node).expand()
+                if not self.compact:
+                    parent = next(
+                        child for child in parent.children if child.data == field
+                    )
+                    self._populate(parent).expand()
+                if (
+                    child := next(
+                        (child for child in parent.children if child.data is item),
+                        None,
+                    )
+                ) is None:
+                    # Inlined in compact form, so stick with the parent.
+                    break
+                node = child
+            # Make sure the tree knows where the node now is.
+            _ = self._tree_lines
+            self.move_cursor(node)
 
     def _closest_ast(self, node: ASTNode) -> AST | None:
         """Get the closest AST item to the given tree node.
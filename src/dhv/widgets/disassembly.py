@@ -2,24 +2,33 @@
 
 ##############################################################################
 # Python imports.
-from collections.abc import Iterator
-from dis import Bytecode, Instruction, opname
-from statistics import median_high
+from collections.abc import Hashable, Iterator, Sequence
+from difflib import SequenceMatcher
+from dis import Instruction
+from itertools import groupby
+from operator import attrgetter
 from types import CodeType
-from typing import Final
+from typing import NamedTuple, cast
 
 ##############################################################################
 # Rich imports.
-from rich.console import Group
+from rich.cells import cell_len
+from rich.console import Console, Group, RenderableType
 from rich.markup import escape
 from rich.rule import Rule
 from rich.table import Table
+from rich.text import Text
 
 ##############################################################################
 # Textual imports.
-from textual import on
+from textual import on, work
+from textual.css.styles import RulesMap
 from textual.reactive import var
+from textual.strip import Strip
+from textual.style import Style
+from textual.visual import RenderOptions, RichVisual, Visual
 from textual.widgets.option_list import Option, OptionDoesNotExist
+from textual.worker import Worker, get_current_worker
 
 ##############################################################################
 # Textual enhanced imports.
@@ -28,33 +37,160 @@ from textual_enhanced.widgets import EnhancedOptionList
 
 ##############################################################################
 # Local imports.
+from ..analysis import (
+    LINE_NUMBER_WIDTH,
+    OFFSET_WIDTH,
+    OPNAME_WIDTH,
+    Analysis,
+    CodeHeading,
+    DisplaySettings,
+    FailedBlock,
+    IntervalIndex,
+    LRUCache,
+    code_name,
+    collapsed_listing,
+    listing,
+    operation_argument,
+    operation_line_number,
+)
 from ..messages import LocationChanged
 from ..python_docs import visit_operation
 from ..types import Location
 
-##############################################################################
-LINE_NUMBER_WIDTH: Final[int] = 6
-"""Width for line numbers."""
-OFFSET_WIDTH: Final[int] = 4
-"""The width of the display of the offset."""
-OPNAME_WIDTH: Final[int] = median_high(len(operation) for operation in opname) + 10
-"""The default width to use for opcode names."""
-
 
 ##############################################################################
 class Code(Option):
     """Option that marks a new disassembly."""
 
-    def __init__(self, code: CodeType) -> None:
+    def __init__(
+        self,
+        widget: "Disassembly",
+        code: CodeType,
+        key: str,
+        first_line: int | None = None,
+        folded: bool = False,
+    ) -> None:
         """Initialise the object.
 
         Args:
+            widget: The widget that will show the option.
             code: The code that will follow.
+            key: The key that identifies the code.
+            first_line: The line to show as the first line of the code.
+            folded: Is the content of the code left out of the display?
         """
-        super().__init__(
-            Group("", Rule(f"[dim bold]@{hex(id(code))}[/]", style="dim bold")),
-            id=f"{hex(id(code))}",
+        self._key = key
+        """The key that identifies the code."""
+        self._folded = folded
+        """Is the content of the code left out of the display?"""
+        self._display = Group(
+            "",
+            Rule(
+                f"[dim bold]@{escape(code_name(code, first_line))}{' …' if folded else ''}[/]",
+                style="dim bold",
+            ),
+        )
+        """The display of the option."""
+        super().__init__(OptionVisual(widget, self), id=key)
+
+    @property
+    def group(self) -> str:
+        """The key of the code this option belongs to."""
+        return self._key
+
+    def display(self, settings: DisplaySettings) -> RenderableType:
+        """Make the display of the option.
+
+        Args:
+            settings: The settings to display the option with.
+
+        Returns:
+            The display of the option.
+        """
+        del settings
+        return self._display
+
+    def height_at(
+        self, width: int, settings: DisplaySettings, console: Console
+    ) -> int | None:
+        """Get the height of the option's display.
+
+        Args:
+            width: The width the option will be shown at.
+            settings: The settings the option will be shown with.
+            console: The console the option will be shown with.
+
+        Returns:
+            The height of the display; a blank line and a rule.
+        """
+        del width, settings, console
+        return 2
+
+    @property
+    def signature(self) -> Hashable:
+        """A value that changes if the display of the option would change."""
+        return self._key, self._folded
+
+
+##############################################################################
+class BlockError(Option):
+    """Option that marks a block of code that couldn't be compiled."""
+
+    def __init__(self, widget: "Disassembly", error: SyntaxError) -> None:
+        """Initialise the object.
+
+        Args:
+            widget: The widget that will show the option.
+            error: The error that stopped the block being compiled.
+        """
+        where = "" if error.lineno is None else f" (line {error.lineno})"
+        self._display = Group(
+            "",
+            Rule(
+                f"[bold]{escape(error.msg)}{where}[/]",
+                style="bold red",
+            ),
         )
+        """The display of the option."""
+        super().__init__(OptionVisual(widget, self), disabled=True)
+
+    @property
+    def group(self) -> None:
+        """The key of the code this option belongs to."""
+        return None
+
+    def display(self, settings: DisplaySettings) -> RenderableType:
+        """Make the display of the option.
+
+        Args:
+            settings: The settings to display the option with.
+
+        Returns:
+            The display of the option.
+        """
+        del settings
+        return self._display
+
+    def height_at(
+        self, width: int, settings: DisplaySettings, console: Console
+    ) -> int | None:
+        """Get the height of the option's display.
+
+        Args:
+            width: The width the option will be shown at.
+            settings: The settings the option will be shown with.
+            console: The console the option will be shown with.
+
+        Returns:
+            The height of the display; a blank line and a rule.
+        """
+        del width, settings, console
+        return 2
+
+    @property
+    def signature(self) -> Hashable:
+        """A value that changes if the display of the option would change."""
+        return None
 
 
 ##############################################################################
@@ -63,92 +199,378 @@ class Operation(Option):
 
     def __init__(
         self,
+        widget: "Disassembly",
         operation: Instruction,
         *,
-        opname_width: int = OPNAME_WIDTH,
-        show_offset: bool = False,
-        show_opcode: bool = False,
         code: CodeType | None = None,
+        code_key: str | None = None,
+        argval_key: str | None = None,
     ) -> None:
         """Initialise the object.
 
         Args:
+            widget: The widget that will show the operation.
             operation: The operation.
-            show_offset: Show the offset in the display?
-            show_opcode: Show the opcode in the display?
             code: The code that the operation came from.
+            code_key: The key that identifies the code the operation came from.
+            argval_key: The key that identifies the code that is the argument.
+
+        Notes:
+            How the operation looks is decided when it is shown, with
+            [`display`][dhv.widgets.disassembly.Operation.display], so that
+            the same option can be shown with any display settings.
         """
         self._operation = operation
         """The operation being displayed."""
         self._code = code
         """The code the operation came from."""
+        self._code_key = code_key
+        """The key that identifies the code the operation came from."""
+        self._argval_key = argval_key
+        """The key that identifies the code that is the operation's argument."""
+        self._line_number = operation_line_number(operation)
+        """The line number to show for the operation."""
+        self._argument = operation_argument(operation)
+        """The text of the argument to show for the operation."""
+        self._fragments: tuple[Text, Text, Text, Text, Text] | None = None
+        """The styled text of the parts of the display, once they're needed."""
+        self._signature = (
+            code_key,
+            self._line_number,
+            operation.line_number,
+            operation.positions,
+            operation.offset,
+            operation.opcode,
+            self._argument,
+            isinstance(operation.argval, CodeType),
+            operation.label if operation.is_jump_target else None,
+            operation.jump_target,
+            argval_key,
+        )
+        """A value that changes if the display of the operation would change."""
+        super().__init__(
+            OptionVisual(widget, self), id=self.make_id(operation.offset, code_key)
+        )
+
+    def _styled(self) -> tuple[Text, Text, Text, Text, Text]:
+        """Get the styled text of the parts of the display.
+
+        Returns:
+            The line number, the offset, the opname, the opname along with
+            the opcode, and the argument.
+        """
+        if self._fragments is None:
+            operation = self._operation
+            self._fragments = (
+                Text(self._line_number),
+                Text(str(operation.offset), style="dim"),
+                Text(operation.opname),
+                Text.assemble(operation.opname, (f" ({operation.opcode})", "dim")),
+                Text.assemble(("code@", "dim"), self._argument.removeprefix("code@"))
+                if isinstance(operation.argval, CodeType)
+                else Text(self._argument),
+            )
+        return self._fragments
 
+    def display(self, settings: DisplaySettings) -> RenderableType:
+        """Make the display of the operation.
+
+        Args:
+            settings: The settings to display the operation with.
+
+        Returns:
+            The display of the operation.
+        """
+        line_number, offset, opname, opname_and_code, argument = self._styled()
         display = Table.grid(expand=True, padding=1)
         display.add_column(width=LINE_NUMBER_WIDTH)
-        display.add_column(width=OFFSET_WIDTH if show_offset else 0)
-        display.add_column(width=opname_width)
+        display.add_column(width=OFFSET_WIDTH if settings.show_offset else 0)
+        display.add_column(width=settings.opname_width)
         display.add_column(ratio=1)
         display.add_row(
-            str(operation.line_number)
-            if operation.line_number is not None and operation.starts_line
-            else "",
-            f"[dim]{operation.offset}[/]",
-            f"{operation.opname} [dim]({operation.opcode})[/]"
-            if show_opcode
-            else operation.opname,
-            f"[dim]code@[/]{hex(id(operation.argval))}"
-            if isinstance(operation.argval, CodeType)
-            # With Python 3.14, LOAD_SMALL_INT at least has no populated
-            # argrepr value despite having a value, so here we use argrepr
-            # if it has a value, and if not we repr any non-None argval.
-            # This could result in a false negative I guess, but I'd hope
-            # that mostly argrepr does the right thing.
-            else escape(
-                operation.argrepr
-                or (repr(operation.argval) if operation.argval is not None else "")
-            ),
+            line_number,
+            offset,
+            opname_and_code if settings.show_opcode else opname,
+            argument,
         )
-        super().__init__(
+        return (
             Group(
                 Rule(
-                    f"[italic dim]-- L{operation.label}[/]",
+                    Text(f"-- L{self._operation.label}", style="italic dim"),
                     align="left",
                     style="dim",
                     characters="-",
                 ),
                 display,
             )
-            if operation.is_jump_target
-            else display,
-            id=self.make_id(operation.offset, code),
+            if self._operation.is_jump_target
+            else display
         )
 
+    def height_at(
+        self, width: int, settings: DisplaySettings, console: Console
+    ) -> int | None:
+        """Get the height of the operation's display, if it's easy to know.
+
+        Args:
+            width: The width the operation will be shown at.
+            settings: The settings the operation will be shown with.
+            console: The console the operation will be shown with.
+
+        Returns:
+            The height of the display, or `None` if it would need rendering
+            to know it.
+
+        Notes:
+            The height is worked out from how the opname and the argument
+            wrap within their columns, which is a lot cheaper than rendering
+            the whole display. If the display is too narrow for the columns
+            to have the widths they ask for, `None` is returned.
+        """
+        if (
+            argument_width := width
+            - LINE_NUMBER_WIDTH
+            - (OFFSET_WIDTH if settings.show_offset else 0)
+            - settings.opname_width
+            # One cell of padding between each of the columns.
+            - 3
+        ) < 1:
+            return None
+        operation = self._operation
+        height = max(
+            self._wrapped_height(
+                f"{operation.opname} ({operation.opcode})"
+                if settings.show_opcode
+                else operation.opname,
+                settings.opname_width,
+                console,
+            ),
+            self._wrapped_height(self._argument, argument_width, console),
+        )
+        return height + 1 if self._operation.is_jump_target else height
+
+    @staticmethod
+    def _wrapped_height(text: str, width: int, console: Console) -> int:
+        """Get the height of some text when wrapped within a column.
+
+        Args:
+            text: The text to wrap.
+            width: The width of the column.
+            console: The console the text will be shown with.
+
+        Returns:
+            The number of lines the text will take up.
+        """
+        if cell_len(text) <= width and "\n" not in text:
+            return 1
+        return len(Text(text, overflow="ellipsis").wrap(console, width))
+
     @property
     def operation(self) -> Instruction:
         """The operation being displayed."""
         return self._operation
 
+    @property
+    def location(self) -> Location:
+        """The location in the source of the operation."""
+        if (position := self._operation.positions) is None:
+            return Location(self._operation.line_number)
+        return Location(
+            position.lineno,
+            position.col_offset,
+            position.end_lineno,
+            position.end_col_offset,
+        )
+
     @property
     def code(self) -> CodeType | None:
         """The code that the operation belongs to."""
         return self._code
 
+    @property
+    def code_key(self) -> str | None:
+        """The key that identifies the code the operation belongs to."""
+        return self._code_key
+
+    @property
+    def argval_key(self) -> str | None:
+        """The key that identifies the code that is the operation's argument."""
+        return self._argval_key
+
+    @property
+    def group(self) -> str | None:
+        """The key of the code this option belongs to."""
+        return self._code_key
+
+    @property
+    def signature(self) -> Hashable:
+        """A value that changes if the display of the option would change."""
+        return self._signature
+
     @staticmethod
-    def make_id(offset: int, code: CodeType | None = None) -> str | None:
+    def make_id(offset: int, code_key: str | None = None) -> str | None:
         """Make an ID for the given operation.
 
         Args:
            offset: The offset of the instruction.
-           code: The code the instruction came from.
+           code_key: The key that identifies the code the instruction came from.
 
         Returns:
             The ID for the operation, or [`None`] if one isn't needed.
         """
-        if code:
-            return f"operation-{hex(id(code))}-{offset}"
+        if code_key:
+            return f"operation-{code_key}-{offset}"
         return f"operation-{offset}"
 
 
+##############################################################################
+type DisassemblyOption = Code | BlockError | Operation
+"""The type of an option in the disassembly display."""
+
+
+##############################################################################
+class OptionVisual(Visual):
+    """A visual that renders an option only when it needs to be seen.
+
+    The visual is the prompt of the option it shows, and remembers the
+    height of the option, so an option that is kept when the display is
+    updated doesn't need to be measured again.
+    """
+
+    def __init__(self, widget: "Disassembly", option: DisassemblyOption) -> None:
+        """Initialise the object.
+
+        Args:
+            widget: The widget that is showing the option.
+            option: The option to show.
+
+        Notes:
+            The option is shown using the current display settings of the
+            widget.
+        """
+        self._widget = widget
+        """The widget that is showing the option."""
+        self._option = option
+        """The option to show."""
+        self._measured: tuple[int, DisplaySettings, int] | None = None
+        """The width and settings the option was last measured at, and its height."""
+
+    def render_strips(
+        self, width: int, height: int | None, style: Style, options: RenderOptions
+    ) -> list[Strip]:
+        """Render the option.
+
+        Args:
+            width: The width of the render.
+            height: The height of the render, or `None` for any height.
+            style: The base style to render on top of.
+            options: Additional render options.
+
+        Returns:
+            The strips that make up the render.
+        """
+        return RichVisual(
+            self._widget, self._option.display(self._widget.display_settings)
+        ).render_strips(width, height, style, options)
+
+    def get_optimal_width(self, rules: RulesMap, container_width: int) -> int:
+        """Get the optimal width of the option.
+
+        Args:
+            rules: The style rules.
+            container_width: The width of the container.
+
+        Returns:
+            The optimal width; options always expand to fill the container.
+        """
+        return container_width
+
+    def get_height(self, rules: RulesMap, width: int) -> int:
+        """Get the height of the option when shown at the given width.
+
+        Args:
+            rules: The style rules.
+            width: The width the option will be shown at.
+
+        Returns:
+            The height of the option.
+        """
+        settings = self._widget.display_settings
+        if (measured := self._measured) is not None and measured[:2] == (
+            width,
+            settings,
+        ):
+            return measured[2]
+        if (
+            height := self._option.height_at(width, settings, self._widget.app.console)
+        ) is None:
+            height = RichVisual(
+                self._widget, self._option.display(settings)
+            ).get_height(rules, width)
+        self._measured = (width, settings, height)
+        return height
+
+
+##############################################################################
+def _reuse_options(
+    old: Sequence[DisassemblyOption], new: Sequence[DisassemblyOption]
+) -> list[DisassemblyOption]:
+    """Reuse the options of an old display, where possible, in a new display.
+
+    Args:
+        old: The options of the old display.
+        new: The options of the new display.
+
+    Returns:
+        The options of the new display, with any option that would look and
+        behave the same as an option in the old display replaced by that
+        option.
+
+    Notes:
+        The options are compared a code object at a time, with the
+        operations of each code object being diffed against the operations
+        of the code object with the same key in the old display.
+    """
+    old_groups: dict[str, list[DisassemblyOption]] = {}
+    for option in old:
+        if option.group is not None:
+            old_groups.setdefault(option.group, []).append(option)
+    reused: list[DisassemblyOption] = []
+    for group, grouped in groupby(new, key=attrgetter("group")):
+        options = list(grouped)
+        if group is None or (previous := old_groups.get(group)) is None:
+            reused.extend(options)
+            continue
+        old_signatures = [option.signature for option in previous]
+        new_signatures = [option.signature for option in options]
+        if old_signatures == new_signatures:
+            reused.extend(previous)
+            continue
+        for tag, old_start, old_end, new_start, new_end in SequenceMatcher(
+            None, old_signatures, new_signatures, autojunk=False
+        ).get_opcodes():
+            reused.extend(
+                previous[old_start:old_end]
+                if tag == "equal"
+                else options[new_start:new_end]
+            )
+    return reused
+
+
+##############################################################################
+class DisassemblyDisplay(NamedTuple):
+    """The options and location maps that make up a disassembly display."""
+
+    options: list[DisassemblyOption]
+    """The options to show in the display."""
+    line_map: dict[int, int]
+    """A map of line numbers to locations within the display."""
+    positions: IntervalIndex[int]
+    """An index of the source positions of the operations within the display."""
+    source_size: int
+    """The size of the source the display was made from."""
+
+
 ##############################################################################
 class Disassembly(EnhancedOptionList):
     """Widget that displays Python code disassembly."""
@@ -181,6 +603,12 @@ class Disassembly(EnhancedOptionList):
             show=False,
             tooltip="Decrease the width of the opname column",
         ),
+        HelpfulBinding(
+            "c",
+            "collapse",
+            "Collapse",
+            tooltip="Toggle collapsing the disassembly to the top-level code",
+        ),
     ]
 
     HELP = """
@@ -188,11 +616,15 @@ class Disassembly(EnhancedOptionList):
 
     This panel is the disassembly of the Python source code.
 
+    When the disassembly is collapsed only the top-level code is shown,
+    along with the headings of the code objects it defines; select a
+    heading to show or hide the code within it.
+
     The following keys can be used as shortcuts in this panel:
     """
 
-    code: var[str | None] = var(None)
-    """The code to disassemble."""
+    analysis: var[Analysis | None] = var(None)
+    """The analysis of the code to disassemble."""
 
     show_offset: var[bool] = var(False, init=False)
     """Show the offset of each instruction?"""
@@ -206,8 +638,20 @@ class Disassembly(EnhancedOptionList):
     error: var[bool] = var(False)
     """Is there an error with the code we've been given?"""
 
+    hidden: var[bool] = var(False)
+    """Is the disassembly hidden?"""
+
+    collapsed: var[bool] = var(False, init=False)
+    """Is the disassembly collapsed to the top-level code?"""
+
     def __init__(
-        self, id: str | None = None, classes: str | None = None, disabled: bool = False
+        self,
+        id: str | None = None,
+        classes: str | None = None,
+        disabled: bool = False,
+        *,
+        cache_entries: int = 32,
+        cache_source_size: int | None = None,
     ):
         """Initialise the object.
 
@@ -216,82 +660,266 @@ class Disassembly(EnhancedOptionList):
             id: The ID of the disassembly in the DOM.
             classes: The CSS classes of the disassembly.
             disabled: Whether the disassembly is disabled or not.
+            cache_entries: The maximum number of displays to cache.
+            cache_source_size: The maximum total size of source to cache displays for.
         """
         super().__init__(id=id, classes=classes, disabled=disabled)
         self._line_map: dict[int, int] = {}
         """A map of line numbers to locations within the disassembly display."""
+        self._positions: IntervalIndex[int] = IntervalIndex(())
+        """An index of source positions to locations within the disassembly display."""
+        self._displays: LRUCache[str, DisassemblyDisplay] = LRUCache(
+            cache_entries, cache_source_size, lambda display: display.source_size
+        )
+        """A cache of previously-built displays."""
+        self._shown: DisassemblyDisplay | None = None
+        """The display that is currently being shown."""
+        self._display_settings = DisplaySettings()
+        """The settings for how operations are displayed."""
+        self._stale = False
+        """Has the analysis changed while the disassembly was hidden?"""
+        self._expanded: set[str] = set()
+        """The keys of the code objects expanded while the disassembly is collapsed."""
         self.border_title = "Disassembly"
 
-    def _make_options(self, code: Bytecode) -> Iterator[Code | Operation]:
-        """Make the options for the list from the given code.
+    def _make_options(
+        self, analysis: Analysis, expanded: frozenset[str] | None = None
+    ) -> Iterator[DisassemblyOption]:
+        """Make the options for the list from the given analysis.
 
         Args:
-            code: The code to make the options from.
+            analysis: The analysis to make the options from.
+            expanded: The keys of the code objects to expand, if the
+                disassembly is to be collapsed.
 
         Yields:
-            Either a `Code` or an `Operation` option.
+            Either a `Code`, a `BlockError` or an `Operation` option.
+
+        Notes:
+            The options follow the [listing][dhv.analysis.listing] of the
+            analysis, so they're in the same order as any dump of the code.
         """
-        for operation in code:
-            yield Operation(
-                operation,
-                opname_width=self.opname_width,
-                show_offset=self.show_offset,
-                show_opcode=self.show_opcodes,
-                code=code.codeobj,
-            )
-        for operation in code:
-            if isinstance(operation.argval, CodeType):
-                yield Code(operation.argval)
-                yield from self._make_options(Bytecode(operation.argval))
+        for item in (
+            listing(analysis)
+            if expanded is None
+            else collapsed_listing(analysis, expanded)
+        ):
+            if isinstance(item, CodeHeading):
+                yield Code(self, item.code, item.key, item.first_line, item.folded)
+            elif isinstance(item, FailedBlock):
+                yield BlockError(self, item.error)
+            else:
+                yield Operation(
+                    self,
+                    item.operation,
+                    code=item.code,
+                    code_key=item.code_key,
+                    argval_key=item.argval_key,
+                )
 
     def _watch_error(self) -> None:
         """React to the error state being toggled."""
         self.set_class(self.error, "--error")
 
+    def _make_display(
+        self, analysis: Analysis, expanded: frozenset[str] | None = None
+    ) -> DisassemblyDisplay:
+        """Make the display for the given analysis.
+
+        Args:
+            analysis: The analysis to make the display for.
+            expanded: The keys of the code objects to expand, if the
+                display is to be collapsed.
+
+        Returns:
+            The display.
+        """
+        options = list(self._make_options(analysis, expanded))
+        line_map: dict[int, int] = {}
+        for line, option in enumerate(options):
+            if (
+                isinstance(option, Operation)
+                and (operation := option.operation).starts_line
+                and operation.line_number is not None
+            ):
+                line_map.setdefault(operation.line_number, line)
+        return DisassemblyDisplay(
+            options,
+            line_map,
+            IntervalIndex(
+                (option.location, line)
+                for line, option in enumerate(options)
+                if isinstance(option, Operation)
+            ),
+            len(analysis.source),
+        )
+
     def _repopulate(self) -> None:
         """Fully repopulate the display."""
-        # Build the code up first.
-        try:
-            operations = Bytecode(self.code or "")
-        except SyntaxError:
+        self._build_display(
+            self.analysis,
+            frozenset(self._expanded) if self.collapsed else None,
+            self._shown,
+        )
+
+    @work(thread=True, exclusive=True)
+    def _build_display(
+        self,
+        analysis: Analysis | None,
+        expanded: frozenset[str] | None,
+        shown: DisassemblyDisplay | None,
+    ) -> None:
+        """Build the display for an analysis.
+
+        Args:
+            analysis: The analysis to build the display for.
+            expanded: The keys of the code objects to expand, if the
+                display is to be collapsed.
+            shown: The display that is currently being shown.
+        """
+        worker = get_current_worker()
+        if analysis is None:
+            return
+        if analysis.error is not None:
             # There was an error so nope out, but keep the display as is so
             # the user can see what was and also doesn't keep getting code
             # disappear and then appear again.
+            self.app.call_from_thread(self._populate, worker, None)
+            return
+        # An approximate analysis has the same key as the full analysis of
+        # the same source, but doesn't have the same display.
+        key = f"{analysis.key}/approximate" if analysis.approximate else analysis.key
+        if expanded is not None:
+            # A collapsed display depends on what has been expanded as well
+            # as on the analysis, and is cheap to make anyway, so it isn't
+            # cached.
+            display = self._make_display(analysis, expanded)
+        elif (cached := self._displays.get(key)) is not None:
+            display = cached
+        else:
+            display = self._make_display(analysis)
+        if shown is not None and shown is not display:
+            display = display._replace(
+                options=_reuse_options(shown.options, display.options)
+            )
+        if expanded is None:
+            self._displays.put(key, display)
+        if not worker.is_cancelled:
+            self.app.call_from_thread(self._populate, worker, display)
+
+    def _populate(
+        self, worker: Worker[None], display: DisassemblyDisplay | None
+    ) -> None:
+        """Populate the display.
+
+        Args:
+            worker: The worker that built the display.
+            display: The display to show, or `None` if there was an error.
+        """
+        # If the work has been superseded, there's nothing to do here.
+        if worker.is_cancelled:
+            return
+
+        # If there was an error, flag it and leave the display as it is.
+        if display is None:
             self.error = True
             return
         self.error = False
 
-        # Get the options and add them to the option list.
-        with self.preserved_highlight:
-            self.clear_options().add_options(
-                options := list(self._make_options(operations))
-            )
+        # Swap in the new options.
+        if display is not self._shown:
+            with self.preserved_highlight:
+                self._replace_options(display.options)
+            self._shown = display
+        self._line_map = display.line_map
+        self._positions = display.positions
 
-        # Build the line map.
-        self._line_map = (line_map := {})
-        for line, option in enumerate(options):
-            if (
-                isinstance(option, Operation)
-                and (operation := option.operation).starts_line
-                and operation.line_number is not None
-            ):
-                line_map[operation.line_number] = line
+    def _replace_options(self, options: Sequence[Option]) -> None:
+        """Replace the options in the list.
 
-    def _watch_code(self) -> None:
-        """React to the code being changed."""
-        self._repopulate()
+        Args:
+            options: The new options for the list.
+
+        Notes:
+            Options that are in both the old and the new options remember
+            their height, so only the options that are actually new need
+            measuring; and as the options are only rendered when they're
+            seen, that's all the work there is. The list is kept scrolled
+            to where it was.
+        """
+        scroll_y = self.scroll_y
+        self.set_options(options)
+        self.scroll_y = scroll_y
+
+    def _watch_analysis(self) -> None:
+        """React to the analysis being changed."""
+        self.border_subtitle = (
+            "approximate"
+            if self.analysis is not None and self.analysis.approximate
+            else ""
+        )
+        if self.hidden:
+            self._stale = True
+        else:
+            self._repopulate()
+
+    def _watch_collapsed(self) -> None:
+        """React to the disassembly being collapsed or expanded."""
+        self._expanded.clear()
+        self._watch_analysis()
+
+    def collapse(self, collapsed: bool = True) -> None:
+        """Collapse, or expand, the disassembly.
+
+        Args:
+            collapsed: Should the disassembly be collapsed?
+
+        Notes:
+            Any code objects that were expanded within the collapsed
+            disassembly are collapsed again.
+        """
+        self._expanded.clear()
+        self.collapsed = collapsed
+
+    def _watch_hidden(self) -> None:
+        """React to the disassembly being hidden or shown."""
+        self.set_class(self.hidden, "--hidden")
+        if not self.hidden and self._stale:
+            self._stale = False
+            self._repopulate()
+
+    @property
+    def display_settings(self) -> DisplaySettings:
+        """The settings for how operations are displayed."""
+        return self._display_settings
+
+    def _restyle(self) -> None:
+        """Render the display again with the current display settings.
+
+        Notes:
+            The options themselves don't change when the display settings
+            change, so there's no need to make them again; all that's needed
+            is to put them back in the list, so that they're measured and
+            rendered again with the new settings.
+        """
+        self._display_settings = DisplaySettings(
+            self.opname_width, self.show_offset, self.show_opcodes
+        )
+        with self.preserved_highlight:
+            self._replace_options(list(self.options))
+        self.call_after_refresh(self.scroll_to_highlight)
 
     def _watch_show_offset(self) -> None:
         """React to the show offset flag being toggled."""
-        self._repopulate()
+        self._restyle()
 
     def _watch_show_opcodes(self) -> None:
         """React to the show opcodes flag being toggled."""
-        self._repopulate()
+        self._restyle()
 
     def _watch_opname_width(self) -> None:
         """React to the opname column width being changed."""
-        self._repopulate()
+        self._restyle()
 
     @on(EnhancedOptionList.OptionHighlighted)
     def _instruction_highlighted(
@@ -304,19 +932,7 @@ class Disassembly(EnhancedOptionList):
         """
         message.stop()
         if isinstance(message.option, Operation):
-            self.post_message(
-                LocationChanged(
-                    self,
-                    Location(message.option.operation.line_number)
-                    if (position := message.option.operation.positions) is None
-                    else Location(
-                        position.lineno,
-                        position.col_offset,
-                        position.end_lineno,
-                        position.end_col_offset,
-                    ),
-                )
-            )
+            self.post_message(LocationChanged(self, message.option.location))
 
     @on(EnhancedOptionList.OptionSelected)
     def _maybe_jump_to_code(self, message: EnhancedOptionList.OptionSelected) -> None:
@@ -326,14 +942,15 @@ class Disassembly(EnhancedOptionList):
             message: The message to handle.
         """
         message.stop()
-        if isinstance(message.option, Operation):
-            if isinstance(message.option.operation.argval, CodeType):
-                self.highlighted = self.get_option_index(
-                    hex(id(message.option.operation.argval))
-                )
+        if isinstance(message.option, Code) and self.collapsed:
+            self._expanded.symmetric_difference_update({message.option.group})
+            self._watch_analysis()
+        elif isinstance(message.option, Operation):
+            if message.option.argval_key is not None:
+                self.highlighted = self.get_option_index(message.option.argval_key)
             elif (message.option.operation.jump_target is not None) and (
                 jump_id := Operation.make_id(
-                    message.option.operation.jump_target, message.option.code
+                    message.option.operation.jump_target, message.option.code_key
                 )
             ):
                 try:
@@ -355,6 +972,61 @@ class Disassembly(EnhancedOptionList):
             with self.prevent(EnhancedOptionList.OptionHighlighted):
                 self.highlighted = self._line_map[line]
 
+    def goto_location(self, location: Location) -> None:
+        """Go to the instruction that most closely relates to a location.
+
+        Args:
+            location: The location to find the instruction for.
+
+        Notes:
+            If the location is a span the innermost instruction that
+            encloses it is preferred; failing that the innermost instruction
+            at the start of the location is used, and failing that the
+            first instruction on the line. An instruction that starts on an
+            earlier line (the creation of a function, for example) gives way
+            to the first instruction on the line.
+        """
+        if location.start_line is None:
+            return
+        line = self._positions.enclosing(location)
+        if line is None and location.start_column is not None:
+            line = self._positions.innermost(location.start_line, location.start_column)
+        if line is None or (
+            location.start_line in self._line_map
+            and cast(Operation, self.get_option_at_index(line)).location.start_line
+            != location.start_line
+        ):
+            self.goto_first_instruction_on_line(location.start_line)
+        else:
+            with self.prevent(EnhancedOptionList.OptionHighlighted):
+                self.highlighted = line
+
+    def goto_code(self, key: str) -> bool:
+        """Go to the start of a code object.
+
+        Args:
+            key: The key that identifies the code object.
+
+        Returns:
+            `True` if the code object was found, `False` if not.
+
+        Notes:
+            If the disassembly is collapsed and the code object is within
+            one that is folded, the closest code object that is shown is
+            gone to instead.
+        """
+        # Code objects nested within others have a heading of their own;
+        # the top-level code doesn't, so for that go to its first operation.
+        while key:
+            for option_id in filter(None, (key, Operation.make_id(0, key))):
+                try:
+                    self.highlighted = self.get_option_index(option_id)
+                except OptionDoesNotExist:
+                    continue
+                return True
+            key = key.rpartition("/")[0] if self.collapsed else ""
+        return False
+
     def action_about(self) -> None:
         """Handle a request to view the opcode's documentation."""
         if self.highlighted is not None and isinstance(
@@ -362,6 +1034,10 @@ class Disassembly(EnhancedOptionList):
         ):
             visit_operation(option.operation)
 
+    def action_collapse(self) -> None:
+        """Toggle collapsing the disassembly to the top-level code."""
+        self.collapsed = not self.collapsed
+
     def action_opname(self, change: int) -> None:
         """Change the width of the opname column.
 
@@ -0,0 +1,95 @@
+"""Provides a widget for browsing the modules of a package."""
+
+##############################################################################
+# Python imports.
+from collections.abc import Iterable
+from dataclasses import dataclass
+from importlib.machinery import SOURCE_SUFFIXES
+from pathlib import Path
+
+##############################################################################
+# Textual imports.
+from textual import on
+from textual.message import Message
+from textual.reactive import var
+from textual.widgets import DirectoryTree, Tree
+from textual.widgets.directory_tree import DirEntry
+
+##############################################################################
+# Local imports.
+from ..analysis import ARCHIVE_SUFFIXES, COMPILED_SUFFIXES
+
+
+##############################################################################
+class PackageBrowser(DirectoryTree):
+    """Widget for browsing the modules of a package, or any directory of code."""
+
+    HELP = """
+    ## Package browser
+
+    This panel lists the Python code within a directory; select a module to
+    view it. Directories are only read as they're expanded.
+    """
+
+    hidden: var[bool] = var(False)
+    """Is the package browser hidden?"""
+
+    @dataclass
+    class ModuleHighlighted(Message):
+        """Message sent when a module is highlighted in the browser."""
+
+        module: Path
+        """The path to the module."""
+
+    def __init__(self, path: Path) -> None:
+        """Initialise the widget.
+
+        Args:
+            path: The directory to browse.
+        """
+        super().__init__(path)
+        self.border_title = "Modules"
+
+    def _watch_hidden(self) -> None:
+        """React to the browser being hidden or shown."""
+        self.set_class(self.hidden, "--hidden")
+
+    def filter_paths(self, paths: Iterable[Path]) -> Iterable[Path]:
+        """Filter the paths shown in the browser down to Python code.
+
+        Args:
+            paths: The paths to filter.
+
+        Returns:
+            The directories, Python files and archives of Python code.
+
+        Notes:
+            Hidden directories and files, and `__pycache__` directories,
+            aren't shown.
+        """
+        return [
+            path
+            for path in paths
+            if not path.name.startswith(".")
+            and (
+                (path.name != "__pycache__" and self._safe_is_dir(path))
+                or path.suffix.lower()
+                in (*SOURCE_SUFFIXES, ".pyi", *COMPILED_SUFFIXES, *ARCHIVE_SUFFIXES)
+            )
+        ]
+
+    @on(Tree.NodeHighlighted)
+    def _module_highlighted(self, message: Tree.NodeHighlighted[DirEntry]) -> None:
+        """Let the application know when a module is highlighted.
+
+        Args:
+            message: The message to react to.
+        """
+        message.stop()
+        if (entry := message.node.data) is not None and not self._safe_is_dir(
+            entry.path
+        ):
+            self.post_message(self.ModuleHighlighted(entry.path))
+
+
+### package_browser.py ends here
@@ -1,15 +1,19 @@
 """Widget for showing some Python source code."""
 
+##############################################################################
+# Python imports.
+from typing import Final
+
 ##############################################################################
 # Textual imports.
 from textual import on
 from textual.widgets import TextArea
-from textual.widgets.text_area import Selection
+from textual.widgets.text_area import Edit, EditResult, Selection
 
 ##############################################################################
 # Local imports.
 from ..messages import LocationChanged
-from ..types import Location
+from ..types import EditedLines, Location
 
 
 ##############################################################################
@@ -22,15 +26,168 @@ class Source(TextArea):
     This panel is the Python source code that you're exploring.
     """
 
+    LANGUAGE: Final[str] = "python"
+    """The language of the source, as far as syntax highlighting goes."""
+
     def __init__(self) -> None:
         """Initialise the widget."""
         super().__init__(
             "",
-            language="python",
+            language=self.LANGUAGE,
             soft_wrap=False,
             show_line_numbers=True,
         )
         self.border_title = "Source"
+        self._edits: list[EditedLines] | None = []
+        """The lines edited since the edits were last taken, if known."""
+        self._compiled_from: str | None = None
+        """The name of the compiled code being viewed, if it is."""
+
+    def _show_state(self) -> None:
+        """Show the state of the source in the subtitle."""
+        self.border_subtitle = " · ".join(
+            state
+            for state in (
+                ""
+                if self._compiled_from is None
+                else f"{self._compiled_from} (read-only)",
+                "" if self.highlighting else "not highlighted",
+            )
+            if state
+        )
+
+    def load_text(
+        self, text: str, compiled_from: str | None = None, highlight: bool = True
+    ) -> None:
+        """Load text into the widget.
+
+        Args:
+            text: The text to load.
+            compiled_from: The name of the compiled code being viewed, if
+                the text is the source of compiled code.
+            highlight: Should the source be syntax highlighted?
+
+        Notes:
+            The source of compiled code can't be edited, as the disassembly
+            is of the compiled code rather than of the source.
+        """
+        self._edits = None
+        self.read_only = compiled_from is not None
+        self._compiled_from = compiled_from
+        # Set the language without reacting to it, as loading the text
+        # builds the document for the language anyway.
+        self.set_reactive(Source.language, self.LANGUAGE if highlight else None)
+        self._show_state()
+        super().load_text(text)
+
+    @property
+    def highlighting(self) -> bool:
+        """Is the source being syntax highlighted?"""
+        return self.language is not None
+
+    def toggle_highlighting(self) -> None:
+        """Toggle the syntax highlighting of the source.
+
+        Notes:
+            The cursor, selection and scroll position are kept.
+        """
+        selection, (scroll_x, scroll_y) = self.selection, self.scroll_offset
+        self.language = None if self.highlighting else self.LANGUAGE
+        self.selection = selection
+        self.scroll_to(scroll_x, scroll_y, animate=False)
+        self._show_state()
+
+    def show_progress(self, name: str, progress: float | None) -> None:
+        """Show the progress of loading some source.
+
+        Args:
+            name: The name of the source being loaded.
+            progress: How much of the source has been loaded, from 0 to 1,
+                or `None` if the loading has stopped.
+        """
+        if progress is None:
+            self._show_state()
+        else:
+            self.border_subtitle = f"Loading {name} {progress:.0%}"
+
+    def reload_text(self, text: str) -> None:
+        """Reload the text of the widget, as an edit of the current text.
+
+        Args:
+            text: The new text.
+
+        Notes:
+            Only the lines that differ between the current text and the new
+            text are replaced, and they're replaced as a single edit; this
+            keeps the selection and the scroll position, and lets the
+            change be analysed incrementally.
+        """
+        old = self.document.text.split("\n")
+        new = text.split("\n")
+        common = min(len(old), len(new))
+        start = 0
+        while start < common and old[start] == new[start]:
+            start += 1
+        if start == len(old) == len(new):
+            return
+        end = 0
+        while end < common - start and old[-1 - end] == new[-1 - end]:
+            end += 1
+        if end:
+            self.replace(
+                "".join(f"{line}\n" for line in new[start : len(new) - end]),
+                (start, 0),
+                (len(old) - end, 0),
+            )
+        elif start:
+            self.replace(
+                "".join(f"\n{line}" for line in new[start:]),
+                (start - 1, len(old[start - 1])),
+                self.document.end,
+            )
+        else:
+            self.replace(text, (0, 0), self.document.end)
+
+    def edit(self, edit: Edit) -> EditResult:
+        """Perform an edit.
+
+        Args:
+            edit: The edit to perform.
+
+        Returns:
+            The result of the edit.
+        """
+        top, bottom = edit.top, edit.bottom
+        result = super().edit(edit)
+        if self._edits is not None:
+            self._edits.append(
+                EditedLines(
+                    top[0] + 1,
+                    result.end_location[0] + 1,
+                    result.end_location[0] - bottom[0],
+                )
+            )
+        return result
+
+    def undo(self) -> None:
+        """Undo the most recent batch of edits."""
+        self._edits = None
+        super().undo()
+
+    def redo(self) -> None:
+        """Redo the most recently undone batch of edits."""
+        self._edits = None
+        super().redo()
+
+    def take_edits(self) -> list[EditedLines] | None:
+        """Take the edits made since the edits were last taken.
+
+        Returns:
+            The lines edited, in the order they were edited, or `None` if
+            it isn't known which lines were edited.
+        """
+        edits, self._edits = self._edits, []
+        return edits
 
     def highlight_location(self, location: Location) -> None:
         """Highlight the given location.
@@ -59,7 +216,14 @@ class Source(TextArea):
     def _cursor_location_changed(self, message: TextArea.SelectionChanged) -> None:
         """Handle the cursor location changing."""
         message.stop()
-        self.post_message(LocationChanged(self, Location(message.selection.end[0] + 1)))
+        line, column = message.selection.end
+        text = self.document.get_line(line)
+        # Locations in the compiled code are in UTF-8 bytes, and the cursor
+        # is taken to be on the code, not the indentation before it.
+        column = max(column, len(text) - len(text.lstrip()))
+        self.post_message(
+            LocationChanged(self, Location(line + 1, len(text[:column].encode())))
+        )
 
 
 ### source.py ends here
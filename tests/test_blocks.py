@@ -0,0 +1,238 @@
+"""Tests for analysing code one top-level block at a time."""
+
+##############################################################################
+# Python imports.
+from ast import dump
+from random import Random
+from types import CodeType
+from typing import Any
+
+##############################################################################
+# Pytest imports.
+from pytest import mark
+
+##############################################################################
+# Local imports.
+from dhv.analysis import Analysis, AnalysisCache, IncrementalAnalyser, block_starts
+from dhv.analysis.blocks import analyse_block, relocate_block
+from dhv.analysis.model import Block
+from dhv.types import EditedLines
+
+##############################################################################
+SNIPPETS = (
+    "def f():\n",
+    "    return 1\n",
+    '"""\n',
+    "x = (\n",
+    ")\n",
+    "\n",
+    "# comment\n",
+    "@decorator\n",
+    "class C:\n",
+    "    pass\n",
+    "else:\n",
+    "'''\n",
+    "if x:\n",
+    "y = 2\n",
+)
+"""Lines to make up random code from; not all of it will be valid."""
+
+
+##############################################################################
+def _shape(block: Block) -> list[tuple[Any, ...]]:
+    """Get the shape of the disassembly of a block, for comparing.
+
+    Args:
+        block: The block to get the shape of.
+
+    Returns:
+        The details of every instruction in the block that should be the
+        same wherever the block is found to be.
+    """
+    return [
+        (
+            disassembly.code.co_firstlineno,
+            instruction.opname,
+            (instruction.argval.co_name, instruction.argval.co_firstlineno)
+            if isinstance(instruction.argval, CodeType)
+            else instruction.argrepr,
+            instruction.line_number,
+            instruction.positions,
+        )
+        for disassembly in block.disassembly
+        for instruction in disassembly.instructions
+    ]
+
+
+##############################################################################
+def _bounds(analysis: Analysis) -> list[tuple[int, int]]:
+    """Get the bounds of the blocks of an analysis.
+
+    Args:
+        analysis: The analysis to get the bounds of.
+
+    Returns:
+        The first line and line count of each block.
+    """
+    return [(block.first_line, block.line_count) for block in analysis.blocks]
+
+
+##############################################################################
+LINES = [
+    "import os\n",
+    "\n",
+    "@decorator\n",
+    "def f():\n",
+    "    pass\n",
+    "# comment\n",
+    "if x:\n",
+    "    y\n",
+    "else:\n",
+    "    z\n",
+    "try:\n",
+    "    a\n",
+    "finally:\n",
+    "    b\n",
+    "x = (1,\n",
+    "     2)\n",
+]
+"""Some code with a variety of top-level blocks."""
+
+
+##############################################################################
+def test_block_starts() -> None:
+    """Blocks start at top-level statements, including their decorators."""
+    assert list(block_starts(LINES)) == [2, 6, 10, 14]
+
+
+##############################################################################
+def test_block_starts_from_a_line() -> None:
+    """Looking for blocks can start at the start of any block."""
+    assert list(block_starts(LINES, 6)) == [10, 14]
+
+
+##############################################################################
+def test_block_starts_of_code_that_cannot_be_tokenised() -> None:
+    """Where code can't be tokenised, the starts of blocks are guessed."""
+    lines = ["a = 1\n", "b = '''\n", "def f():\n", "    pass\n", "c = 2\n"]
+    assert list(block_starts(lines)) == [1, 2, 4]
+
+
+##############################################################################
+@mark.parametrize("first_line", (1, 2, 10, 100))
+def test_relocated_block_matches_a_fresh_analysis(first_line: int) -> None:
+    """A relocated block is the same as a block analysed where it now is."""
+    text = (
+        "@decorator\n"
+        "def f(x, y=(1, 2)):\n"
+        "    '''A docstring.'''\n"
+        "    if x:\n"
+        "        return [n * y[0] for n in x]\n"
+        "    return lambda: y\n"
+    )
+    block = analyse_block(text, 5, 6, 0)
+    assert block.ast is not None
+    original = dump(block.ast, include_attributes=True)
+    relocated = relocate_block(block, first_line)
+    fresh = analyse_block(text, first_line, 6, 0)
+    assert relocated.first_line == first_line
+    assert _shape(relocated) == _shape(fresh)
+    assert relocated.ast is not None and fresh.ast is not None
+    assert dump(relocated.ast, include_attributes=True) == dump(
+        fresh.ast, include_attributes=True
+    )
+    assert dump(block.ast, include_attributes=True) == original
+
+
+##############################################################################
+def test_relocating_a_block_to_where_it_is() -> None:
+    """Relocating a block to the line it's already on gives the same block."""
+    block = analyse_block("x = 1\n", 3, 1, 0)
+    assert relocate_block(block, 3) is block
+
+
+##############################################################################
+def test_analysis_when_every_block_fails() -> None:
+    """When no block can be compiled, there is no AST."""
+    analysis = IncrementalAnalyser().analyse("def f(:\n\nx = (\n")
+    assert analysis.approximate
+    assert analysis.ast is None
+    assert analysis.errors
+
+
+##############################################################################
+def test_analysis_when_some_blocks_fail() -> None:
+    """When some blocks can be compiled, they are analysed."""
+    analysis = IncrementalAnalyser().analyse("def f(:\n    pass\n\nx = 1\n")
+    assert analysis.ast is not None
+    assert [block.error is not None for block in analysis.blocks] == [True, False]
+    assert analysis.disassembly
+
+
+##############################################################################
+def test_closing_a_string_splits_the_code_again() -> None:
+    """Once an unclosed string is closed, the blocks are the same as from scratch."""
+    analyser = IncrementalAnalyser()
+    lines = ["a = 1\n", "b = 2\n", "def f():\n", "    '''\n", "c = 3\n", "d = 4\n"]
+    base = analyser.analyse("".join(lines))
+    lines[1] = "b = '''\n"
+    base = analyser.analyse("".join(lines), EditedLines(2, 2, 0), base)
+    lines[1] = "b = 2\n"
+    text = "".join(lines)
+    analysis = analyser.analyse(text, EditedLines(2, 2, 0), base)
+    assert _bounds(analysis) == _bounds(IncrementalAnalyser().analyse(text))
+
+
+##############################################################################
+@mark.parametrize("seed", range(25))
+def test_incremental_analysis_matches_a_fresh_analysis(seed: int) -> None:
+    """Analysing edits incrementally gives the same result as from scratch."""
+    generator = Random(seed)
+    lines = [generator.choice(SNIPPETS) for _ in range(40)]
+    analyser = IncrementalAnalyser()
+    base = analyser.analyse("".join(lines))
+    for _ in range(8):
+        top = generator.randint(1, len(lines))
+        bottom = generator.randint(top, min(top + 2, len(lines)))
+        new = [generator.choice(SNIPPETS) for _ in range(generator.randint(1, 3))]
+        lines[top - 1 : bottom] = new
+        edited = EditedLines(top, top + len(new) - 1, len(new) - (bottom - top + 1))
+        base = analyser.analyse(text := "".join(lines), edited, base)
+        fresh = IncrementalAnalyser().analyse(text)
+        assert _bounds(base) == _bounds(fresh)
+        assert [_shape(block) for block in base.blocks] == [
+            _shape(block) for block in fresh.blocks
+        ]
+
+
+##############################################################################
+def test_preview_of_small_code() -> None:
+    """Code with fewer lines than the incremental threshold isn't previewed."""
+    cache = AnalysisCache(4, incremental_lines=10)
+    assert cache.preview_of("x = 1\n", EditedLines(1, 1, 0), None) is None
+
+
+##############################################################################
+def test_preview_of_large_code() -> None:
+    """Large code is previewed a block at a time, until it's fully analysed."""
+    cache = AnalysisCache(4, incremental_lines=10)
+    source = "".join(f"value_{line} = {line}\n" for line in range(20))
+    preview = cache.preview_of(source, EditedLines(1, 1, 0), None)
+    assert preview is not None and preview.approximate
+    full = cache.analysis_of(source)
+    assert not full.approximate
+    assert cache.preview_of(source, EditedLines(1, 1, 0), preview) is full
+
+
+##############################################################################
+def test_large_code_that_cannot_be_compiled() -> None:
+    """Large code that can't be compiled is analysed a block at a time."""
+    cache = AnalysisCache(4, incremental_lines=10)
+    source = "".join(f"value_{line} = {line}\n" for line in range(20))
+    analysis = cache.analysis_of(f"{source}def broken(:\n")
+    assert analysis.approximate
+    assert analysis.errors
+    assert analysis.disassembly
+
+
+### test_blocks.py ends here
@@ -0,0 +1,54 @@
+"""Tests for the in-memory cache of analyses."""
+
+##############################################################################
+# Local imports.
+from dhv.analysis import AnalysisCache, source_key
+
+
+##############################################################################
+def test_analysis_is_cached() -> None:
+    """Asking for the analysis of the same source gives the same analysis."""
+    cache = AnalysisCache(4)
+    analysis = cache.analysis_of("x = 1\n")
+    assert analysis.error is None
+    assert cache.analysis_of("x = 1\n") is analysis
+    assert analysis.key in cache
+
+
+##############################################################################
+def test_least_recently_used_analysis_is_evicted() -> None:
+    """The least-recently-used analysis is evicted once the cache is full."""
+    cache = AnalysisCache(2)
+    first = cache.analysis_of("a = 1\n")
+    cache.analysis_of("b = 2\n")
+    cache.analysis_of("c = 3\n")
+    assert first.key not in cache
+    assert cache.analysis_of("a = 1\n") is not first
+
+
+##############################################################################
+def test_cache_is_limited_by_source_size() -> None:
+    """The total size of the cached source is kept within its limit."""
+    cache = AnalysisCache(10, 30)
+    cache.analysis_of(small := "a = 1\n")
+    cache.analysis_of(large := f"b = {'1' * 30}\n")
+    assert source_key(small) in cache
+    assert source_key(large) not in cache
+    cache.analysis_of(other := f"c = {'2' * 10}\n")
+    assert source_key(other) in cache
+    assert source_key(small) in cache
+    cache.analysis_of(f"d = {'3' * 10}\n")
+    assert source_key(small) not in cache
+    assert cache.weight <= 30
+
+
+##############################################################################
+def test_failed_analysis_is_cached() -> None:
+    """The analysis of code that can't be compiled is cached too."""
+    cache = AnalysisCache(4)
+    analysis = cache.analysis_of("def f(:\n")
+    assert analysis.error is not None
+    assert cache.analysis_of("def f(:\n") is analysis
+
+
+### test_cache.py ends here
@@ -0,0 +1,155 @@
+"""Tests for analysing compiled Python files."""
+
+##############################################################################
+# Python imports.
+from importlib.util import MAGIC_NUMBER
+from marshal import dumps
+from pathlib import Path
+from py_compile import PycInvalidationMode
+from py_compile import compile as compile_file
+
+##############################################################################
+# Pytest imports.
+from pytest import MonkeyPatch, mark, raises
+
+##############################################################################
+# Local imports.
+from dhv.analysis import (
+    CompiledCodeError,
+    analyse_compiled,
+    analyse_compiled_directory,
+    analyse_with_compiled,
+    load_compiled,
+    unmarshal_compiled,
+)
+
+##############################################################################
+SOURCE = "def f():\n    return 42\n"
+"""Some source code to compile."""
+BODY = dumps(compile(SOURCE, "<test>", "exec"))
+"""The marshalled code of the source."""
+PATH = Path("test.pyc")
+"""The path to give to compiled data that isn't in a file."""
+
+
+##############################################################################
+def _compiled(
+    tmp_path: Path,
+    mode: PycInvalidationMode = PycInvalidationMode.TIMESTAMP,
+) -> tuple[Path, Path]:
+    """Compile the test source into a file.
+
+    Args:
+        tmp_path: The directory to put the source in.
+        mode: How the compiled file should be checked against its source.
+
+    Returns:
+        The path to the source and the path to its compiled code.
+    """
+    (source := tmp_path / "module.py").write_text(SOURCE)
+    compiled = compile_file(str(source), doraise=True, invalidation_mode=mode)
+    assert compiled is not None
+    return source, Path(compiled)
+
+
+##############################################################################
+@mark.parametrize(
+    "data, message",
+    (
+        (MAGIC_NUMBER, "too short"),
+        (b"\x00\x00\r\n" + bytes(12) + BODY, "different version of Python"),
+        (b"\x7fELF" + bytes(12) + BODY, "isn't compiled Python code"),
+        (MAGIC_NUMBER + b"\x04\x00\x00\x00" + bytes(8) + BODY, "invalid header"),
+        (MAGIC_NUMBER + bytes(12) + b"\xff", "bad data"),
+        (MAGIC_NUMBER + bytes(12) + BODY[:10], "bad data"),
+        (MAGIC_NUMBER + bytes(12) + dumps(42), "doesn't hold a code object"),
+    ),
+)
+def test_unmarshal_bad_data(data: bytes, message: str) -> None:
+    """Data that isn't loadable compiled code is reported as such."""
+    with raises(CompiledCodeError, match=message):
+        unmarshal_compiled(PATH, data)
+
+
+##############################################################################
+def test_unmarshal_compiled() -> None:
+    """Compiled code with a valid header can be unmarshalled."""
+    compiled = unmarshal_compiled(PATH, MAGIC_NUMBER + bytes(12) + BODY)
+    assert compiled.code.co_consts[0].co_name == "f"
+    assert not compiled.hash_based
+    assert compiled.key == unmarshal_compiled(PATH, MAGIC_NUMBER + bytes(12) + BODY).key
+    other = dumps(compile("x = 1\n", "<test>", "exec"))
+    assert (
+        compiled.key != unmarshal_compiled(PATH, MAGIC_NUMBER + bytes(12) + other).key
+    )
+
+
+##############################################################################
+@mark.parametrize("threshold", (0, 1024 * 1024))
+def test_load_compiled(
+    tmp_path: Path, monkeypatch: MonkeyPatch, threshold: int
+) -> None:
+    """A compiled file is loaded whether it is read or memory-mapped."""
+    monkeypatch.setattr("dhv.analysis.compiled.MMAP_THRESHOLD", threshold)
+    source, compiled_path = _compiled(tmp_path)
+    compiled = load_compiled(compiled_path)
+    assert compiled.source_path == source
+    assert compiled.is_compiled_from(source.read_bytes(), source.stat().st_mtime)
+    assert not compiled.is_compiled_from(b"x = 1\n", source.stat().st_mtime)
+
+
+##############################################################################
+def test_load_missing_compiled_file(tmp_path: Path) -> None:
+    """Failing to read a compiled file is reported as a compiled code error."""
+    with raises(CompiledCodeError):
+        load_compiled(tmp_path / "missing.pyc")
+
+
+##############################################################################
+def test_hash_based_compiled_file(tmp_path: Path) -> None:
+    """A hash-based compiled file is checked against the hash of its source."""
+    source, compiled_path = _compiled(tmp_path, PycInvalidationMode.CHECKED_HASH)
+    compiled = load_compiled(compiled_path)
+    assert compiled.hash_based
+    assert compiled.is_compiled_from(source.read_bytes(), 0)
+    assert not compiled.is_compiled_from(b"x = 1\n", 0)
+
+
+##############################################################################
+def test_analyse_compiled(tmp_path: Path) -> None:
+    """The analysis of a compiled file has its source if it's unchanged."""
+    source, compiled_path = _compiled(tmp_path)
+    analysis = analyse_compiled(compiled_path)
+    assert analysis.source == SOURCE
+    assert analysis.ast is not None
+    assert analysis.disassembly
+    source.write_text(f"{SOURCE}# An edit.\n")
+    analysis = analyse_compiled(compiled_path)
+    assert analysis.source == ""
+    assert analysis.ast is None
+    assert analysis.disassembly
+
+
+##############################################################################
+def test_analyse_with_compiled(tmp_path: Path) -> None:
+    """Source is only analysed with its compiled code if that is up to date."""
+    source, compiled_path = _compiled(tmp_path)
+    text, analysis = analyse_with_compiled(source, compiled_path)
+    assert text == SOURCE
+    assert analysis is not None and analysis.source == SOURCE
+    source.write_text(f"{SOURCE}# An edit.\n")
+    assert analyse_with_compiled(source, compiled_path)[1] is None
+    assert analyse_with_compiled(source, None)[1] is None
+
+
+##############################################################################
+def test_analyse_compiled_directory(tmp_path: Path) -> None:
+    """Every compiled file in a directory is analysed, with errors for the bad."""
+    _, compiled_path = _compiled(tmp_path)
+    (bad := compiled_path.parent / "bad.pyc").write_bytes(b"nonsense")
+    analysis, errors = analyse_compiled_directory(compiled_path.parent)
+    assert [str(bad) in str(error) for error in errors] == [True]
+    assert analysis.disassembly[0].code.co_qualname == "<module module>"
+
+
+### test_compiled.py ends here
@@ -0,0 +1,155 @@
+"""Tests for holding and saving the configuration."""
+
+##############################################################################
+# Python imports.
+from dataclasses import asdict, replace
+from json import loads
+from pathlib import Path
+from typing import Any
+
+##############################################################################
+# Pytest imports.
+from pytest import MonkeyPatch, fixture
+
+##############################################################################
+# Local imports.
+from dhv.data.config import (
+    Configuration,
+    _ConfigurationStore,
+    configuration_file,
+    flush_configuration,
+    load_configuration,
+    save_configuration,
+    update_configuration,
+)
+
+
+##############################################################################
+@fixture(autouse=True)
+def config_home(tmp_path: Path, monkeypatch: MonkeyPatch) -> Path:
+    """Keep the configuration of each test in a directory of its own."""
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path))
+    monkeypatch.setattr("dhv.data.config._store", _ConfigurationStore())
+    return tmp_path
+
+
+##############################################################################
+def _saved() -> dict[str, Any]:
+    """Get the configuration as saved in the configuration file.
+
+    Returns:
+        The content of the configuration file.
+    """
+    saved: dict[str, Any] = loads(configuration_file().read_text(encoding="utf-8"))
+    return saved
+
+
+##############################################################################
+def _change(store: _ConfigurationStore, **changes: Any) -> None:
+    """Make a change to the configuration held by a store.
+
+    Args:
+        store: The store to change the configuration of.
+        changes: The settings to change.
+    """
+    configuration = store.load()
+    before = asdict(configuration)
+    for name, value in changes.items():
+        setattr(configuration, name, value)
+    store.changed(before, asdict(configuration))
+
+
+##############################################################################
+def test_first_load_saves_the_defaults(config_home: Path) -> None:
+    """Loading when there's no configuration file saves the defaults."""
+    assert _ConfigurationStore().load() == Configuration()
+    assert configuration_file().parent == config_home / "dhv"
+    assert _saved() == asdict(Configuration())
+
+
+##############################################################################
+def test_changes_are_held_until_flushed() -> None:
+    """Changes aren't saved until the store is flushed."""
+    store = _ConfigurationStore()
+    _change(store, theme="nord")
+    _change(store, theme="gruvbox", show_ast=True)
+    assert _saved()["theme"] is None
+    store.flush()
+    assert _saved()["theme"] == "gruvbox"
+    assert _saved()["show_ast"] is True
+
+
+##############################################################################
+def test_stores_merge_their_changes() -> None:
+    """Stores only save what they changed, so don't undo each other's changes."""
+    first, second = _ConfigurationStore(), _ConfigurationStore()
+    first.load()
+    second.load()
+    _change(first, theme="nord")
+    _change(second, show_ast=True)
+    first.flush()
+    second.flush()
+    assert _saved()["theme"] == "nord"
+    assert _saved()["show_ast"] is True
+    assert second.load().theme == "nord"
+
+
+##############################################################################
+def test_load_picks_up_changes_from_elsewhere(monkeypatch: MonkeyPatch) -> None:
+    """Loading picks up changes another store saved, once it's time to check."""
+    first, second = _ConfigurationStore(), _ConfigurationStore()
+    first.load()
+    second.load()
+    _change(first, theme="nord")
+    first.flush()
+    assert second.load().theme is None
+    monkeypatch.setattr("dhv.data.config.CHECK_INTERVAL", 0)
+    assert second.load().theme == "nord"
+
+
+##############################################################################
+def test_pending_changes_survive_loading(monkeypatch: MonkeyPatch) -> None:
+    """Changes yet to be saved aren't lost when changes from elsewhere are loaded."""
+    monkeypatch.setattr("dhv.data.config.CHECK_INTERVAL", 0)
+    first, second = _ConfigurationStore(), _ConfigurationStore()
+    first.load()
+    second.load()
+    _change(second, show_ast=True)
+    _change(first, theme="nord")
+    first.flush()
+    configuration = second.load()
+    assert configuration.theme == "nord"
+    assert configuration.show_ast is True
+
+
+##############################################################################
+def test_unreadable_file_is_ignored(monkeypatch: MonkeyPatch) -> None:
+    """If the file can't be read, the configuration already loaded is kept."""
+    monkeypatch.setattr("dhv.data.config.CHECK_INTERVAL", 0)
+    store = _ConfigurationStore()
+    _change(store, theme="nord")
+    store.flush()
+    configuration_file().write_text("{", encoding="utf-8")
+    assert store.load().theme == "nord"
+
+
+##############################################################################
+def test_save_configuration() -> None:
+    """Saving a configuration saves it straight away."""
+    saved = save_configuration(replace(load_configuration(), theme="nord"))
+    assert saved.theme == "nord"
+    assert _saved()["theme"] == "nord"
+
+
+##############################################################################
+def test_update_configuration() -> None:
+    """Updates to the configuration are saved when flushed."""
+    with update_configuration() as configuration:
+        configuration.show_ast = True
+    assert load_configuration().show_ast is True
+    assert _saved()["show_ast"] is False
+    flush_configuration()
+    assert _saved()["show_ast"] is True
+
+
+### test_config.py ends here
@@ -0,0 +1,176 @@
+"""Tests for the on-disk cache of analyses."""
+
+##############################################################################
+# Python imports.
+from ast import Module, dump
+from os import utime
+from pathlib import Path
+from types import CodeType
+
+##############################################################################
+# Local imports.
+from dhv.analysis import (
+    AnalysisCache,
+    DiskCache,
+    IncrementalAnalyser,
+    analyse,
+    source_key,
+)
+
+##############################################################################
+SOURCE = """\
+def greet(name: str) -> str:
+    return f"Hello, {name}!"
+
+class Greeter:
+    def __call__(self, names: list[str]) -> list[str]:
+        return [greet(name) for name in names]
+
+print(Greeter()(["world"]))
+"""
+"""Some source to cache the analysis of."""
+
+
+##############################################################################
+def _cache_files(location: Path) -> list[Path]:
+    """Get the cache files in a cache directory.
+
+    Args:
+        location: The cache directory.
+
+    Returns:
+        The cache files.
+    """
+    return sorted(location.glob("*.dhvc"))
+
+
+##############################################################################
+def test_round_trip(tmp_path: Path) -> None:
+    """An analysis put into the cache can be got back out."""
+    cache = DiskCache(tmp_path, 1024 * 1024)
+    cache.put(analysis := analyse(SOURCE))
+    assert len(_cache_files(tmp_path)) == 1
+    cached = DiskCache(tmp_path, 1024 * 1024).get(analysis.key, SOURCE)
+    assert cached is not None
+    assert cached.key == analysis.key
+    assert cached.code == analysis.code
+    assert cached.disassembly == analysis.disassembly
+    assert cached.ast is not None and analysis.ast is not None
+    assert dump(cached.ast, include_attributes=True) == dump(
+        analysis.ast, include_attributes=True
+    )
+
+
+##############################################################################
+def test_miss(tmp_path: Path) -> None:
+    """Getting an analysis that was never cached gives nothing."""
+    assert DiskCache(tmp_path, 1024 * 1024).get(source_key(SOURCE), SOURCE) is None
+
+
+##############################################################################
+def test_hit_is_parsed_with_the_given_parser(tmp_path: Path) -> None:
+    """The source of a hit is parsed with the parser, and is a miss if it can't be."""
+    cache = DiskCache(tmp_path, 1024 * 1024)
+    cache.put(analysis := analyse(SOURCE))
+    parsed: list[str] = []
+
+    def parser(source: str) -> Module | None:
+        parsed.append(source)
+        return None
+
+    assert cache.get(analysis.key, SOURCE, parser) is None
+    assert parsed == [SOURCE]
+
+
+##############################################################################
+def test_corrupt_file_is_removed(tmp_path: Path) -> None:
+    """A cache file that can't be read is treated as a miss and removed."""
+    cache = DiskCache(tmp_path, 1024 * 1024)
+    cache.put(analysis := analyse(SOURCE))
+    (cache_file,) = _cache_files(tmp_path)
+    cache_file.write_bytes(cache_file.read_bytes()[:-10])
+    assert cache.get(analysis.key, SOURCE) is None
+    assert not cache_file.exists()
+
+
+##############################################################################
+def test_file_with_the_wrong_header_is_removed(tmp_path: Path) -> None:
+    """A cache file that doesn't start with the right header is removed."""
+    cache = DiskCache(tmp_path, 1024 * 1024)
+    cache.put(analysis := analyse(SOURCE))
+    (cache_file,) = _cache_files(tmp_path)
+    cache_file.write_bytes(b"not a cache file")
+    assert cache.get(analysis.key, SOURCE) is None
+    assert not cache_file.exists()
+
+
+##############################################################################
+def test_failed_analysis_is_not_cached(tmp_path: Path) -> None:
+    """An analysis of code that can't be compiled isn't cached."""
+    DiskCache(tmp_path, 1024 * 1024).put(analyse("def broken(:\n"))
+    assert _cache_files(tmp_path) == []
+
+
+##############################################################################
+def test_approximate_analysis_is_not_cached(tmp_path: Path) -> None:
+    """An analysis made a block at a time isn't cached."""
+    analysis = IncrementalAnalyser().analyse(SOURCE)
+    assert analysis.approximate
+    DiskCache(tmp_path, 1024 * 1024).put(analysis)
+    assert _cache_files(tmp_path) == []
+
+
+##############################################################################
+def test_least_recently_used_files_are_evicted(tmp_path: Path) -> None:
+    """Putting into a cache that's over its size evicts the oldest files."""
+    sources = [f"value_{count} = {count}\n" * 20 for count in range(5)]
+    unlimited = DiskCache(tmp_path, 1024 * 1024)
+    for age, source in enumerate(sources):
+        unlimited.put(analyse(source))
+        utime(unlimited_file := tmp_path / f"{source_key(source)}.dhvc", (age, age))
+    size = unlimited_file.stat().st_size
+    limited = DiskCache(tmp_path, size * 3)
+    limited.put(analyse(newest := "newest = True\n" * 20))
+    remaining = {cache_file.stem for cache_file in _cache_files(tmp_path)}
+    assert source_key(newest) in remaining
+    assert source_key(sources[0]) not in remaining
+    assert sum(cache_file.stat().st_size for cache_file in _cache_files(tmp_path)) <= (
+        size * 3
+    )
+
+
+##############################################################################
+def test_clear(tmp_path: Path) -> None:
+    """Clearing the cache removes all of its files."""
+    cache = DiskCache(tmp_path, 1024 * 1024)
+    cache.put(analyse(SOURCE))
+    cache.clear()
+    assert _cache_files(tmp_path) == []
+
+
+##############################################################################
+def _no_compiling(source: str, flags: int = 0) -> tuple[Module | None, CodeType]:
+    """A compiler that refuses to compile anything.
+
+    Raises:
+        AssertionError: Always.
+    """
+    raise AssertionError("The code shouldn't have been compiled")
+
+
+##############################################################################
+def test_analysis_cache_only_persists_when_asked(tmp_path: Path) -> None:
+    """The analysis cache only uses the on-disk cache when asked to."""
+    disk_cache = DiskCache(tmp_path, 1024 * 1024)
+    AnalysisCache(4, disk_cache=disk_cache).analysis_of(SOURCE)
+    assert _cache_files(tmp_path) == []
+    AnalysisCache(4, disk_cache=disk_cache).analysis_of(SOURCE, persist=True)
+    assert len(_cache_files(tmp_path)) == 1
+    analysis = AnalysisCache(
+        4, disk_cache=disk_cache, compiler=_no_compiling
+    ).analysis_of(SOURCE, persist=True)
+    assert analysis.ast is not None
+    assert analysis.disassembly
+
+
+### test_disk_cache.py ends here
@@ -0,0 +1,79 @@
+"""Tests for the least-recently-used cache."""
+
+##############################################################################
+# Local imports.
+from dhv.analysis import LRUCache
+
+
+##############################################################################
+def test_put_and_get() -> None:
+    """A value that is put into the cache can be got back out."""
+    cache = LRUCache[str, int](2)
+    assert cache.put("one", 1) == 1
+    assert cache.get("one") == 1
+    assert "one" in cache
+    assert cache.get("two") is None
+    assert "two" not in cache
+
+
+##############################################################################
+def test_evicts_least_recently_used_entry() -> None:
+    """Once full, the least-recently-used entry is evicted."""
+    cache = LRUCache[str, int](2)
+    cache.put("one", 1)
+    cache.put("two", 2)
+    assert cache.get("one") == 1
+    cache.put("three", 3)
+    assert len(cache) == 2
+    assert "one" in cache
+    assert "two" not in cache
+    assert "three" in cache
+
+
+##############################################################################
+def test_evicts_by_weight() -> None:
+    """Entries are evicted to keep the cache within its weight."""
+    cache = LRUCache[str, str](10, 10, len)
+    cache.put("a", "12345")
+    cache.put("b", "1234")
+    assert cache.weight == 9
+    cache.put("c", "123")
+    assert "a" not in cache
+    assert cache.weight == 7
+
+
+##############################################################################
+def test_too_heavy_value_is_not_cached() -> None:
+    """A value heavier than the whole cache is never cached."""
+    cache = LRUCache[str, str](10, 5, len)
+    cache.put("a", "123")
+    assert cache.put("b", "123456") == "123456"
+    assert "b" not in cache
+    assert "a" in cache
+    assert cache.weight == 3
+
+
+##############################################################################
+def test_replacing_a_value_replaces_its_weight() -> None:
+    """Putting a value under a key that's in the cache replaces its weight."""
+    cache = LRUCache[str, str](10, 10, len)
+    cache.put("a", "12345")
+    cache.put("a", "12")
+    assert len(cache) == 1
+    assert cache.weight == 2
+    cache.put("a", "12345678901")
+    assert "a" not in cache
+    assert cache.weight == 0
+
+
+##############################################################################
+def test_clear() -> None:
+    """Clearing the cache empties it."""
+    cache = LRUCache[str, str](10, 10, len)
+    cache.put("a", "123")
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.weight == 0
+
+
+### test_lru.py ends here
@@ -0,0 +1,73 @@
+"""Tests for the types used throughout the application."""
+
+##############################################################################
+# Python imports.
+from functools import reduce
+from random import Random
+
+##############################################################################
+# Pytest imports.
+from pytest import mark
+
+##############################################################################
+# Local imports.
+from dhv.types import EditedLines
+
+
+##############################################################################
+def _edit(lines: list[object], top: int, bottom: int, count: int) -> EditedLines:
+    """Replace some lines with new lines, as an edit in the source would.
+
+    Args:
+        lines: The lines to edit.
+        top: The first line to replace (1-based).
+        bottom: The last line to replace (1-based, inclusive).
+        count: The number of new lines to replace them with (at least 1).
+
+    Returns:
+        The lines affected by the edit, as the source widget reports them.
+    """
+    lines[top - 1 : bottom] = [object() for _ in range(count)]
+    return EditedLines(top, top + count - 1, count - (bottom - top + 1))
+
+
+##############################################################################
+def test_edits_that_do_not_overlap() -> None:
+    """Combining separate edits covers the lines between them."""
+    assert EditedLines(2, 3, 1).then(EditedLines(10, 10, 0)) == EditedLines(2, 10, 1)
+    assert EditedLines(10, 10, 0).then(EditedLines(2, 3, 1)) == EditedLines(2, 11, 1)
+
+
+##############################################################################
+def test_edit_within_an_edit() -> None:
+    """An edit within the lines of an earlier edit doesn't widen them."""
+    assert EditedLines(5, 10, 2).then(EditedLines(6, 7, 1)) == EditedLines(5, 11, 3)
+
+
+##############################################################################
+def test_edit_that_removes_the_end_of_an_edit() -> None:
+    """An edit that removes the end of an earlier edit shrinks it."""
+    assert EditedLines(5, 10, 5).then(EditedLines(8, 8, -4)) == EditedLines(5, 8, 1)
+
+
+##############################################################################
+@mark.parametrize("seed", range(20))
+def test_combined_edits_cover_every_changed_line(seed: int) -> None:
+    """Outside of the combined edits, every line is an original line."""
+    generator = Random(seed)
+    original: list[object] = [object() for _ in range(40)]
+    lines = list(original)
+    edits: list[EditedLines] = []
+    for _ in range(generator.randint(1, 6)):
+        top = generator.randint(1, len(lines))
+        bottom = generator.randint(top, min(top + 3, len(lines)))
+        edits.append(_edit(lines, top, bottom, generator.randint(1, 4)))
+    edited = reduce(EditedLines.then, edits)
+    assert len(lines) == len(original) + edited.line_delta
+    for line in range(1, edited.first_line):
+        assert lines[line - 1] is original[line - 1]
+    for line in range(edited.last_line + 1, len(lines) + 1):
+        assert lines[line - 1] is original[line - 1 - edited.line_delta]
+
+
+### test_types.py ends here
@@ -0,0 +1,170 @@
+"""Benchmark the start-up time of the quick command line paths of DHV.
+
+Each path is run a number of times under `python -X importtime`, and the
+imports it does are compared with a budget. A path fails if it imports
+anything from the user interface that it shouldn't, if it imports more
+modules than its budget allows, or if its median import time is over
+budget.
+
+Run with `make startup` (or `uv run python tools/startup.py`).
+"""
+
+##############################################################################
+# Python imports.
+from argparse import ArgumentParser, Namespace
+from statistics import median
+from subprocess import run
+from sys import executable, exit
+from typing import Final, NamedTuple
+
+##############################################################################
+UI_MODULES: Final[tuple[str, ...]] = (
+    "dhv.dhv",
+    "dhv.screens",
+    "dhv.widgets",
+    "textual.app",
+    "textual_fspicker",
+)
+"""The modules that none of the quick paths should import."""
+
+
+##############################################################################
+class Budget(NamedTuple):
+    """The start-up budget for a command line path."""
+
+    arguments: tuple[str, ...]
+    """The command line arguments for the path."""
+    modules: int
+    """The maximum number of modules the path may import."""
+    milliseconds: float
+    """The maximum median time, in milliseconds, the imports may take."""
+    forbidden: tuple[str, ...] = UI_MODULES
+    """The modules that the path must not import."""
+
+
+##############################################################################
+BUDGETS: Final[tuple[Budget, ...]] = (
+    Budget(("--version",), 200, 150),
+    Budget(("--license",), 200, 150),
+    # The commands are Textual messages, and textual-enhanced's commands
+    # pull in textual.app, so that can't be helped here.
+    Budget(
+        ("--bindings",),
+        475,
+        450,
+        tuple(module for module in UI_MODULES if module != "textual.app"),
+    ),
+    Budget(("--theme", "?"), 450, 450),
+)
+"""The budgets for each of the quick paths."""
+
+
+##############################################################################
+class Imports(NamedTuple):
+    """The imports done by one run of a path."""
+
+    modules: tuple[str, ...]
+    """The names of the modules that were imported."""
+    milliseconds: float
+    """The total time, in milliseconds, spent importing."""
+
+
+##############################################################################
+def imports_of(arguments: tuple[str, ...]) -> Imports:
+    """Run DHV with some arguments and get the imports it does.
+
+    Args:
+        arguments: The command line arguments to run with.
+
+    Returns:
+        The imports.
+    """
+    result = run(
+        [
+            executable,
+            "-X",
+            "importtime",
+            "-c",
+            f"import sys; sys.argv = ['dhv', *{arguments!r}]; "
+            "from dhv.__main__ import main; main()",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules: list[str] = []
+    microseconds = 0
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            own_time, _, module = line.removeprefix("import time:").split("|")
+            if own_time.strip().isdigit():
+                microseconds += int(own_time)
+                modules.append(module.strip())
+    return Imports(tuple(modules), microseconds / 1000)
+
+
+##############################################################################
+def check(budget: Budget, runs: int) -> bool:
+    """Check a path against its budget.
+
+    Args:
+        budget: The budget to check against.
+        runs: The number of times to run the path.
+
+    Returns:
+        `True` if the path is within budget, `False` if not.
+    """
+    results = [imports_of(budget.arguments) for _ in range(runs)]
+    modules = results[-1].modules
+    milliseconds = median(result.milliseconds for result in results)
+    problems = [
+        f"imports {module}"
+        for module in modules
+        if any(
+            module == forbidden or module.startswith(f"{forbidden}.")
+            for forbidden in budget.forbidden
+        )
+    ]
+    if len(modules) > budget.modules:
+        problems.append(f"{len(modules)} modules > {budget.modules}")
+    if milliseconds > budget.milliseconds:
+        problems.append(f"{milliseconds:.1f}ms > {budget.milliseconds}ms")
+    print(
+        f"{'FAIL' if problems else 'ok  '} dhv {' '.join(budget.arguments):<12}"
+        f" {len(modules):>4} modules {milliseconds:>8.1f}ms"
+        + (f"  ({'; '.join(problems)})" if problems else "")
+    )
+    return not problems
+
+
+##############################################################################
+def get_args() -> Namespace:
+    """Get the command line arguments.
+
+    Returns:
+        The arguments.
+    """
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "-r",
+        "--runs",
+        type=int,
+        default=5,
+        help="The number of times to run each path (default: 5)",
+    )
+    return parser.parse_args()
+
+
+##############################################################################
+def main() -> None:
+    """The main entry point."""
+    runs = get_args().runs
+    if not all([check(budget, runs) for budget in BUDGETS]):
+        exit(1)
+
+
+##############################################################################
+if __name__ == "__main__":
+    main()
+
+### startup.py ends here